@@ -0,0 +1,58 @@
+# backend/benchmarks/bench_cleaning.py
+# ------------------------------------------------------------
+# Old vs new caption cleaning, same inputs, same outputs.
+#   python -m backend.benchmarks.bench_cleaning [--rounds N]
+# ------------------------------------------------------------
+
+import argparse
+import logging
+import time
+
+from backend import cleaning
+from backend import summarizer
+from backend.benchmarks import legacy_cleaning as legacy
+
+SAMPLES = [
+    "1,234 likes, 56 comments - schimpfstagram on December 11, 2025: "
+    "\"Golden hour at the pier with @ana and @ben. #sunset #nofilter\"",
+    "Liked by @coach.k and 3,210 others Big day for the team 🎉 thanks for everything… 2h ago",
+    "New menu drops Sept 14, 2025!!! Come hungry. #food #nyc #brunch ...",
+    "See posts, photos and more on Facebook.",
+    "12K likes - A long reel caption that keeps going about the trip, the food, "
+    "the people, and the weather on Jan 5, 2024. Log in to see more",
+    "Just a plain sentence with nothing to strip at all, which is the common case.",
+]
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in SAMPLES:
+            fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    summarizer.OG_LOG.setLevel(logging.INFO)  # DEBUG_OG=1 IN .env WOULD SKEW THIS
+    pairs = [
+        ("clean_social_caption", legacy.clean_social_caption, summarizer.clean_social_caption),
+        ("clean_meta_description", legacy.clean_meta_description, cleaning.clean_meta_description),
+    ]
+    calls = args.rounds * len(SAMPLES)
+    for name, old, new in pairs:
+        for text in SAMPLES:
+            assert old(text) == new(text), text
+        old_s = _time(old, args.rounds)
+        new_s = _time(new, args.rounds)
+        print(
+            f"{name:24s} legacy {old_s / calls * 1e6:7.2f} us/call  "
+            f"new {new_s / calls * 1e6:7.2f} us/call  x{old_s / new_s:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# backend/benchmarks/bench_pipeline.py
+# ------------------------------------------------------------
+# Extraction pipeline benchmark over backend/benchmarks/corpus.
+#   python -m backend.benchmarks.bench_pipeline [--iterations N] [--pages a,b]
+#       [--targets x,y] [--out FILE] [--compare BASELINE.json]
+# Run from the repo root (main.py mounts ./public).
+#
+# Per page x target: throughput (calls/s), p50/p95/p99/mean latency (ms) and
+# tracemalloc peak (KB, from a separate, untimed pass).
+# Targets:
+#   extract_og_tags / extract_media_metadata / extract_paragraph_like_block /
+#   extract_social_content_for_hf   each on RAW html (so each includes a parse)
+#   extract_page_record             what /summarize runs: one parse, shared
+#   summarize                       full /summarize handler, caches cleared
+#   summarize_cached                same handler answering from SUMMARY_CACHE
+# The handler fetches the corpus from a local aiohttp origin (the page's
+# real URL is kept, so platform detection behaves as in production).
+#
+# Results land in backend/.cache/bench/ as JSON unless --out says otherwise;
+# --compare prints each row's p50 against a previous run.
+# ------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+from aiohttp import web
+
+from backend import document, page_cache
+from backend.extract import (
+    extract_media_metadata,
+    extract_og_tags,
+    extract_paragraph_like_block,
+)
+from backend.logs import silenced
+from backend.pipeline import extract_page_record
+from backend.summarizer import extract_social_content_for_hf
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+RESULTS_DIR = Path(__file__).resolve().parents[1] / ".cache" / "bench"
+
+EXTRACTORS = {
+    "extract_og_tags": lambda html, url: extract_og_tags(html, url),
+    "extract_media_metadata": lambda html, url: extract_media_metadata(html, url),
+    "extract_paragraph_like_block": lambda html, url: extract_paragraph_like_block(html),
+    "extract_social_content_for_hf": extract_social_content_for_hf,
+    "extract_page_record": lambda html, url: extract_page_record(html, url),
+}
+HANDLER_TARGETS = ("summarize", "summarize_cached")
+ALL_TARGETS = tuple(EXTRACTORS) + HANDLER_TARGETS
+
+
+# ---------- corpus ----------
+def inflate_html(html: str, size: int) -> str:
+    """
+    Repeat the page's paragraph run until the page is ~size bytes. Pages with
+    no <p> run are padded with an HTML comment before </body> instead.
+    """
+    if len(html) >= size:
+        return html
+    start, end = html.find("<p>"), html.rfind("</p>")
+    if start < 0 or end < 0:
+        pad = f"<!-- {'x' * max(0, size - len(html) - 9)} -->"
+        at = html.rfind("</body>")
+        return html + pad if at < 0 else html[:at] + pad + html[at:]
+    end += len("</p>")
+    body = html[start:end]
+    copies = math.ceil((size - len(html)) / max(1, len(body)))
+    return html[:end] + body * copies + html[end:]
+
+
+def load_corpus(names: list[str] | None = None) -> list[dict]:
+    manifest = json.loads((CORPUS_DIR / "manifest.json").read_text(encoding="utf-8"))
+    pages = []
+    for entry in manifest["pages"]:
+        if names and entry["name"] not in names:
+            continue
+        html = (CORPUS_DIR / entry["file"]).read_text(encoding="utf-8")
+        if entry.get("inflate_to_bytes"):
+            html = inflate_html(html, int(entry["inflate_to_bytes"]))
+        pages.append({"name": entry["name"], "url": entry["url"], "html": html})
+    return pages
+
+
+# ---------- stats ----------
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize_samples(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "throughput_per_s": round(len(ordered) / total, 2) if total else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "mean_ms": round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+    }
+
+
+def _peak_kb(call, repeats: int) -> float:
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(repeats):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+async def _async_peak_kb(call, repeats: int) -> float:
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(repeats):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            await call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+# ---------- extractors ----------
+def bench_extractor(name: str, page: dict, iterations: int, memory_repeats: int) -> dict:
+    fn = EXTRACTORS[name]
+    html, url = page["html"], page["url"]
+    fn(html, url)  # WARM IMPORTS / REGEX CACHES
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(html, url)
+        samples.append(time.perf_counter() - start)
+
+    row = summarize_samples(samples)
+    row["peak_kb"] = _peak_kb(lambda: fn(html, url), memory_repeats)
+    return row
+
+
+# ---------- /summarize handler ----------
+async def _serve_corpus(pages: list[dict]):
+    by_name = {page["name"]: page["html"] for page in pages}
+
+    async def handler(request):
+        return web.Response(
+            text=by_name[request.match_info["name"]], content_type="text/html"
+        )
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, {page["url"]: f"http://127.0.0.1:{port}/{page['name']}" for page in pages}
+
+
+async def _bench_handlers(
+    pages: list[dict], targets: list[str], iterations: int, memory_repeats: int
+) -> list[dict]:
+    from backend import main, summarizer
+
+    runner, origin = await _serve_corpus(pages)
+
+    def local_stream_html(url, validators=None):
+        return summarizer.stream_html(origin.get(url, url), validators)
+
+    def clear_caches():
+        main.SUMMARY_CACHE.clear()
+        page_cache.PAGE_CACHE.clear()
+
+    rows = []
+    try:
+        with mock.patch.object(main, "stream_html", local_stream_html), silenced():
+            async with main.lifespan(main.app):
+                for page in pages:
+                    url = page["url"]
+                    for target in targets:
+                        cold = target == "summarize"
+
+                        async def call():
+                            if cold:
+                                clear_caches()
+                            return await main._summarize_cached(url)
+
+                        clear_caches()
+                        await call()  # WARM (AND FILL THE CACHE FOR summarize_cached)
+                        samples = []
+                        for _ in range(iterations):
+                            start = time.perf_counter()
+                            await call()
+                            samples.append(time.perf_counter() - start)
+
+                        row = summarize_samples(samples)
+                        row["peak_kb"] = await _async_peak_kb(call, memory_repeats)
+                        rows.append({"page": page["name"], "target": target, **row})
+    finally:
+        await runner.cleanup()
+    return rows
+
+
+# ---------- reporting ----------
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=CORPUS_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def environment() -> dict:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "git": _git_revision(),
+        "html_tree_builder": document.TREE_BUILDER,
+        "html_meta_engine": document.META_ENGINE,
+        "extract_pool": os.getenv("EXTRACT_POOL", "thread"),
+    }
+
+
+def print_table(rows: list[dict], baseline: dict | None = None):
+    header = f"{'page':24s} {'target':30s} {'ops/s':>10s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'peak KB':>9s}"
+    if baseline:
+        header += f" {'p50 vs base':>12s}"
+    print(header)
+    for row in rows:
+        line = (
+            f"{row['page']:24s} {row['target']:30s} {row['throughput_per_s']:10.1f} "
+            f"{row['p50_ms']:9.3f} {row['p95_ms']:9.3f} {row['p99_ms']:9.3f} {row['peak_kb']:9.1f}"
+        )
+        if baseline:
+            old = baseline.get((row["page"], row["target"]))
+            ratio = f"x{old / row['p50_ms']:.2f}" if old and row["p50_ms"] else "-"
+            line += f" {ratio:>12s}"
+        print(line)
+
+
+def _load_baseline(path: str) -> dict:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {(row["page"], row["target"]): row["p50_ms"] for row in data["results"]}
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(prog="bench_pipeline")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--memory-repeats", type=int, default=3)
+    parser.add_argument("--pages", default="", help="comma-separated corpus names")
+    parser.add_argument("--targets", default="", help="comma-separated; default all")
+    parser.add_argument("--out", default="", help="JSON results path")
+    parser.add_argument("--compare", default="", help="previous results JSON")
+    args = parser.parse_args(argv)
+
+    pages = load_corpus([p for p in args.pages.split(",") if p] or None)
+    targets = [t for t in args.targets.split(",") if t] or list(ALL_TARGETS)
+    unknown = sorted(set(targets) - set(ALL_TARGETS))
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+
+    rows = []
+    for page in pages:
+        for target in targets:
+            if target in EXTRACTORS:
+                row = bench_extractor(target, page, args.iterations, args.memory_repeats)
+                rows.append({"page": page["name"], "target": target, **row})
+
+    handler_targets = [t for t in targets if t in HANDLER_TARGETS]
+    if handler_targets:
+        rows += asyncio.run(
+            _bench_handlers(pages, handler_targets, args.iterations, args.memory_repeats)
+        )
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "iterations": args.iterations,
+        "environment": environment(),
+        "corpus": {page["name"]: len(page["html"].encode()) for page in pages},
+        "results": rows,
+    }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print_table(rows, _load_baseline(args.compare) if args.compare else None)
+    print(f"\nresults -> {out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# backend/benchmarks/legacy_cleaning.py
+# ------------------------------------------------------------
+# FROZEN copy of the caption cleaners as they were before backend/cleaning.py
+# (one re.sub per pattern, patterns re-looked-up per call, debug logging
+# dropped). Reference for backend/test_cleaning.py and bench_cleaning.py only;
+# nothing in the app imports this.
+# ------------------------------------------------------------
+
+import re
+
+IG_PREFIX_RE = re.compile(
+    r"^\s*[A-Za-z0-9_.]+\s+on\s+"
+    r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec|"
+    r"January|February|March|April|May|June|July|August|September|"
+    r"October|November|December)"
+    r"\s+\d{1,2},?\s+\d{4}:?\s*",
+    re.IGNORECASE,
+)
+IG_STATS_PREFIX_RE = re.compile(
+    r"^\s*(?:[\d,.]+(?:\.\d+)?[KMB]?\s+likes?,\s*)?"
+    r"[\d,.]+(?:\.\d+)?[KMB]?\s+comments?\s*[-–—]\s*",
+    re.IGNORECASE,
+)
+LIKED_BY_RE = re.compile(r"Liked by .*?(?: and \d+ others)?", re.IGNORECASE)
+LIKES_COUNT_RE = re.compile(r"\b\d[\d,]*\s+likes\b", re.IGNORECASE)
+TIME_AGO_RE = re.compile(r"\b\d{1,2}[smhdw]\s+ago\b", re.IGNORECASE)
+DATE_RE = re.compile(
+    r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]* "
+    r"\d{1,2},?\s+\d{4}\b",
+    re.IGNORECASE,
+)
+MENTION_RE = re.compile(r"@[\w.]+")
+HASHTAG_RE = re.compile(r"#[\w.]+")
+WHITESPACE_RE = re.compile(r"\s+")
+TRAILING_ELLIPSIS_RE = re.compile(r"(?:\s*(?:\.{3,}|…)+\s*)+$")
+TRAILING_PUNCT_RE = re.compile(r"\s+[^\w\s]+$")
+
+
+def end_on_solid_word(text: str) -> str:
+    if not text:
+        return ""
+
+    text = TRAILING_ELLIPSIS_RE.sub("", text).strip()
+    text = TRAILING_PUNCT_RE.sub("", text).strip()
+
+    return text
+
+
+def clean_social_caption(text: str) -> str:
+    if not text:
+        return ""
+
+    text = IG_STATS_PREFIX_RE.sub("", text, count=1)
+    if IG_PREFIX_RE.match(text):
+        text = IG_PREFIX_RE.sub("", text, count=1)
+
+    text = MENTION_RE.sub("", text)
+    text = HASHTAG_RE.sub("", text)
+    text = LIKED_BY_RE.sub("", text)
+    text = LIKES_COUNT_RE.sub("", text)
+    text = TIME_AGO_RE.sub("", text)
+    text = DATE_RE.sub("", text)
+
+    text = WHITESPACE_RE.sub(" ", text).strip()
+
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in {"'", '"'}:
+        text = text[1:-1].strip()
+
+    return end_on_solid_word(text)
+
+
+def clean_meta_description(desc: str) -> str:
+    text = (desc or "").strip()
+    text = IG_STATS_PREFIX_RE.sub("", text, count=1)
+    text = IG_PREFIX_RE.sub("", text, count=1)
+    text = re.sub(
+        r"^\s*[\d,.]+(?:\.\d+)?[KMB]?\s+(?:likes?|reactions?)\s*[-–—]\s*",
+        "",
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r"^\s*See\s+posts,\s+photos\s+and\s+more\s+on\s+Facebook\.?\s*",
+        "",
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r"^\s*(?:See|View)\s+.+?\s+(?:post|posts|photos?|videos?)\s+on\s+(?:Facebook|Instagram|Threads)\.?\s*",
+        "",
+        text,
+        flags=re.IGNORECASE,
+    )
+    text = re.sub(
+        r"\s*(?:Log in|Sign up)\s+to\s+(?:view|see).*$", "", text, flags=re.IGNORECASE
+    )
+    text = re.sub(r"\s+", " ", text)
+    text = text.strip()
+
+    if _looks_like_threads_chrome(text):
+        return ""
+
+    quoted = re.match(r"""^["'](.+?)["']\.?$""", text)
+    if quoted:
+        text = quoted.group(1).strip()
+
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in {"'", '"'}:
+        text = text[1:-1].strip()
+
+    return text
+
+
+def _looks_like_threads_chrome(text: str) -> bool:
+    lower = (text or "").lower()
+    if not lower:
+        return False
+
+    nav_hits = sum(
+        phrase in lower
+        for phrase in (
+            "home search",
+            "create notifications profile",
+            "back thread",
+            "like comment repost share",
+            "log in or sign up for threads",
+            "see what people are talking about",
+            "instagram log in with username",
+            "© 2026 threads",
+            "threads terms",
+        )
+    )
+    return nav_hits >= 2
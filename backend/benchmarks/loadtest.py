@@ -0,0 +1,486 @@
+# backend/benchmarks/loadtest.py
+# ------------------------------------------------------------
+# Load test for the FastAPI app without touching real sites or the real
+# Inference API.
+#   python -m backend.benchmarks.loadtest --rps 20 --duration 15 \
+#       --mix summarize=0.7,hf=0.2,batch=0.1
+# Run from the repo root (main.py mounts ./public).
+#
+# What runs, all in this process:
+# - ORIGIN: serves backend/benchmarks/corpus pages with configurable
+#   latency/jitter and size (--origin-latency-ms, --page-bytes). Each request
+#   URL gets ?v=N, stamped into the page's title/description so each URL
+#   (and its Pegasus prompt) is distinct; --distinct-urls caps N to model
+#   cache hits.
+# - FAKE HF: answers POST /pipeline/... and /models/... with a weighted mix
+#   of 200 / 503 (model loading) / 429 (rate limited) / slow 200
+#   (--hf-mix, --hf-latency-ms, --hf-slow-ms). The app's HF endpoints are
+#   pointed at it the way HF_INFERENCE_BASE would, and Pegasus results stay
+#   in memory instead of the on-disk HF cache.
+# - THE APP: uvicorn on its own thread and event loop, lifespan included.
+#   A probe on that loop records event-loop lag (sleep overshoot).
+# Corpus URLs keep their real hosts (instagram.com, ...) so platform
+# detection behaves as in production; page fetches are routed to the origin.
+#
+# The driver is open-loop: request i is due at start + i/rps whether or not
+# earlier ones finished, and latency counts from that due time, so a slow
+# server can't hide its queueing (no coordinated omission).
+#
+# Per endpoint: throughput, p50/p95/p99/max latency, error rate (HTTP >= 400,
+# timeouts, connection errors) and degraded rate (200 with an error/fallback
+# answer). Results go to backend/.cache/bench/ as JSON unless --out says so.
+# ------------------------------------------------------------
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+from aiohttp import web
+
+from backend.fallbacks import WEIRDLINK_TAKEAWAYS
+from backend.logs import silenced
+from backend.benchmarks.bench_pipeline import (
+    RESULTS_DIR,
+    environment,
+    inflate_html,
+    load_corpus,
+    percentile,
+)
+
+ENDPOINTS = {
+    "summarize": "/summarize",
+    "hf": "/summarize/hf",
+    "batch": "/summarize/batch",
+    "batch_stream": "/summarize/batch/stream",
+}
+HF_OUTCOMES = ("200", "503", "429", "slow")
+OG_DESCRIPTION_RE = re.compile(r'(property="og:description" content="[^"]*)(")')
+
+
+def parse_mix(text: str, allowed) -> dict[str, float]:
+    """'a=0.7,b=0.3' -> {'a': 0.7, 'b': 0.3}; weights needn't sum to 1."""
+    mix = {}
+    for part in (text or "").split(","):
+        name, _, weight = part.strip().partition("=")
+        if not name:
+            continue
+        if name not in allowed:
+            raise ValueError(f"unknown mix entry {name!r} (allowed: {', '.join(allowed)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"empty mix: {text!r}")
+    return mix
+
+
+def _pick(rng: random.Random, mix: dict[str, float]) -> str:
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+# ---------- stand-in servers ----------
+class Origin:
+    def __init__(
+        self, pages: list[dict], latency_ms: float, jitter_ms: float, page_bytes: int
+    ):
+        self.pages = {}
+        for page in pages:
+            html = page["html"]
+            if page_bytes:
+                html = inflate_html(html, page_bytes)
+            self.pages[page["name"]] = html
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rng = random.Random(0)
+        self.hits = 0
+        self.bytes_sent = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        html = self.pages[request.match_info["name"]]
+        variant = request.query.get("v")
+        if variant:
+            # A different description/title per URL, so every URL is its own
+            # prompt; suffixes leave the IG/FB prefix stripping untouched.
+            html = OG_DESCRIPTION_RE.sub(rf"\g<1> (edition {variant})\g<2>", html, count=1)
+            html = html.replace("<title>", f"<title>Edition {variant} · ", 1)
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        body = html.encode("utf-8")
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="text/html", charset="utf-8")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/page/{name}", self.handle)
+        return app
+
+
+class FakeHF:
+    def __init__(self, mix: dict[str, float], latency_ms: float, slow_ms: float, seed: int):
+        self.mix = mix
+        self.latency = latency_ms / 1000
+        self.slow = slow_ms / 1000
+        self.rng = random.Random(seed)
+        self.outcomes = {name: 0 for name in HF_OUTCOMES}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        outcome = _pick(self.rng, self.mix)
+        self.outcomes[outcome] += 1
+
+        await asyncio.sleep(self.slow if outcome == "slow" else self.latency)
+        if outcome == "503":
+            return web.json_response(
+                {"error": "Model is currently loading", "estimated_time": 20.0},
+                status=503,
+            )
+        if outcome == "429":
+            return web.json_response(
+                {"error": "Rate limit reached"}, status=429, headers={"Retry-After": "1"}
+            )
+        # Reuse the source's own words so enforce_source_vocab keeps them
+        words = " ".join(str(payload.get("inputs", "")).split()[-40:])
+        return web.json_response([{"summary_text": words[:200] or "Summary."}])
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=4 * 1024 * 1024)
+        app.router.add_post("/pipeline/text2text-generation/{model:.+}", self.handle)
+        app.router.add_post("/models/{model:.+}", self.handle)
+        return app
+
+
+async def _start(app: web.Application) -> tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+# ---------- the app, on its own loop ----------
+class AppServer:
+    def __init__(self, app):
+        import uvicorn
+
+        self.server = uvicorn.Server(
+            uvicorn.Config(
+                app,
+                host="127.0.0.1",
+                port=0,
+                lifespan="on",
+                log_level="warning",
+                access_log=False,
+            )
+        )
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.thread = threading.Thread(target=self._run, name="loadtest-app", daemon=True)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self, timeout: float = 30.0) -> str:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("app server failed to start")
+            time.sleep(0.02)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=15)
+
+
+async def probe_loop_lag(samples: list[float], interval: float = 0.05):
+    """Runs ON the app's loop: how late does a timer fire?"""
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - due))
+
+
+# ---------- driver ----------
+def _stats(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+
+
+def _degraded(endpoint: str, body, fallback_summaries: frozenset[str]) -> bool:
+    if endpoint == "summarize":
+        return (body.get("debug") or {}).get("error") is not None
+    if endpoint == "hf":
+        # used_huggingface stays true when a quip stood in for Pegasus
+        return not body.get("used_huggingface") or body.get("summary") in fallback_summaries
+    items = body.get("results", body) if endpoint == "batch" else body
+    return any(not item.get("ok") for item in items)
+
+
+async def _fire(session, base: str, endpoint: str, payload: dict, timeout: float):
+    url = base + ENDPOINTS[endpoint]
+    async with session.post(
+        url, json=payload, timeout=aiohttp.ClientTimeout(total=timeout)
+    ) as r:
+        if endpoint == "batch_stream":
+            body = [json.loads(line) async for line in r.content if line.strip()]
+        else:
+            body = await r.json(content_type=None)
+        return r.status, body
+
+
+async def drive(
+    base: str,
+    urls: list[str],
+    mix: dict[str, float],
+    rps: float,
+    duration: float,
+    batch_size: int,
+    distinct_urls: int,
+    timeout: float,
+    seed: int,
+    fallback_summaries: frozenset[str] = frozenset(),
+) -> tuple[list[dict], float]:
+    rng = random.Random(seed)
+    total = max(1, int(rps * duration))
+    records: list[dict] = []
+    connector = aiohttp.TCPConnector(limit=0)
+
+    def next_url(i: int) -> str:
+        variant = i % distinct_urls if distinct_urls else i
+        page = urls[i % len(urls)]
+        return f"{page}{'&' if '?' in page else '?'}v={variant}"
+
+    async def one(i: int, due: float, endpoint: str):
+        if endpoint in {"batch", "batch_stream"}:
+            payload = {"urls": [next_url(i * batch_size + k) for k in range(batch_size)]}
+        else:
+            payload = {"url": next_url(i)}
+        record = {"endpoint": endpoint, "status": 0, "error": "", "degraded": False}
+        try:
+            status, body = await _fire(session, base, endpoint, payload, timeout)
+            record["status"] = status
+            if status >= 400:
+                record["error"] = f"http {status}"
+            else:
+                record["degraded"] = _degraded(endpoint, body, fallback_summaries)
+        except asyncio.TimeoutError:
+            record["error"] = "timeout"
+        except (aiohttp.ClientError, ValueError) as e:  # ValueError: UNPARSEABLE BODY
+            record["error"] = type(e).__name__
+        record["latency"] = time.perf_counter() - due
+        records.append(record)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            due = start + i / rps
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i, due, _pick(rng, mix))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return records, elapsed
+
+
+def report(records: list[dict], elapsed: float, lag: list[float]) -> dict:
+    endpoints = {}
+    for name in ENDPOINTS:
+        rows = [r for r in records if r["endpoint"] == name]
+        if not rows:
+            continue
+        errors = [r for r in rows if r["error"]]
+        endpoints[name] = {
+            "sent": len(rows),
+            "ok": len(rows) - len(errors),
+            "errors": len(errors),
+            "error_rate": round(len(errors) / len(rows), 4),
+            "degraded_rate": round(sum(r["degraded"] for r in rows) / len(rows), 4),
+            "throughput_per_s": round((len(rows) - len(errors)) / elapsed, 2),
+            "error_kinds": {
+                kind: sum(r["error"] == kind for r in errors)
+                for kind in sorted({r["error"] for r in errors})
+            },
+            **_stats([r["latency"] for r in rows]),
+        }
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "endpoints": endpoints,
+        "event_loop_lag": {"samples": len(lag), **_stats(lag)},
+    }
+
+
+def print_report(result: dict):
+    print(
+        f"{'endpoint':14s} {'sent':>6s} {'ok/s':>8s} {'err%':>7s} {'degr%':>7s} "
+        f"{'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}"
+    )
+    for name, row in result["endpoints"].items():
+        print(
+            f"{name:14s} {row['sent']:6d} {row['throughput_per_s']:8.1f} "
+            f"{row['error_rate'] * 100:7.2f} {row['degraded_rate'] * 100:7.2f} "
+            f"{row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f} {row['max_ms']:9.1f}"
+        )
+    lag = result["event_loop_lag"]
+    print(
+        f"\nevent-loop lag: p50 {lag['p50_ms']} ms, p99 {lag['p99_ms']} ms, "
+        f"max {lag['max_ms']} ms ({lag['samples']} samples)"
+    )
+    print(f"fake HF outcomes: {result['fake_hf']['outcomes']}")
+    print(f"origin: {result['origin']['hits']} hits, {result['origin']['bytes_sent']} bytes")
+
+
+async def run(args) -> dict:
+    pages = load_corpus([p for p in args.pages.split(",") if p] or None)
+    mix = parse_mix(args.mix, ENDPOINTS)
+    hf_mix = parse_mix(args.hf_mix, HF_OUTCOMES)
+
+    origin = Origin(pages, args.origin_latency_ms, args.origin_jitter_ms, args.page_bytes)
+    fake_hf = FakeHF(hf_mix, args.hf_latency_ms, args.hf_slow_ms, args.seed)
+    origin_runner, origin_base = await _start(origin.app())
+    hf_runner, hf_base = await _start(fake_hf.app())
+
+    os.environ.setdefault("HF_ACCESS_TOKEN", "loadtest")
+    from backend import main, summarizer
+    from backend.cache import TieredCache, TTLCache
+
+    # summarizer may already be imported (bench_pipeline imports it), so point
+    # the HF_INFERENCE_BASE-derived endpoints at the fake server directly, and
+    # keep Pegasus results out of the real on-disk cache.
+    hf_cache = TieredCache(
+        TTLCache(
+            max_entries=summarizer.HF_CACHE_MEMORY_ENTRIES,
+            default_ttl=summarizer.HF_CACHE_TTL_SECONDS,
+        )
+    )
+    hf_overrides = {
+        "HF_INFERENCE_BASE": hf_base,
+        "PIPELINE_BASE": f"{hf_base}/pipeline/text2text-generation",
+        "MODELS_BASE": f"{hf_base}/models",
+        "HF_SUMMARY_CACHE": hf_cache,
+    }
+
+    fallback_summaries = frozenset(main.trim_to_280(q) for q in WEIRDLINK_TAKEAWAYS)
+    by_url = {page["url"]: f"{origin_base}/page/{page['name']}" for page in pages}
+
+    def routed_stream_html(url, validators=None):
+        parts = urlsplit(url)
+        base = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+        target = by_url.get(base)
+        if target:
+            url = f"{target}?{parts.query}" if parts.query else target
+        return summarizer.stream_html(url, validators)
+
+    lag: list[float] = []
+    server = AppServer(main.app)
+    try:
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(mock.patch.object(main, "stream_html", routed_stream_html))
+            stack.enter_context(mock.patch.object(main, "HF_SUMMARY_CACHE", hf_cache))
+            stack.enter_context(mock.patch.multiple(summarizer, **hf_overrides))
+            if not args.verbose:
+                stack.enter_context(silenced())
+            app_base = await asyncio.to_thread(server.start)
+            probe = asyncio.run_coroutine_threadsafe(probe_loop_lag(lag), server.loop)
+            try:
+                records, elapsed = await drive(
+                    app_base,
+                    [page["url"] for page in pages],
+                    mix,
+                    args.rps,
+                    args.duration,
+                    args.batch_size,
+                    args.distinct_urls,
+                    args.timeout,
+                    args.seed,
+                    fallback_summaries,
+                )
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"{app_base}/debug/cache") as r:
+                        app_cache = await r.json()
+                    async with session.get(f"{app_base}/debug/hf-health") as r:
+                        app_hf_health = await r.json()
+            finally:
+                probe.cancel()
+                await asyncio.to_thread(server.stop)
+    finally:
+        await origin_runner.cleanup()
+        await hf_runner.cleanup()
+
+    result = report(records, elapsed, lag)
+    result["fake_hf"] = {"outcomes": fake_hf.outcomes}
+    result["origin"] = {"hits": origin.hits, "bytes_sent": origin.bytes_sent}
+    result["app"] = {"cache": app_cache, "hf_health": app_hf_health}
+    return result
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(prog="loadtest")
+    parser.add_argument("--rps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of arrivals")
+    parser.add_argument("--mix", default="summarize=1", help=f"weights over {','.join(ENDPOINTS)}")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--distinct-urls", type=int, default=0, help="0: every URL unique")
+    parser.add_argument("--pages", default="", help="comma-separated corpus names")
+    parser.add_argument("--origin-latency-ms", type=float, default=50.0)
+    parser.add_argument("--origin-jitter-ms", type=float, default=25.0)
+    parser.add_argument("--page-bytes", type=int, default=0, help="inflate every page to this size")
+    parser.add_argument("--hf-mix", default="200=0.85,503=0.08,429=0.05,slow=0.02")
+    parser.add_argument("--hf-latency-ms", type=float, default=400.0)
+    parser.add_argument("--hf-slow-ms", type=float, default=15000.0)
+    parser.add_argument("--timeout", type=float, default=90.0, help="per request, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's own logs")
+    args = parser.parse_args(argv)
+    try:
+        parse_mix(args.mix, ENDPOINTS)
+        parse_mix(args.hf_mix, HF_OUTCOMES)
+    except ValueError as e:
+        parser.error(str(e))
+
+    result = asyncio.run(run(args))
+    report_doc = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "argv": sys.argv[1:] if argv is None else argv,
+        "environment": environment(),
+        **result,
+    }
+
+    out = (
+        Path(args.out)
+        if args.out
+        else RESULTS_DIR / f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report_doc, indent=2), encoding="utf-8")
+
+    print_report(result)
+    print(f"\nresults -> {out}")
+    return report_doc
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# backend/cache.py
+# ------------------------------------------------------------
+# Small caches.
+# - TTLCache: LRU-bounded map with per-entry TTLs + hit/miss counters
+#   (optionally also bounded by total weight, e.g. bytes of cached HTML)
+# - SqliteTTLStore: the same contract on disk (survives restarts)
+# - TieredCache: TTLCache in front of a SqliteTTLStore, async API
+#   (SQLite calls run via asyncio.to_thread, never on the event loop)
+# ------------------------------------------------------------
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    LRU-bounded mapping whose entries expire after a per-entry TTL (seconds).
+    Reads refresh recency; writes past `max_entries` (or past `max_weight`,
+    summed over `weigh(value)`) evict the least recent.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        default_ttl: float = 300.0,
+        max_weight: int | None = None,
+        weigh: Callable[[Any], int] | None = None,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.max_weight = max_weight
+        self.weigh = weigh or (lambda value: 0)
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _drop(self, key: Hashable) -> Any:
+        _, value = self._data.pop(key)
+        self.weight -= self.weigh(value)
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if key in self._data:
+            self._drop(key)
+        if ttl <= 0:
+            return
+        weight = self.weigh(value)
+        if self.max_weight is not None and weight > self.max_weight:
+            return  # WOULD EVICT EVERYTHING ELSE AND STILL NOT FIT
+        self._data[key] = (time.monotonic() + ttl, value)
+        self.weight += weight
+        while len(self._data) > self.max_entries or (
+            self.max_weight is not None and self.weight > self.max_weight
+        ):
+            self._drop(next(iter(self._data)))
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self._data:
+            return default
+        return self._drop(key)
+
+    def clear(self):
+        self._data.clear()
+        self.weight = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "weight": self.weight,
+            "max_weight": self.max_weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SqliteTTLStore:
+    """
+    JSON values in one SQLite table, keyed by string. Expiry uses wall-clock
+    time so entries stay valid across restarts; past `max_entries` the least
+    recently read rows go first. Calls are blocking and serialized by a lock.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, default_ttl: float = 86400.0):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        """(value, seconds left) or None."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET used_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0]), row[1] - now
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, used_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM entries WHERE key IN"
+                    " (SELECT key FROM entries ORDER BY used_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            (size,) = self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "size": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """
+    Memory first, then disk. Disk hits are copied back into memory for the
+    rest of their lifetime. `disk=None` makes it a plain async TTLCache.
+    """
+
+    def __init__(self, memory: TTLCache, disk: SqliteTTLStore | None = None):
+        self.memory = memory
+        self.disk = disk
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return default if value is None else value
+
+        found = await asyncio.to_thread(self.disk.get, key)
+        if found is None:
+            return default
+        value, ttl_left = found
+        self.memory.set(key, value, min(ttl_left, self.memory.default_ttl))
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float | None = None):
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, ttl)
+
+    async def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.clear)
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    async def stats(self) -> dict[str, Any]:
+        out = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            out["disk"] = await asyncio.to_thread(self.disk.stats)
+        return out
@@ -0,0 +1,165 @@
+# backend/cleaning.py
+# ------------------------------------------------------------
+# Caption / meta-description cleaning shared by extract.py and
+# summarizer.py (both re-export what they used to define).
+# - clean_meta_description(desc): OG descriptions on Meta platforms
+# - strip_caption_noise(text): mentions, hashtags, "Liked by ...",
+#   like counts, "5m ago", dates -- ONE regex pass
+# - end_on_solid_word(text)
+# Every pattern is compiled once, here.
+# ------------------------------------------------------------
+
+import re
+
+_MONTHS_SHORT = r"Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec"
+_MONTHS_LONG = (
+    r"January|February|March|April|May|June|July|August|September|"
+    r"October|November|December"
+)
+
+# ---- IG / META PREFIXES ----
+# "1,234 likes, 56 comments - "
+IG_STATS_PREFIX_RE = re.compile(
+    r"^\s*(?:[\d,.]+(?:\.\d+)?[KMB]?\s+likes?,\s*)?"
+    r"[\d,.]+(?:\.\d+)?[KMB]?\s+comments?\s*[-–—]\s*",
+    re.IGNORECASE,
+)
+
+# "schimpfstagram on December 11, 2025: "
+IG_AUTHOR_DATE_PREFIX_RE = re.compile(
+    r"^\s*[A-Za-z0-9_.]+\s+on\s+"
+    rf"(?:{_MONTHS_SHORT}|{_MONTHS_LONG})"
+    r"\s+\d{1,2},?\s+\d{4}:?\s*",
+    re.IGNORECASE,
+)
+IG_PREFIX_RE = IG_AUTHOR_DATE_PREFIX_RE  # summarizer.py's historical name
+
+META_REACTIONS_PREFIX_RE = re.compile(
+    r"^\s*[\d,.]+(?:\.\d+)?[KMB]?\s+(?:likes?|reactions?)\s*[-–—]\s*",
+    re.IGNORECASE,
+)
+FB_SEE_POSTS_PREFIX_RE = re.compile(
+    r"^\s*See\s+posts,\s+photos\s+and\s+more\s+on\s+Facebook\.?\s*",
+    re.IGNORECASE,
+)
+SEE_ON_PLATFORM_PREFIX_RE = re.compile(
+    r"^\s*(?:See|View)\s+.+?\s+(?:post|posts|photos?|videos?)\s+on\s+"
+    r"(?:Facebook|Instagram|Threads)\.?\s*",
+    re.IGNORECASE,
+)
+LOGIN_WALL_SUFFIX_RE = re.compile(
+    r"\s*(?:Log in|Sign up)\s+to\s+(?:view|see).*$", re.IGNORECASE
+)
+QUOTED_RE = re.compile(r"""^["'](.+?)["']\.?$""")
+
+# ---- CAPTION NOISE (ALSO USABLE ONE AT A TIME) ----
+MENTION_RE = re.compile(r"@[\w.]+")
+HASHTAG_RE = re.compile(r"#[\w.]+")
+LIKED_BY_RE = re.compile(r"Liked by .*?(?: and \d+ others)?", re.IGNORECASE)
+LIKES_COUNT_RE = re.compile(r"\b\d[\d,]*\s+likes\b", re.IGNORECASE)
+TIME_AGO_RE = re.compile(r"\b\d{1,2}[smhdw]\s+ago\b", re.IGNORECASE)
+DATE_RE = re.compile(
+    rf"\b(?:{_MONTHS_SHORT})[a-z]* \d{{1,2}},?\s+\d{{4}}\b",
+    re.IGNORECASE,
+)
+WHITESPACE_RE = re.compile(r"\s+")
+
+# ALL SIX ABOVE AS ONE ALTERNATION. Historically they ran one after another,
+# mentions/hashtags first, so "Liked by @ana and 3 others" lost "@ana" before
+# LIKED_BY_RE looked at it and the " and 3 others" tail then matched too. The
+# Liked-by branch swallows any @/# tokens in that gap to give the same result.
+# Likewise like counts ran before dates, so "Jan 5, 2024 likes" lost
+# "2024 likes" and kept "Jan 5, ": the date branch steps aside there.
+# No other branch can contain '@' or '#', or overlap another, so
+# leftmost-first matching removes the same spans the sequential passes did
+# (backend/test_cleaning.py checks this against the old implementation).
+# What one pass can't reproduce is a deletion gluing its neighbours into a
+# NEW match ("12 #tag likes" -> "12  likes" -> ""). Those keep the one-pass
+# output: "12 #tag likes" -> "12 likes", "2h Liked by ago" -> "2h ago",
+# "Jan 5, 2024 @ana likes" -> "likes" (the old passes gave "", "" and
+# "Jan 5,"). Everywhere else the outputs are identical; both are pinned in
+# backend/test_cleaning.py.
+# The leading lookahead lets the scanner skip, in C, every position that
+# can't start any branch; the digit and month branches are factored so a
+# miss is cheap too.
+CAPTION_NOISE_RE = re.compile(
+    r"(?=[@#\dLJFMASOND])(?:"
+    r"[@#][\w.]+"
+    r"|Liked by (?:[@#][\w.]+)*(?: and \d+ others)?"
+    r"|\b\d(?:[\d,]*\s+likes\b|\d?[smhdw]\s+ago\b)"
+    r"|\b(?:Jan|Feb|Ma[ry]|Apr|Ju[nl]|Aug|Sept?|Oct|Nov|Dec)[a-z]* \d{1,2},?\s+\d{4}\b"
+    r"(?![\d,]*\s+likes\b)"
+    r")",
+    re.IGNORECASE,
+)
+
+TRAILING_ELLIPSIS_RE = re.compile(r"(?:\s*(?:\.{3,}|…)+\s*)+$")
+TRAILING_PUNCT_RE = re.compile(r"\s+[^\w\s]+$")
+
+THREADS_CHROME_PHRASES = (
+    "home search",
+    "create notifications profile",
+    "back thread",
+    "like comment repost share",
+    "log in or sign up for threads",
+    "see what people are talking about",
+    "instagram log in with username",
+    "© 2026 threads",
+    "threads terms",
+)
+
+
+def collapse_whitespace(text: str) -> str:
+    """Same as WHITESPACE_RE.sub(" ", text).strip(), without the regex."""
+    return " ".join(text.split())
+
+
+def strip_caption_noise(text: str) -> str:
+    return CAPTION_NOISE_RE.sub("", text)
+
+
+def end_on_solid_word(text: str) -> str:
+    if not text:
+        return ""
+
+    text = TRAILING_ELLIPSIS_RE.sub("", text).strip()
+    text = TRAILING_PUNCT_RE.sub("", text).strip()
+
+    return text
+
+
+def strip_matching_quotes(text: str) -> str:
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in {"'", '"'}:
+        return text[1:-1].strip()
+    return text
+
+
+def looks_like_threads_chrome(text: str) -> bool:
+    lower = (text or "").lower()
+    if not lower:
+        return False
+    return sum(phrase in lower for phrase in THREADS_CHROME_PHRASES) >= 2
+
+
+def clean_meta_description(desc: str) -> str:
+    """
+    Meta properties often prefix OG descriptions with engagement stats, author/date
+    boilerplate, and login/share chrome. Strip that so the app shows the post copy.
+    """
+    text = (desc or "").strip()
+    text = IG_STATS_PREFIX_RE.sub("", text, count=1)
+    text = IG_AUTHOR_DATE_PREFIX_RE.sub("", text, count=1)
+    text = META_REACTIONS_PREFIX_RE.sub("", text)
+    text = FB_SEE_POSTS_PREFIX_RE.sub("", text)
+    text = SEE_ON_PLATFORM_PREFIX_RE.sub("", text)
+    text = LOGIN_WALL_SUFFIX_RE.sub("", text)
+    text = collapse_whitespace(text)
+
+    if looks_like_threads_chrome(text):
+        return ""
+
+    quoted = QUOTED_RE.match(text)
+    if quoted:
+        text = quoted.group(1).strip()
+
+    return strip_matching_quotes(text)
@@ -0,0 +1,18 @@
+import pytest
+
+from backend import main, summarizer
+from backend.cache import TieredCache, TTLCache
+
+
+@pytest.fixture(autouse=True)
+def memory_hf_cache(monkeypatch):
+    """Every test gets an empty, memory-only HF summary cache (never the SQLite file)."""
+    cache = TieredCache(
+        TTLCache(
+            max_entries=summarizer.HF_CACHE_MEMORY_ENTRIES,
+            default_ttl=summarizer.HF_CACHE_TTL_SECONDS,
+        )
+    )
+    monkeypatch.setattr(summarizer, "HF_SUMMARY_CACHE", cache)
+    monkeypatch.setattr(main, "HF_SUMMARY_CACHE", cache)
+    return cache
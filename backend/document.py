@@ -0,0 +1,182 @@
+# backend/document.py
+# ------------------------------------------------------------
+# One parse per request.
+# - parse_document(html) -> ParsedDocument (soup built lazily, once)
+# - as_document(html_or_doc) lets extractors accept either form
+# Extractors memoize derived lookups on the document so calling
+# several of them on the same page never repeats the work.
+#
+# PARSER BACKEND (backend/.env):
+#   HTML_PARSER=auto         (DEFAULT: fastest installed engines)
+#   HTML_PARSER=lxml         (lxml tree builder, soup for meta lookups)
+#   HTML_PARSER=selectolax   (selectolax meta index, html.parser tree)
+#   HTML_PARSER=html.parser  (stdlib only — the original behavior)
+# lxml/selectolax are in requirements.txt; if one is missing the choice falls
+# back to html.parser. Startup logs which engines were picked.
+# ------------------------------------------------------------
+
+import importlib.util
+import os
+import time
+from typing import Any, Callable, Hashable
+
+from bs4 import BeautifulSoup
+
+HTML_PARSER = os.getenv("HTML_PARSER", "auto").strip().lower()
+
+
+def _installed(module: str) -> bool:
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ImportError:
+        return False
+
+
+def _resolve_tree_builder(choice: str) -> str:
+    if choice in {"auto", "lxml"} and _installed("lxml"):
+        return "lxml"
+    return "html.parser"
+
+
+def _resolve_meta_engine(choice: str) -> str:
+    if choice in {"auto", "selectolax"} and _installed("selectolax"):
+        return "selectolax"
+    return "soup"
+
+
+TREE_BUILDER = _resolve_tree_builder(HTML_PARSER)
+META_ENGINE = _resolve_meta_engine(HTML_PARSER)
+
+
+class ParsedDocument:
+    """
+    Raw HTML plus its (lazily built) soup and a memo of derived lookups.
+    Treat the soup as read-only: every extractor in the request shares it.
+
+    <meta>, <link> and <script> lookups go through a flat index built in one
+    pass, so callers that only need meta tags never build the full tree when
+    the selectolax engine is available.
+    """
+
+    __slots__ = ("html", "_soup", "_memo", "_metas", "_links", "_scripts", "parse_seconds")
+
+    def __init__(self, html: str):
+        self.html = html or ""
+        self._soup: BeautifulSoup | None = None
+        self._memo: dict[Hashable, Any] = {}
+        self._metas: dict[tuple[str, str], str] | None = None
+        self._links: list[tuple[str, list[str]]] = []
+        self._scripts: list[tuple[str, str]] = []
+        self.parse_seconds = 0.0  # SOUP + SELECTOLAX TREE BUILDS, FOR /metrics
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            started = time.perf_counter()
+            self._soup = BeautifulSoup(self.html, TREE_BUILDER)
+            self.parse_seconds += time.perf_counter() - started
+        return self._soup
+
+    def memo(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    # ---- META / LINK / SCRIPT INDEX ----
+    def meta(self, attr: str, key: str) -> str:
+        """
+        content="" of the FIRST <meta attr="key"> (same as soup.find), or "".
+        """
+        self._ensure_index()
+        return self._metas.get((attr, key), "")
+
+    def first_meta_content(self, keys: list[str]) -> str:
+        for key in keys:
+            for attr in ("property", "name"):
+                val = self.meta(attr, key).strip()
+                if val:
+                    return val
+        return ""
+
+    def links(self) -> list[tuple[str, list[str]]]:
+        """(href, lowercased rel tokens) for every <link>, in document order."""
+        self._ensure_index()
+        return self._links
+
+    def script_texts(self, type_: str | None = None) -> list[str]:
+        """Raw text of every <script> (optionally of one type), in document order."""
+        self._ensure_index()
+        return [
+            text for kind, text in self._scripts if type_ is None or kind == type_
+        ]
+
+    def _ensure_index(self):
+        if self._metas is not None:
+            return
+        self._metas = {}
+        if META_ENGINE == "selectolax" and self._soup is None:
+            self._index_with_selectolax()
+        else:
+            self._index_with_soup()
+
+    def _add_meta(self, attrs: dict):
+        content = attrs.get("content")
+        for attr in ("property", "name"):
+            key = attrs.get(attr)
+            if isinstance(key, str):
+                self._metas.setdefault(
+                    (attr, key), content if isinstance(content, str) else ""
+                )
+
+    def _add_link(self, href, rel):
+        if isinstance(rel, str):
+            rels = rel.lower().split()
+        else:
+            rels = [str(r).lower() for r in (rel or [])]
+        self._links.append(((href or "").strip(), rels))
+
+    def _index_with_soup(self):
+        for tag in self.soup.find_all(["meta", "link", "script"]):
+            if tag.name == "meta":
+                self._add_meta(tag.attrs)
+            elif tag.name == "link":
+                self._add_link(tag.get("href"), tag.get("rel"))
+            else:
+                text = tag.string or tag.get_text() or ""
+                self._scripts.append((tag.get("type") or "", text))
+
+    def _index_with_selectolax(self):
+        started = time.perf_counter()
+        tree = _selectolax_parser()(self.html)
+        self.parse_seconds += time.perf_counter() - started
+        for node in tree.css("meta, link, script"):
+            attrs = node.attributes
+            if node.tag == "meta":
+                self._add_meta(attrs)
+            elif node.tag == "link":
+                self._add_link(attrs.get("href"), attrs.get("rel"))
+            else:
+                self._scripts.append(
+                    (attrs.get("type") or "", node.text(deep=True) or "")
+                )
+
+
+def _selectolax_parser():
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+
+        return LexborHTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+
+        return HTMLParser
+
+
+def parse_document(html: str) -> ParsedDocument:
+    return ParsedDocument(html)
+
+
+def as_document(html: "str | ParsedDocument | None") -> ParsedDocument:
+    if isinstance(html, ParsedDocument):
+        return html
+    return ParsedDocument(html or "")
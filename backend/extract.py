@@ -3,83 +3,67 @@
 # Pure OG/meta extractor (no fallback loops here)
 # - extract_og_tags(html, url) -> (og_image or "", og_description or "")
 # - extract_paragraph_like_block(html) -> str (light heuristic)
+# Every extractor accepts raw HTML or a ParsedDocument; pass the same
+# document to all of them so the page is only parsed once per request.
 # ------------------------------------------------------------
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
 from urllib.parse import urljoin, urlparse
 import json
 import re
 from typing import Any, Tuple
 
-
-IG_STATS_PREFIX_RE = re.compile(
-    r"^\s*(?:[\d,.]+(?:\.\d+)?[KMB]?\s+likes?,\s*)?"
-    r"[\d,.]+(?:\.\d+)?[KMB]?\s+comments?\s*[-–—]\s*",
-    re.IGNORECASE,
-)
-
-IG_AUTHOR_DATE_PREFIX_RE = re.compile(
-    r"^\s*[A-Za-z0-9_.]+\s+on\s+"
-    r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec|"
-    r"January|February|March|April|May|June|July|August|September|"
-    r"October|November|December)"
-    r"\s+\d{1,2},?\s+\d{4}:?\s*",
-    re.IGNORECASE,
+from .cleaning import (  # noqa: F401 (RE-EXPORTED)
+    IG_AUTHOR_DATE_PREFIX_RE,
+    IG_STATS_PREFIX_RE,
+    clean_meta_description,
 )
+from .cleaning import looks_like_threads_chrome as _looks_like_threads_chrome
+from .document import ParsedDocument, as_document
 
 
 # ---- OG/TWITTER TAG EXTRACTOR ----
-def extract_og_tags(html: str, url: str = "") -> Tuple[str, str]:
+def extract_og_tags(
+    html: str | ParsedDocument, url: str = ""
+) -> Tuple[str, str]:
     """
     Extract Open Graph/Twitter IMAGE + DESCRIPTION from raw HTML.
     - If no image is found, return "" (caller handles fallback).
     - Description may come from og:description or twitter:description.
     """
-    soup = BeautifulSoup(html or "", "html.parser")
+    doc = as_document(html)
+    return doc.memo(("og_tags", url), lambda: _og_tags_from_document(doc, url))
+
+
+def _og_tags_from_document(doc: ParsedDocument, url: str) -> Tuple[str, str]:
     platform = detect_platform(url)
     is_meta_platform = platform in {"instagram", "facebook", "threads"}
 
     if platform == "twitter":
         return "", ""
 
-    def _first_meta_content(keys: list[str]) -> str:
-        for key in keys:
-            tag = soup.find("meta", attrs={"property": key})
-            if tag and tag.get("content"):
-                val = tag["content"].strip()
-                if val:
-                    return val
-            tag = soup.find("meta", attrs={"name": key})
-            if tag and tag.get("content"):
-                val = tag["content"].strip()
-                if val:
-                    return val
-        return ""
-
     # Instagram's OG image can be a square crop. Use full-size media only when it
     # comes from the exact post object for this shortcode; otherwise trust OG/Twitter.
     img = ""
     if platform == "instagram":
-        img = _first_instagram_post_image(html or "", url)
+        img = _first_instagram_post_image(doc, url)
     elif platform == "facebook":
-        img = _facebook_formatted_background_image(html or "", url)
+        img = _facebook_formatted_background_image(doc, url)
     if not img:
-        img = _first_meta_content(
+        img = doc.first_meta_content(
             ["og:image", "og:image:secure_url", "twitter:image", "twitter:image:src"]
         )
 
     if not img and not is_meta_platform:
-        img = _site_icon_from_soup(soup, url)
+        img = _site_icon_from_document(doc, url)
 
     if img:
         img = _absolute_url(url, img)
 
     # Description: try OG then Twitter then standard meta description
-    desc = _first_meta_content(["og:description", "twitter:description"])
+    desc = doc.first_meta_content(["og:description", "twitter:description"])
     if not desc:
-        tag = soup.find("meta", attrs={"name": "description"})
-        if tag and tag.get("content"):
-            desc = tag["content"].strip()
+        desc = doc.meta("name", "description").strip()
 
     if is_meta_platform:
         desc = clean_meta_description(desc)
@@ -88,51 +72,6 @@ def extract_og_tags(html: str, url: str = "") -> Tuple[str, str]:
     return (img or "", desc or "")
 
 
-def clean_meta_description(desc: str) -> str:
-    """
-    Meta properties often prefix OG descriptions with engagement stats, author/date
-    boilerplate, and login/share chrome. Strip that so the app shows the post copy.
-    """
-    text = (desc or "").strip()
-    text = IG_STATS_PREFIX_RE.sub("", text, count=1)
-    text = IG_AUTHOR_DATE_PREFIX_RE.sub("", text, count=1)
-    text = re.sub(
-        r"^\s*[\d,.]+(?:\.\d+)?[KMB]?\s+(?:likes?|reactions?)\s*[-–—]\s*",
-        "",
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r"^\s*See\s+posts,\s+photos\s+and\s+more\s+on\s+Facebook\.?\s*",
-        "",
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r"^\s*(?:See|View)\s+.+?\s+(?:post|posts|photos?|videos?)\s+on\s+(?:Facebook|Instagram|Threads)\.?\s*",
-        "",
-        text,
-        flags=re.IGNORECASE,
-    )
-    text = re.sub(
-        r"\s*(?:Log in|Sign up)\s+to\s+(?:view|see).*$", "", text, flags=re.IGNORECASE
-    )
-    text = re.sub(r"\s+", " ", text)
-    text = text.strip()
-
-    if _looks_like_threads_chrome(text):
-        return ""
-
-    quoted = re.match(r"""^["'](.+?)["']\.?$""", text)
-    if quoted:
-        text = quoted.group(1).strip()
-
-    if len(text) >= 2 and text[0] == text[-1] and text[0] in {"'", '"'}:
-        text = text[1:-1].strip()
-
-    return text
-
-
 def detect_platform(url: str) -> str:
     url = (url or "").strip()
     parseable = url if re.match(r"^[a-z][a-z0-9+.-]*://", url, re.I) else f"https://{url}"
@@ -152,15 +91,16 @@ def detect_platform(url: str) -> str:
     return "web"
 
 
-def extract_media_metadata(html: str, url: str = "") -> dict[str, Any]:
+def extract_media_metadata(
+    html: str | ParsedDocument, url: str = ""
+) -> dict[str, Any]:
     """
     Return structured media hints without replacing OG image behavior.
     The image remains the poster/preview; these flags tell the UI how to frame it.
     """
-    soup = BeautifulSoup(html or "", "html.parser")
+    doc = as_document(html)
     url_l = (url or "").lower()
     platform = detect_platform(url)
-    text_blob = html or ""
 
     media: dict[str, Any] = {
         "platform": platform,
@@ -177,8 +117,8 @@ def extract_media_metadata(html: str, url: str = "") -> dict[str, Any]:
         if signal not in media["signals"]:
             media["signals"].append(signal)
 
-    og_type = _first_meta_content_from_soup(
-        soup, ["og:type", "twitter:card", "medium", "og:video:type"]
+    og_type = doc.first_meta_content(
+        ["og:type", "twitter:card", "medium", "og:video:type"]
     ).lower()
     if og_type:
         media["content_type"] = og_type
@@ -191,14 +131,12 @@ def extract_media_metadata(html: str, url: str = "") -> dict[str, Any]:
         add_signal("url:reel")
 
     instagram_post = (
-        _find_instagram_post_object(html or "", url)
-        if platform == "instagram"
-        else None
+        _find_instagram_post_object(doc, url) if platform == "instagram" else None
     )
     carousel = (
         instagram_post.get("carousel_media")
         if isinstance(instagram_post, dict)
-        else _extract_json_array_after_key(text_blob, "carousel_media")
+        else _embedded_json_value(doc, "carousel_media")
     )
     carousel_has_video = False
     if isinstance(carousel, list) and len(carousel) > 1:
@@ -206,7 +144,7 @@ def extract_media_metadata(html: str, url: str = "") -> dict[str, Any]:
         add_signal("json:carousel_media")
         carousel_has_video = _instagram_carousel_has_video(carousel)
 
-    sidecar = _extract_json_object_after_key(text_blob, "edge_sidecar_to_children")
+    sidecar = _embedded_json_value(doc, "edge_sidecar_to_children")
     edges = sidecar.get("edges") if isinstance(sidecar, dict) else None
     if isinstance(edges, list) and len(edges) > 1:
         media["is_carousel"] = True
@@ -217,8 +155,7 @@ def extract_media_metadata(html: str, url: str = "") -> dict[str, Any]:
         media["is_video"] = True
         add_signal("json:carousel-video")
 
-    video_url = _first_meta_content_from_soup(
-        soup,
+    video_url = doc.first_meta_content(
         [
             "og:video",
             "og:video:url",
@@ -237,15 +174,16 @@ def extract_media_metadata(html: str, url: str = "") -> dict[str, Any]:
         media["is_video"] = True
         add_signal("url:video")
 
-    json_says_video = bool(
-        re.search(r'"(?:is_video|isVideo)"\s*:\s*true', text_blob, re.IGNORECASE)
+    # The index answers for JSON <script> payloads. The regexes only scan the
+    # scripts it couldn't parse (window._sharedData = {...}, require(...)
+    # calls), so a page whose scripts are all JSON skips them entirely.
+    json_index = _embedded_json_index(doc)
+    js_blob = "\n".join(json_index.unparsed)
+    json_says_video = json_index.says_video or bool(
+        js_blob and VIDEO_FLAG_RE.search(js_blob)
     )
-    json_has_video_asset = bool(
-        re.search(
-            r'"(?:video_versions|video_url|playable_url|dash_manifest)"\s*:',
-            text_blob,
-            re.IGNORECASE,
-        )
+    json_has_video_asset = json_index.has_video_asset or bool(
+        js_blob and VIDEO_ASSET_RE.search(js_blob)
     )
     if (json_says_video or json_has_video_asset) and not _is_still_instagram_carousel(
         platform, media, carousel_has_video
@@ -255,13 +193,12 @@ def extract_media_metadata(html: str, url: str = "") -> dict[str, Any]:
 
     poster = ""
     if platform == "instagram":
-        poster = _first_instagram_post_image(html or "", url)
+        poster = _first_instagram_post_image(doc, url)
     elif platform == "facebook":
-        poster = _facebook_formatted_background_image(html or "", url)
+        poster = _facebook_formatted_background_image(doc, url)
     if not poster:
-        poster = _first_meta_content_from_soup(
-            soup,
-            ["og:image", "og:image:secure_url", "twitter:image", "twitter:image:src"],
+        poster = doc.first_meta_content(
+            ["og:image", "og:image:secure_url", "twitter:image", "twitter:image:src"]
         )
     if poster and url:
         poster = urljoin(url, poster)
@@ -327,21 +264,6 @@ def _instagram_media_is_video(media) -> bool:
     )
 
 
-def _first_meta_content_from_soup(soup: BeautifulSoup, keys: list[str]) -> str:
-    for key in keys:
-        tag = soup.find("meta", attrs={"property": key})
-        if tag and tag.get("content"):
-            val = tag["content"].strip()
-            if val:
-                return val
-        tag = soup.find("meta", attrs={"name": key})
-        if tag and tag.get("content"):
-            val = tag["content"].strip()
-            if val:
-                return val
-    return ""
-
-
 def _base_url_for_join(url: str) -> str:
     base = (url or "").strip()
     if not base:
@@ -367,7 +289,7 @@ def _absolute_url(base_url: str, value: str) -> str:
         return val
 
 
-def _site_icon_from_soup(soup: BeautifulSoup, url: str) -> str:
+def _site_icon_from_document(doc: ParsedDocument, url: str) -> str:
     preferred_rels = (
         ("apple-touch-icon-precomposed",),
         ("apple-touch-icon",),
@@ -375,17 +297,10 @@ def _site_icon_from_soup(soup: BeautifulSoup, url: str) -> str:
         ("shortcut", "icon"),
         ("mask-icon",),
     )
-    links = soup.find_all("link")
+    links = doc.links()
 
     for preferred in preferred_rels:
-        for link in links:
-            href = (link.get("href") or "").strip()
-            raw_rels = link.get("rel") or []
-            if isinstance(raw_rels, str):
-                rels = raw_rels.lower().split()
-            else:
-                rels = [str(rel).lower() for rel in raw_rels]
-
+        for href, rels in links:
             if href and all(rel in rels for rel in preferred):
                 return _absolute_url(url, href)
 
@@ -396,8 +311,8 @@ def _site_icon_from_soup(soup: BeautifulSoup, url: str) -> str:
     return ""
 
 
-def _first_instagram_post_image(html: str, url: str) -> str:
-    post = _find_instagram_post_object(html, url)
+def _first_instagram_post_image(doc: ParsedDocument, url: str) -> str:
+    post = _find_instagram_post_object(doc, url)
     if not isinstance(post, dict):
         return ""
 
@@ -411,47 +326,96 @@ def _first_instagram_post_image(html: str, url: str) -> str:
     return urljoin(url, img) if img else ""
 
 
-def _find_instagram_post_object(html: str, url: str):
+def _find_instagram_post_object(doc: ParsedDocument, url: str):
     shortcode = _instagram_shortcode_from_url(url)
     if not shortcode:
         return None
 
-    soup = BeautifulSoup(html or "", "html.parser")
-    for script in soup.find_all("script"):
-        text = (script.string or script.get_text() or "").strip()
-        if not text or shortcode not in text:
-            continue
-        if not (text.startswith("{") or text.startswith("[")):
-            continue
+    return _embedded_json_index(doc).posts_by_code.get(shortcode)
 
-        try:
-            data = json.loads(text)
-        except Exception:
-            continue
 
-        found = _find_instagram_post_object_in_json(data, shortcode)
-        if found:
-            return found
+# ---- EMBEDDED JSON INDEX ----
+INDEXED_JSON_KEYS = frozenset(
+    {"carousel_media", "edge_sidecar_to_children", "text_format_metadata"}
+)
+VIDEO_FLAG_KEYS = frozenset({"is_video", "isvideo"})
+VIDEO_ASSET_KEYS = frozenset(
+    {"video_versions", "video_url", "playable_url", "dash_manifest"}
+)
+# THE SAME FLAGS IN SCRIPTS THAT AREN'T STANDALONE JSON
+VIDEO_FLAG_RE = re.compile(r'"(?:is_video|isVideo)"\s*:\s*true', re.IGNORECASE)
+VIDEO_ASSET_RE = re.compile(
+    r'"(?:video_versions|video_url|playable_url|dash_manifest)"\s*:', re.IGNORECASE
+)
 
-    return None
 
+class EmbeddedJsonIndex:
+    """
+    Every JSON <script> payload on the page, walked once (document order,
+    depth-first) into the lookups the media/image extractors need:
+    - posts_by_code: first object per Instagram `code` (shortcode)
+    - values: first value seen for each INDEXED_JSON_KEYS key
+    - says_video / has_video_asset: the flags the media regexes look for
+    - unparsed: <script> bodies that aren't standalone JSON (JS-embedded blobs)
+    """
 
-def _find_instagram_post_object_in_json(data, shortcode: str):
-    if isinstance(data, dict):
-        if data.get("code") == shortcode:
-            return data
-        for value in data.values():
-            found = _find_instagram_post_object_in_json(value, shortcode)
-            if found:
-                return found
+    __slots__ = ("posts_by_code", "values", "says_video", "has_video_asset", "unparsed")
+
+    def __init__(self):
+        self.posts_by_code: dict[str, dict] = {}
+        self.values: dict[str, Any] = {}
+        self.says_video = False
+        self.has_video_asset = False
+        self.unparsed: list[str] = []
+
+    def add(self, data: Any):
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                code = node.get("code")
+                if isinstance(code, str):
+                    self.posts_by_code.setdefault(code, node)
+                for key, value in node.items():
+                    if key in INDEXED_JSON_KEYS:
+                        self.values.setdefault(key, value)
+                    lowered = key.lower()
+                    if lowered in VIDEO_FLAG_KEYS and value is True:
+                        self.says_video = True
+                    elif lowered in VIDEO_ASSET_KEYS:
+                        self.has_video_asset = True
+                stack.extend(reversed(node.values()))
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+
+
+def _embedded_json_index(doc: ParsedDocument) -> EmbeddedJsonIndex:
+    return doc.memo("embedded_json_index", lambda: _build_embedded_json_index(doc))
+
+
+def _build_embedded_json_index(doc: ParsedDocument) -> EmbeddedJsonIndex:
+    index = EmbeddedJsonIndex()
+    for script_text in doc.script_texts():
+        text = script_text.strip()
+        if not text:
+            continue
+        if not (text.startswith("{") or text.startswith("[")):
+            index.unparsed.append(text)
+            continue
+        try:
+            index.add(json.loads(text))
+        except Exception:
+            index.unparsed.append(text)
+    return index
 
-    if isinstance(data, list):
-        for item in data:
-            found = _find_instagram_post_object_in_json(item, shortcode)
-            if found:
-                return found
 
-    return None
+def _embedded_json_value(doc: ParsedDocument, key: str):
+    # A key present in a JSON payload is authoritative (even when null);
+    # the span scanner only covers payloads that aren't standalone JSON.
+    index = _embedded_json_index(doc)
+    if key in index.values:
+        return index.values[key]
+    return _embedded_json_spans(doc)[key]
 
 
 def _instagram_shortcode_from_url(url: str) -> str:
@@ -469,19 +433,20 @@ def _instagram_shortcode_from_url(url: str) -> str:
     return ""
 
 
-def _facebook_formatted_background_image(html: str, url: str) -> str:
+def _facebook_formatted_background_image(doc: ParsedDocument, url: str) -> str:
     """
     Facebook colored-background text posts can expose post-scoped text metadata
     while their OG image points at the group/page cover. Prefer the story's own
     formatted-background asset when that exact post-rendering shape is present.
     """
+    html = doc.html
     if not html or (
         "CometFeedStoryFormattedBackgroundMessageRenderingStrategy" not in html
         and "TextFormatImageBackground" not in html
     ):
         return ""
 
-    metadata = _extract_json_object_after_key(html, "text_format_metadata")
+    metadata = _embedded_json_value(doc, "text_format_metadata")
     if not isinstance(metadata, dict):
         return ""
 
@@ -531,60 +496,91 @@ def _first_instagram_carousel_image(soup: BeautifulSoup, url: str) -> str:
     return ""
 
 
-def _extract_json_array_after_key(text: str, key: str):
-    key_pos = text.find(f'"{key}"')
-    if key_pos == -1:
-        key_pos = text.find(key)
-    if key_pos == -1:
-        return None
+# ---- EMBEDDED JSON SPANS ----
+# Instagram/Facebook inline multi-megabyte JSON/JS blobs. The values we want
+# are decoded with json's C scanner (raw_decode stops at the matching bracket
+# and handles string escapes), and only JSON_SPAN_MAX_CHARS past the opener are
+# ever examined, so one hostile page can't burn seconds of CPU.
+JSON_SPAN_MAX_CHARS = 1_000_000
+_JSON_DECODER = json.JSONDecoder()
+
+# key -> opener of the value we expect after it
+EMBEDDED_JSON_KEYS = {
+    "carousel_media": "[",
+    "edge_sidecar_to_children": "{",
+    "text_format_metadata": "{",
+}
+_EMBEDDED_JSON_KEY_RE = re.compile(
+    "|".join(re.escape(key) for key in EMBEDDED_JSON_KEYS)
+)
 
-    return _extract_json_after_marker(text, key_pos, "[", "]")
 
+def _embedded_json_spans(doc: ParsedDocument) -> dict[str, Any]:
+    return doc.memo(
+        "embedded_json_spans",
+        lambda: _extract_json_values_after_keys(doc.html, EMBEDDED_JSON_KEYS),
+    )
 
-def _extract_json_object_after_key(text: str, key: str):
-    key_pos = text.find(f'"{key}"')
-    if key_pos == -1:
-        key_pos = text.find(key)
-    if key_pos == -1:
-        return None
 
-    return _extract_json_after_marker(text, key_pos, "{", "}")
+def _extract_json_values_after_keys(
+    text: str, keys: dict[str, str]
+) -> dict[str, Any]:
+    """
+    One pass over `text` for several keys at once. Like the single-key helpers
+    below, a quoted "key" wins over a bare mention; missing keys map to None.
+    """
+    pattern = (
+        _EMBEDDED_JSON_KEY_RE
+        if keys is EMBEDDED_JSON_KEYS
+        else re.compile("|".join(re.escape(key) for key in keys))
+    )
+    quoted: dict[str, int] = {}
+    bare: dict[str, int] = {}
 
+    for m in pattern.finditer(text):
+        key = m.group(0)
+        if key in quoted:
+            continue
+        start, end = m.span()
+        if text[start - 1 : start] == '"' and text[end : end + 1] == '"':
+            quoted[key] = start - 1
+            if len(quoted) == len(keys):
+                break
+        else:
+            bare.setdefault(key, start)
+
+    values: dict[str, Any] = {}
+    for key, opener in keys.items():
+        key_pos = quoted.get(key, bare.get(key, -1))
+        closer = "]" if opener == "[" else "}"
+        values[key] = (
+            None
+            if key_pos == -1
+            else _extract_json_after_marker(text, key_pos, opener, closer)
+        )
+    return values
 
-def _extract_json_after_marker(text: str, key_pos: int, opener: str, closer: str):
-    start = text.find(opener, key_pos)
-    if start == -1:
-        return None
 
-    depth = 0
-    in_string = False
-    escaped = False
+def _extract_json_array_after_key(text: str, key: str):
+    return _extract_json_values_after_keys(text, {key: "["})[key]
 
-    for i in range(start, len(text)):
-        char = text[i]
 
-        if in_string:
-            if escaped:
-                escaped = False
-            elif char == "\\":
-                escaped = True
-            elif char == '"':
-                in_string = False
-            continue
+def _extract_json_object_after_key(text: str, key: str):
+    return _extract_json_values_after_keys(text, {key: "{"})[key]
 
-        if char == '"':
-            in_string = True
-        elif char == opener:
-            depth += 1
-        elif char == closer:
-            depth -= 1
-            if depth == 0:
-                try:
-                    return json.loads(text[start : i + 1])
-                except Exception:
-                    return None
 
-    return None
+def _extract_json_after_marker(text: str, key_pos: int, opener: str, closer: str):
+    start = text.find(opener, key_pos)
+    if start == -1:
+        return None
+
+    # `closer` is implied by `opener`: raw_decode ends at the matching bracket.
+    window = text[start : start + JSON_SPAN_MAX_CHARS]
+    try:
+        value, _ = _JSON_DECODER.raw_decode(window)
+    except ValueError:
+        return None
+    return value
 
 
 def _image_from_instagram_sidecar(sidecar) -> str:
@@ -651,58 +647,83 @@ def _looks_like_image_url(val) -> bool:
     return not any(ext in lower for ext in (".mp4", ".mov", ".m3u8"))
 
 
-def _looks_like_threads_chrome(text: str) -> bool:
-    lower = (text or "").lower()
-    if not lower:
-        return False
-
-    nav_hits = sum(
-        phrase in lower
-        for phrase in (
-            "home search",
-            "create notifications profile",
-            "back thread",
-            "like comment repost share",
-            "log in or sign up for threads",
-            "see what people are talking about",
-            "instagram log in with username",
-            "© 2026 threads",
-            "threads terms",
-        )
-    )
-    return nav_hits >= 2
+# ---- PARAGRAPH-LIKE BLOCK (FALLBACK TEXT FOR SUMMARIZATION) ----
+NATIVE_BLOCK_MIN_CHARS = 280  # characters, not words
+NATIVE_DIV_MAX_CHARS = 3000
+TEXT_STRING_TYPES = (NavigableString, CData)
 
 
-# ---- PARAGRAPH-LIKE BLOCK (FALLBACK TEXT FOR SUMMARIZATION) ----
-def extract_paragraph_like_block(html: str) -> str:
+def extract_paragraph_like_block(html: str | ParsedDocument) -> str:
     """
     Fallback HTML block extractor for pages without good metadata.
     Prioritize character count for summarization (not word count).
+
+    Candidate lengths come from one bottom-up pass (_text_lengths), so nested
+    divs never rebuild their text per ancestor; text is only joined for the
+    <main>/<article> or div that is actually being checked/returned.
     """
-    soup = BeautifulSoup(html or "", "html.parser")
+    doc = as_document(html)
+    soup = doc.soup
+    lengths, divs = doc.memo("text_lengths", lambda: _text_lengths(soup))
 
     # First: <main> or <article> if decently long
     for tag in ["main", "article"]:
         node = soup.find(tag)
-        if node:
-            text = node.get_text(separator=" ", strip=True)
-            if len(text) >= 280:  # characters, not words
-                return text
-
-    # Second: divs with decent content
-    candidates = []
-    for div in soup.find_all("div"):
+        if node and lengths.get(id(node), 0) >= NATIVE_BLOCK_MIN_CHARS:
+            return node.get_text(separator=" ", strip=True)
+
+    # Second: the longest div with decent content (first one wins ties)
+    sized = [
+        (length, order, div)
+        for order, div in enumerate(divs)
+        if NATIVE_BLOCK_MIN_CHARS
+        <= (length := lengths.get(id(div), 0))
+        <= NATIVE_DIV_MAX_CHARS
+    ]
+    sized.sort(key=lambda item: (-item[0], item[1]))
+    for _, _, div in sized:
         txt = div.get_text(separator=" ", strip=True)
-        if (
-            280 <= len(txt) <= 3000
-            and "block user" not in (txt.lower())
-            and not _looks_like_threads_chrome(txt)
-        ):
-            candidates.append(txt)
-    if candidates:
-        return max(candidates, key=len)
+        if "block user" not in txt.lower() and not _looks_like_threads_chrome(txt):
+            return txt
 
     # Last: first 5 paragraphs
     paragraphs = soup.find_all("p")
     blob = " ".join(p.get_text(strip=True) for p in paragraphs[:5])
     return blob
+
+
+def _text_lengths(soup: BeautifulSoup) -> tuple[dict[int, int], list[Tag]]:
+    """
+    len(tag.get_text(" ", strip=True)) for every tag with text, keyed by
+    id(tag), plus every <div> in document order. Walking descendants in
+    reverse document order visits each child before its parent, so every
+    node's totals are final by the time they are folded into its parent.
+    """
+    chars: dict[int, int] = {}
+    counts: dict[int, int] = {}
+    divs: list[Tag] = []
+
+    for node in reversed(list(soup.descendants)):
+        parent = node.parent
+        if parent is None:
+            continue
+        key = id(parent)
+        # get_text() on a div only joins plain strings and CDATA (no
+        # comments, <script>/<style>/<template> contents, etc.)
+        if type(node) in TEXT_STRING_TYPES:
+            n = len(node.strip())
+            if n:
+                chars[key] = chars.get(key, 0) + n
+                counts[key] = counts.get(key, 0) + 1
+        elif isinstance(node, Tag):
+            if node.name == "div":
+                divs.append(node)
+            count = counts.get(id(node))
+            if count:
+                chars[key] = chars.get(key, 0) + chars[id(node)]
+                counts[key] = counts.get(key, 0) + count
+
+    divs.reverse()
+    # separator=" " adds one character between each pair of joined strings
+    lengths = {key: chars[key] + counts[key] - 1 for key in counts}
+    return lengths, divs
@@ -0,0 +1,202 @@
+# backend/hf_health.py
+# ------------------------------------------------------------
+# Circuit breaker + health score for each HF (model, base) endpoint.
+# - try_acquire(url) says whether an attempt may start right now
+# - record(url, ok, latency) feeds the outcome back
+# - rank(urls) orders endpoints healthiest-first, dropping open ones
+#
+# STATES:
+#   closed     normal traffic; opens once the rolling error rate crosses
+#              the threshold (after a minimum number of calls)
+#   open       skipped entirely until the cooldown runs out
+#   half_open  exactly one probe allowed; success closes, failure re-opens
+#
+# TUNING (backend/.env):
+#   HF_BREAKER_WINDOW=20            (OUTCOMES KEPT PER ENDPOINT)
+#   HF_BREAKER_MIN_CALLS=4          (NEVER OPEN ON FEWER CALLS THAN THIS)
+#   HF_BREAKER_ERROR_RATE=0.5       (OPEN AT OR ABOVE THIS FAILURE RATE)
+#   HF_BREAKER_COOLDOWN_SECONDS=30  (HOW LONG AN OPEN ENDPOINT IS SKIPPED)
+#   HF_LATENCY_EWMA_ALPHA=0.3       (WEIGHT OF THE NEWEST LATENCY SAMPLE)
+#   HF_LATENCY_BUCKET_SECONDS=1.0   (LATENCY GAPS SMALLER THAN THIS DON'T REORDER)
+# ------------------------------------------------------------
+
+import os
+import time
+from collections import deque
+from typing import Any, Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class EndpointHealth:
+    __slots__ = (
+        "outcomes",
+        "latency_ewma",
+        "state",
+        "opened_at",
+        "probe_in_flight",
+        "calls",
+        "failures",
+    )
+
+    def __init__(self, window: int):
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.latency_ewma: float | None = None
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class HealthRegistry:
+    """Breaker state for every endpoint URL seen so far."""
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 4,
+        error_rate: float = 0.5,
+        cooldown: float = 30.0,
+        alpha: float = 0.3,
+        latency_bucket: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.window = max(1, window)
+        self.min_calls = max(1, min_calls)
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.latency_bucket = max(1e-3, latency_bucket)
+        self._clock = clock
+        self._endpoints: dict[str, EndpointHealth] = {}
+
+    def _get(self, url: str) -> EndpointHealth:
+        health = self._endpoints.get(url)
+        if health is None:
+            health = self._endpoints[url] = EndpointHealth(self.window)
+        return health
+
+    def _cooled_down(self, health: EndpointHealth) -> bool:
+        return self._clock() - health.opened_at >= self.cooldown
+
+    def available(self, url: str) -> bool:
+        """Could an attempt start now? (Does not claim the half-open probe.)"""
+        health = self._get(url)
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            return self._cooled_down(health)
+        return not health.probe_in_flight
+
+    def try_acquire(self, url: str) -> bool:
+        """Like available(), but claims the single probe of a half-open endpoint."""
+        health = self._get(url)
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN:
+            if not self._cooled_down(health):
+                return False
+            health.state = HALF_OPEN
+        if health.probe_in_flight:
+            return False
+        health.probe_in_flight = True
+        return True
+
+    def release(self, url: str):
+        """The attempt ended without a verdict (e.g. cancelled by a hedge)."""
+        self._get(url).probe_in_flight = False
+
+    def record(self, url: str, ok: bool, latency: float | None = None):
+        health = self._get(url)
+        health.calls += 1
+        health.failures += 0 if ok else 1
+        health.outcomes.append(ok)
+        if latency is not None:
+            if health.latency_ewma is None:
+                health.latency_ewma = latency
+            else:
+                health.latency_ewma += self.alpha * (latency - health.latency_ewma)
+
+        if health.state == HALF_OPEN:
+            health.probe_in_flight = False
+            if ok:
+                health.state = CLOSED
+                health.outcomes.clear()
+                health.outcomes.append(True)
+            else:
+                self._open(health)
+        elif (
+            health.state == CLOSED
+            and len(health.outcomes) >= self.min_calls
+            and health.error_rate >= self.error_rate
+        ):
+            self._open(health)
+
+    def _open(self, health: EndpointHealth):
+        health.state = OPEN
+        health.opened_at = self._clock()
+
+    def rank(self, urls: list[str]) -> list[str]:
+        """
+        Available endpoints, healthiest first. Error rate (in 10% buckets)
+        decides, then latency (in latency_bucket steps); ties keep the
+        caller's preference order, so model preference survives small noise.
+        """
+        candidates = [url for url in urls if self.available(url)]
+
+        def score(url: str) -> tuple[float, int]:
+            health = self._get(url)
+            latency = health.latency_ewma or 0.0
+            return round(health.error_rate, 1), int(latency // self.latency_bucket)
+
+        return sorted(candidates, key=score)
+
+    def snapshot(self) -> dict[str, Any]:
+        now = self._clock()
+        out = {}
+        for url, health in self._endpoints.items():
+            retry_in = 0.0
+            if health.state == OPEN:
+                retry_in = max(0.0, self.cooldown - (now - health.opened_at))
+            out[url] = {
+                "state": health.state,
+                "error_rate": round(health.error_rate, 4),
+                "latency_ewma_ms": (
+                    None
+                    if health.latency_ewma is None
+                    else round(health.latency_ewma * 1000, 1)
+                ),
+                "calls": health.calls,
+                "failures": health.failures,
+                "retry_in_seconds": round(retry_in, 1),
+            }
+        return out
+
+    def reset(self):
+        self._endpoints.clear()
+
+
+HF_HEALTH = HealthRegistry(
+    window=int(_env_float("HF_BREAKER_WINDOW", 20)),
+    min_calls=int(_env_float("HF_BREAKER_MIN_CALLS", 4)),
+    error_rate=_env_float("HF_BREAKER_ERROR_RATE", 0.5),
+    cooldown=_env_float("HF_BREAKER_COOLDOWN_SECONDS", 30.0),
+    alpha=_env_float("HF_LATENCY_EWMA_ALPHA", 0.3),
+    latency_bucket=_env_float("HF_LATENCY_BUCKET_SECONDS", 1.0),
+)
@@ -0,0 +1,74 @@
+# backend/http_client.py
+# ------------------------------------------------------------
+# One pooled aiohttp session per process.
+# - open_session() / close_session() run from the FastAPI lifespan
+# - get_session() hands out the shared session (and opens one lazily
+#   for scripts/tests that call fetch_html outside the app)
+#
+# TUNING (backend/.env):
+#   HTTP_POOL_LIMIT=100           (TOTAL OPEN CONNECTIONS)
+#   HTTP_POOL_LIMIT_PER_HOST=10   (PER HOST — instagram.com, HF, ...)
+#   HTTP_KEEPALIVE_SECONDS=30     (HOW LONG AN IDLE CONNECTION STAYS WARM)
+#   HTTP_DNS_TTL_SECONDS=300      (DNS CACHE TTL; 0 DISABLES THE CACHE)
+# ------------------------------------------------------------
+
+import asyncio
+import os
+
+import aiohttp
+
+from .tracing import trace_config
+
+_session: aiohttp.ClientSession | None = None
+_session_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _build_connector() -> aiohttp.TCPConnector:
+    dns_ttl = _env_int("HTTP_DNS_TTL_SECONDS", 300)
+    return aiohttp.TCPConnector(
+        limit=_env_int("HTTP_POOL_LIMIT", 100),
+        limit_per_host=_env_int("HTTP_POOL_LIMIT_PER_HOST", 10),
+        keepalive_timeout=_env_int("HTTP_KEEPALIVE_SECONDS", 30),
+        use_dns_cache=dns_ttl > 0,
+        ttl_dns_cache=dns_ttl if dns_ttl > 0 else None,
+    )
+
+
+async def open_session() -> aiohttp.ClientSession:
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is not None and not _session.closed and _session_loop is loop:
+        await _session.close()
+    # Timeouts are per request (fetch vs HF differ), so none at session level.
+    _session = aiohttp.ClientSession(
+        connector=_build_connector(),
+        timeout=aiohttp.ClientTimeout(total=None),
+        trace_configs=[trace_config()],  # DNS / CONNECT SPANS, backend/tracing.py
+    )
+    _session_loop = loop
+    return _session
+
+
+async def close_session():
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    if (
+        _session is None
+        or _session.closed
+        or _session_loop is not asyncio.get_running_loop()
+    ):
+        return await open_session()
+    return _session
@@ -0,0 +1,203 @@
+# backend/local_engine.py
+# ------------------------------------------------------------
+# Optional in-process summarizer (HF_ENGINE=local) so /summarize/hf doesn't
+# depend on the Inference API queue or its cold starts.
+# - summarize_local(prompts) -> raw model outputs, same order
+# - summarize_batched(prompt) -> one output, via a micro-batcher that packs
+#   concurrent prompts into one padded generate() call (backend/microbatch.py)
+# - the model loads lazily on first use, on the engine's own thread, so the
+#   event loop and the extraction pool never wait on it
+# - close_batchers() / shutdown_local_engine() run from the FastAPI lifespan
+# Callers apply the usual enforce_source_vocab + trim_to_280 afterwards
+# (summarizer._finalize_hf_text), exactly as for API output.
+#
+# TUNING (backend/.env):
+#   HF_ENGINE=api                   (api | local)
+#   LOCAL_MODEL=sshleifer/distilbart-cnn-12-6
+#                                   (ANY SEQ2SEQ SUMMARIZER; DISTILLED CNN BY DEFAULT)
+#   LOCAL_RUNTIME=torch             (torch | onnx)
+#   LOCAL_QUANTIZE=1                (onnx ONLY: DYNAMIC INT8 WEIGHTS)
+#   LOCAL_MODEL_DIR=backend/.cache/local-models  (EXPORTED/QUANTIZED ONNX FILES)
+#   LOCAL_ENGINE_THREADS=1          (CONCURRENT generate() CALLS)
+#   LOCAL_MAX_INPUT_TOKENS=512
+#   LOCAL_BATCH_MAX_SIZE=8          (PROMPTS PER generate() CALL)
+#   LOCAL_BATCH_MAX_WAIT_MS=15      (HOW LONG THE FIRST PROMPT WAITS FOR COMPANY)
+#   LOCAL_BATCH_QUEUE_DEPTH=256     (PROMPTS WAITING BEFORE SUBMITTERS BLOCK)
+#
+# NEEDS (not in the default image): transformers + torch, and
+# optimum[onnxruntime] for LOCAL_RUNTIME=onnx.
+# ------------------------------------------------------------
+
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from .microbatch import MicroBatcher
+
+HF_ENGINE = os.getenv("HF_ENGINE", "api").strip().lower()
+LOCAL_MODEL = os.getenv("LOCAL_MODEL", "sshleifer/distilbart-cnn-12-6")
+LOCAL_RUNTIME = os.getenv("LOCAL_RUNTIME", "torch").strip().lower()
+LOCAL_QUANTIZE = os.getenv("LOCAL_QUANTIZE", "1") == "1"
+LOCAL_MODEL_DIR = os.getenv(
+    "LOCAL_MODEL_DIR",
+    os.path.join(os.path.dirname(__file__), ".cache", "local-models"),
+)
+LOCAL_ENGINE_THREADS = max(1, int(os.getenv("LOCAL_ENGINE_THREADS", "1")))
+LOCAL_MAX_INPUT_TOKENS = int(os.getenv("LOCAL_MAX_INPUT_TOKENS", "512"))
+LOCAL_BATCH_MAX_SIZE = int(os.getenv("LOCAL_BATCH_MAX_SIZE", "8"))
+LOCAL_BATCH_MAX_WAIT_MS = float(os.getenv("LOCAL_BATCH_MAX_WAIT_MS", "15"))
+LOCAL_BATCH_QUEUE_DEPTH = int(os.getenv("LOCAL_BATCH_QUEUE_DEPTH", "256"))
+
+_executor: ThreadPoolExecutor | None = None
+_model: Any = None
+_tokenizer: Any = None
+_load_lock = threading.Lock()
+_batchers: dict[str, MicroBatcher] = {}  # ONE PER GENERATION-PARAMETER SET
+
+
+def local_engine_enabled() -> bool:
+    return HF_ENGINE == "local"
+
+
+def engine_fingerprint() -> list[str]:
+    """What produced a summary; part of the HF cache key."""
+    quant = "int8" if LOCAL_RUNTIME == "onnx" and LOCAL_QUANTIZE else "fp32"
+    return ["local", LOCAL_MODEL, LOCAL_RUNTIME, quant]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=LOCAL_ENGINE_THREADS, thread_name_prefix="local-summarizer"
+        )
+    return _executor
+
+
+async def close_batchers():
+    """Lifespan teardown: stop every batcher's collector before the executor goes."""
+    for batcher in _batchers.values():
+        await batcher.close()
+
+
+def shutdown_local_engine():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+def _load():
+    global _model, _tokenizer
+    with _load_lock:
+        if _model is not None:
+            return
+        from transformers import AutoTokenizer
+
+        _tokenizer = AutoTokenizer.from_pretrained(LOCAL_MODEL)
+        if LOCAL_RUNTIME == "onnx":
+            _model = _load_onnx_model()
+        else:
+            from transformers import AutoModelForSeq2SeqLM
+
+            _model = AutoModelForSeq2SeqLM.from_pretrained(LOCAL_MODEL).eval()
+
+
+def _load_onnx_model():
+    """
+    Export to ONNX once (cached under LOCAL_MODEL_DIR), optionally with
+    dynamic int8 weights for the encoder/decoder graphs, then load with ORT.
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    variant = "int8" if LOCAL_QUANTIZE else "fp32"
+    target = os.path.join(LOCAL_MODEL_DIR, LOCAL_MODEL.replace("/", "__"), variant)
+    if not os.path.isdir(target):
+        model = ORTModelForSeq2SeqLM.from_pretrained(LOCAL_MODEL, export=True)
+        if not LOCAL_QUANTIZE:
+            model.save_pretrained(target)
+            return model
+        _quantize_export(model, target)
+
+    return ORTModelForSeq2SeqLM.from_pretrained(target, **_onnx_file_names(target))
+
+
+def _quantize_export(model, target: str):
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    export_dir = target + "-export"
+    model.save_pretrained(export_dir)
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    for name in sorted(os.listdir(export_dir)):
+        if name.endswith(".onnx"):
+            ORTQuantizer.from_pretrained(export_dir, file_name=name).quantize(
+                save_dir=target, quantization_config=qconfig
+            )
+    model.config.save_pretrained(target)
+
+
+def _onnx_file_names(target: str) -> dict[str, str]:
+    """quantize() writes "<graph>_quantized.onnx"; point the loader at them."""
+    names = {}
+    for arg, graph in (
+        ("encoder_file_name", "encoder_model"),
+        ("decoder_file_name", "decoder_model"),
+        ("decoder_with_past_file_name", "decoder_with_past_model"),
+    ):
+        quantized = f"{graph}_quantized.onnx"
+        if os.path.exists(os.path.join(target, quantized)):
+            names[arg] = quantized
+    return names
+
+
+def _generate(prompts: list[str], parameters: dict) -> list[str]:
+    """Blocking: one padded batch through the model. Runs on the engine thread."""
+    _load()
+    inputs = _tokenizer(
+        prompts,
+        return_tensors="pt",
+        padding=True,
+        truncation=True,
+        max_length=LOCAL_MAX_INPUT_TOKENS,
+    )
+    if LOCAL_RUNTIME == "onnx":
+        output_ids = _model.generate(**inputs, **parameters)
+    else:
+        import torch
+
+        with torch.inference_mode():
+            output_ids = _model.generate(**inputs, **parameters)
+    return _tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+
+async def summarize_local(prompts: list[str], parameters: dict) -> list[str]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), _generate, prompts, parameters)
+
+
+async def summarize_batched(prompt: str, parameters: dict) -> str:
+    key = json.dumps(parameters, sort_keys=True)
+    batcher = _batchers.get(key)
+    if batcher is None:
+        batcher = _batchers[key] = MicroBatcher(
+            lambda prompts: summarize_local(prompts, parameters),
+            max_batch=LOCAL_BATCH_MAX_SIZE,
+            max_wait_ms=LOCAL_BATCH_MAX_WAIT_MS,
+            max_queue=LOCAL_BATCH_QUEUE_DEPTH,
+            concurrency=LOCAL_ENGINE_THREADS,
+        )
+    return await batcher.submit(prompt)
+
+
+def local_engine_stats() -> dict[str, Any]:
+    return {
+        "enabled": local_engine_enabled(),
+        "model": LOCAL_MODEL,
+        "runtime": LOCAL_RUNTIME,
+        "loaded": _model is not None,
+        "batchers": [batcher.stats() for batcher in _batchers.values()],
+    }
@@ -0,0 +1,234 @@
+# backend/logs.py
+# ------------------------------------------------------------
+# Structured, level-gated logging for the app.
+# - one logger per subsystem: takeaways.app / .summary / .og / .hf
+# - records go through a QueueHandler; a QueueListener thread does the
+#   formatting and the write, so the event loop never blocks on stdout
+# - pass arguments, not f-strings: log.debug("x -> '%s'", capped(text))
+#   only formats (and only caps) when the level is on
+# - extra=SAMPLED on high-volume lines keeps 1 in LOG_SAMPLE_EVERY of them
+#   per call site; warnings and errors are never sampled
+# - setup_logging() runs from the FastAPI lifespan (scripts call it
+#   themselves); importing this module starts no thread
+#
+# TUNING (backend/.env):
+#   LOG_LEVEL=INFO                 (DEFAULT FOR EVERY SUBSYSTEM)
+#   LOG_LEVELS=og=DEBUG,hf=DEBUG   (PER-SUBSYSTEM OVERRIDES)
+#   LOG_FORMAT=text                (OR json: ONE OBJECT PER LINE)
+#   LOG_SAMPLE_EVERY=1             (1 = KEEP EVERY SAMPLED LINE)
+#
+# DEBUG_SUMMARY=1 / DEBUG_OG=1 / DEBUG_HF=1 still work: each turns its
+# subsystem up to DEBUG (any of them also turns up "summary", as before).
+# ------------------------------------------------------------
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Mapping
+
+from dotenv import load_dotenv
+
+ROOT = "takeaways"
+SUBSYSTEMS = ("app", "summary", "og", "hf")
+SAMPLED = {"sampled": True}
+
+# LogRecord ATTRIBUTES THAT AREN'T extra= FIELDS
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sampled"}
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+class capped:
+    """Log argument: text on one line, cut at n chars -- only once it's formatted."""
+
+    __slots__ = ("text", "n")
+
+    def __init__(self, text, n: int = 240):
+        self.text = text
+        self.n = n
+
+    def __str__(self) -> str:
+        s = (self.text or "").replace("\n", " ").strip()
+        return (s[: self.n] + "…") if len(s) > self.n else s
+
+
+# ---------- levels ----------
+def _level(name: str, default: int) -> int:
+    level = logging.getLevelName(name.strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def subsystem_levels(env: Mapping[str, str] = os.environ) -> dict[str, int]:
+    base = _level(env.get("LOG_LEVEL", "INFO"), logging.INFO)
+    levels = dict.fromkeys(SUBSYSTEMS, base)
+
+    legacy = {
+        name: env.get(f"DEBUG_{name.upper()}", "0") == "1"
+        for name in ("summary", "og", "hf")
+    }
+    for name, on in legacy.items():
+        if on:
+            levels[name] = logging.DEBUG
+    if any(legacy.values()):
+        levels["summary"] = logging.DEBUG
+
+    for item in env.get("LOG_LEVELS", "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip().lower()
+        if name in levels and value:
+            levels[name] = _level(value, levels[name])
+    return levels
+
+
+# ---------- sampling ----------
+class SampleFilter(logging.Filter):
+    """Keeps every Nth record marked extra=SAMPLED, counted per call site."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._seen: dict[tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or not getattr(record, "sampled", False):
+            return True
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            seen = self._seen.get(key, 0)
+            self._seen[key] = seen + 1
+        return seen % self.every == 0
+
+
+# ---------- formatting ----------
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # ALREADY FORMATTED BY _QueueHandler.prepare
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s %(message)s")
+
+    def formatTime(self, record, datefmt=None):
+        stamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        return f"{stamp}.{int(record.msecs):03d}"
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = [
+            f"{key}={value}"
+            for key, value in vars(record).items()
+            if key not in _RESERVED and not key.startswith("_")
+        ]
+        return f"{line} {' '.join(fields)}" if fields else line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # THE STOCK prepare() FORMATS ON THE CALLER'S THREAD; ONLY RESOLVE THE
+    # MESSAGE (ARGS MAY BE MUTABLE) AND LEAVE THE REST TO THE LISTENER.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: logging.handlers.QueueListener | None = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(env: Mapping[str, str] | None = None, stream=None):
+    """
+    Install the queue pipeline (the app lifespan calls this; repeat calls are
+    no-ops). Pass env/stream to reconfigure it.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None and env is None and stream is None:
+            return
+        _stop_listener()
+        env = os.environ if env is None else env
+
+        root = logging.getLogger(ROOT)
+        root.propagate = False
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for name, level in subsystem_levels(env).items():
+            get_logger(name).setLevel(level)
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        json_format = env.get("LOG_FORMAT", "text").strip().lower() == "json"
+        output.setFormatter(JsonFormatter() if json_format else TextFormatter())
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        handler = _QueueHandler(records)
+        try:
+            every = int(env.get("LOG_SAMPLE_EVERY", "1"))
+        except ValueError:
+            every = 1
+        handler.addFilter(SampleFilter(every))
+        root.addHandler(handler)
+
+        _listener = logging.handlers.QueueListener(records, output)
+        _listener.start()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # DRAINS WHAT'S QUEUED
+        _listener = None
+
+
+def flush_logging():
+    """Drain the queue (shutdown, tests); logging keeps working afterwards."""
+    with _setup_lock:
+        listener = _listener
+        if listener is None:
+            return
+        listener.stop()
+        listener.start()
+
+
+@contextmanager
+def silenced(level: int = logging.INFO):
+    """Drop records at or below level (benchmarks, load tests) for the block."""
+    previous = logging.root.manager.disable
+    logging.disable(level)
+    try:
+        yield
+    finally:
+        logging.disable(previous)
+
+
+load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
+atexit.register(_stop_listener)
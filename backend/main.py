@@ -1,18 +1,56 @@
 # backend/main.py
 # ✅ MAIN FASTAPI BACKEND ENTRYPOINT — lean, no length guards
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+import asyncio
+import copy
+import json
 import os
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from pathlib import Path
+from urllib.parse import urlparse
+
+from .http_client import close_session, open_session
+from .local_engine import close_batchers, local_engine_stats, shutdown_local_engine
+from .logs import SAMPLED, capped, flush_logging, get_logger, setup_logging
+from .tracing import EXPORTER, annotate, record_durations, span, start_trace
+from .workers import run_in_pool, start_pool, stop_pool
 
 # ---------- App & static mounts ----------
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP session for every page fetch and HF call in this process,
+    # plus the worker pool that keeps HTML parsing off the event loop
+    setup_logging()
+    log.info("🔐 Hugging Face token loaded? %s", "Yes" if HF_API_TOKEN else "No")
+    log.info("✅ .env path: %s", os.path.abspath(".env"))
+    log.info("🧩 HTML_PARSER=%s -> tree=%s meta=%s", HTML_PARSER, TREE_BUILDER, META_ENGINE)
+    await open_session()
+    start_pool()
+    EXPORTER.start()
+    try:
+        yield
+    finally:
+        stop_pool()
+        await EXPORTER.stop()  # LAST SPANS OUT BEFORE THE SESSION CLOSES
+        await close_session()
+        HF_SUMMARY_CACHE.close()
+        await close_batchers()
+        shutdown_local_engine()
+        flush_logging()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Public assets are served from /images (public/images -> /images)
 app.mount(
@@ -26,22 +64,40 @@ app.mount("/static", StaticFiles(directory=public_path), name="static")
 # ---------- Env ----------
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
 HF_API_TOKEN = os.getenv("HF_API_TOKEN")
-print(f"🔐 Hugging Face token loaded? {'Yes' if HF_API_TOKEN else 'No'}")
-print("✅ .env path:", os.path.abspath(".env"))
+# Read only <head> for plain web pages when og:description is already there
+HEAD_ONLY_FETCH = os.getenv("HEAD_ONLY_FETCH", "1") == "1"
+# Wall-clock cap for all Pegasus attempts made by one /summarize/hf request
+HF_ROUTE_BUDGET_SECONDS = float(os.getenv("HF_ROUTE_BUDGET_SECONDS", "45"))
+log = get_logger("app")
 
 # ---------- Internal modules ----------
 from .summarizer import (
-    fetch_html,
+    stream_html,
     get_best_summary,  # builds strict prompt internally
-    extract_social_content_for_hf,  # picks og:description/og:title or sanitized text
     extract_og_image,  # returns (og_or_loop_img, weird_quip_if_used | None)
+    cache_key_for_url,
+    HF_CALL_FLIGHTS,  # coalesces identical Pegasus prompts in flight
+    HF_SUMMARY_CACHE,  # prompt-hash cache of Pegasus outputs (memory + SQLite)
 )
-from .extract import (
-    detect_platform,
-    extract_media_metadata,
-    extract_og_tags,
-    extract_paragraph_like_block,
+from .cache import TTLCache
+from .hf_health import HF_HEALTH
+from .singleflight import SingleFlight
+from .extract import detect_platform
+from .metrics import (
+    EXTRACTOR_SECONDS,
+    FETCH_BYTES,
+    FETCH_SECONDS,
+    HF_ROUTE_TOTAL,
+    IMAGE_SOURCE_TOTAL,
+    PARSE_SECONDS,
+    REGISTRY,
+    SUMMARY_SOURCE_TOTAL,
+    Counter,
+    Gauge,
 )
+from .pipeline import PageRecord, extract_page_record, image_choice  # parse-bound
+from .document import HTML_PARSER, META_ENGINE, TREE_BUILDER
+from . import page_cache
 
 # ---------- CORS ----------
 app.add_middleware(
@@ -67,6 +123,10 @@ class URLInput(BaseModel):
     url: str
 
 
+class URLBatchInput(BaseModel):
+    urls: list[str]
+
+
 # ---------- Helpers ----------
 def trim_to_280(text: str) -> str:
     text = (text or "").strip()
@@ -83,31 +143,357 @@ def trim_to_280(text: str) -> str:
     return cut.rstrip(junk)
 
 
+async def _load_page_record(
+    url: str, platform: str, with_source: bool = False
+) -> tuple[PageRecord, dict]:
+    """
+    Fetch + extract one page through the page cache: a fresh entry skips the
+    network, a stale one is revalidated and a 304 reuses its record. Returns
+    the record plus fetch facts for the debug payload.
+    """
+    key = cache_key_for_url(url)
+    entry = page_cache.lookup(key)
+    if entry is not None and with_source and entry.record.source_text is None:
+        entry = None  # cached by /summarize: no Pegasus source text in it
+    if entry is not None and entry.fresh:
+        annotate(page_cache="fresh")
+        return entry.record, _fetch_facts(entry.record, page_cache="fresh")
+
+    validators = page_cache.conditional_headers(entry) if entry is not None else None
+    started = time.perf_counter()
+    fetch_seconds = None  # SET ONCE THE BODY WE NEED HAS BEEN READ
+    try:
+        async with stream_html(url, validators) as page:
+            if page.not_modified:
+                fetch_seconds = time.perf_counter() - started
+                annotate(page_cache="revalidated")
+                page_cache.refresh(key, entry, page.headers)
+                return entry.record, _fetch_facts(entry.record, page_cache="revalidated")
+
+            if with_source:
+                html = await page.read_all()
+            else:
+                html = await _read_html_for_summary(page, platform)
+            fetch_seconds = time.perf_counter() - started
+
+            # OG tags, media flags (+ native text if needed), parsed once on a
+            # worker so the event loop keeps serving fetches
+            with span("extract", html_chars=len(html)):
+                record = await run_in_pool(extract_page_record, html, url, with_source)
+                _observe_extraction(record, platform)
+            if not page.complete and not record.og_description.strip():
+                # The head promised a description but it was empty: scrape the body.
+                reread = time.perf_counter()
+                html = await page.read_all()
+                fetch_seconds += time.perf_counter() - reread
+                with span("extract", html_chars=len(html)):
+                    record = await run_in_pool(extract_page_record, html, url, with_source)
+                    _observe_extraction(record, platform)
+
+            # Capped, refused or cut-off bodies are never cached (nor pooled,
+            # see stream_html); a head-only read within limits is.
+            if page.status == 200 and page.intact:
+                page_cache.store(key, record, page.headers)
+
+            return record, _fetch_facts(
+                record,
+                page_cache="miss",
+                html_complete=page.drained,
+                html_bytes_read=page.bytes_read,
+                html_truncated=page.truncated,
+                fetch_rejected=page.rejected,
+                fetch_failed=page.failed,
+            )
+    finally:
+        if fetch_seconds is None:
+            FETCH_SECONDS.observe(
+                time.perf_counter() - started, platform=platform, outcome="error"
+            )
+        else:
+            FETCH_SECONDS.observe(
+                fetch_seconds, platform=platform, outcome=_fetch_outcome(page)
+            )
+            FETCH_BYTES.inc(page.bytes_read, platform=platform)
+
+
+def _fetch_outcome(page) -> str:
+    if page.not_modified:
+        return "not_modified"
+    if page.rejected:
+        return "rejected"
+    if page.status != 200:
+        return "http_error"
+    if page.failed:
+        return "read_error"
+    return "truncated" if page.truncated else "ok"
+
+
+def _observe_extraction(record: PageRecord, platform: str):
+    record_durations(record.timings)  # MEASURED ON THE WORKER
+    for stage, seconds in record.timings:
+        if stage == "parse":
+            PARSE_SECONDS.observe(seconds, platform=platform)
+        else:
+            EXTRACTOR_SECONDS.observe(seconds, extractor=stage)
+
+
+def _fetch_facts(record: PageRecord, **facts) -> dict:
+    out = {
+        "html_length": record.html_length,
+        "html_complete": True,
+        "html_bytes_read": 0,
+        "html_truncated": False,
+        "fetch_rejected": "",
+        "fetch_failed": "",
+    }
+    out.update(facts)
+    return out
+
+
+async def _read_html_for_summary(page, platform: str) -> str:
+    # Social pages keep their media flags/poster in embedded JSON: read it all.
+    # A web page whose head has a description stops there, so its media flags
+    # come from head tags (og:video, og:type) and not from JSON in the body.
+    if platform != "web" or not HEAD_ONLY_FETCH:
+        return await page.read_all()
+
+    html = await page.read_head()
+    if page.scanner.needs_body:
+        return await page.read_all()
+    return html
+
+
 def _debug_payload(**kwargs):
     debug = {"debug": True}
     debug.update(kwargs)
     return debug
 
 
+# ---------- /summarize result cache ----------
+# Keyed by cache_key_for_url (tracking params stripped). Social posts get
+# edited/deleted more often than articles, so they expire sooner. Bounded by
+# entry count and by the serialized size of the stored responses (debug
+# payloads carry page-derived strings, so entries vary a lot in size).
+def _summary_weight(result: dict) -> int:
+    return len(json.dumps(result, ensure_ascii=False, default=str))
+
+
+SUMMARY_CACHE = TTLCache(
+    max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "2048")),
+    max_weight=int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+    weigh=_summary_weight,
+)
+SUMMARY_CACHE_TTLS = {
+    "instagram": float(os.getenv("SUMMARY_CACHE_TTL_INSTAGRAM", "600")),
+    "facebook": float(os.getenv("SUMMARY_CACHE_TTL_FACEBOOK", "600")),
+    "threads": float(os.getenv("SUMMARY_CACHE_TTL_THREADS", "300")),
+    "twitter": float(os.getenv("SUMMARY_CACHE_TTL_TWITTER", "0")),
+    "web": float(os.getenv("SUMMARY_CACHE_TTL_WEB", "3600")),
+}
+# Only page-derived answers are cached; fallback quips stay fresh per request.
+CACHEABLE_SUMMARY_SOURCES = {"og_description", "native_scrape"}
+
+
+def _store_summary(url: str, platform: str, result: dict):
+    if result.get("debug", {}).get("summary_source") in CACHEABLE_SUMMARY_SOURCES:
+        SUMMARY_CACHE.set(
+            cache_key_for_url(url),
+            copy.deepcopy(result),
+            ttl=SUMMARY_CACHE_TTLS.get(platform, 0),
+        )
+
+
+def _cached_summary(url: str) -> dict | None:
+    cached = SUMMARY_CACHE.get(cache_key_for_url(url))
+    if cached is None:
+        return None
+
+    result = copy.deepcopy(cached)
+    debug = result["debug"]
+    debug.update(url_received=url, cache="hit")
+
+    # The OG summary/image/media are stable; a random fallback image is not.
+    if debug.get("image_source") == "fallback":
+        old_img = result.get("og_image")
+        img, msg = extract_og_image("", url)
+        result["og_image"] = img
+        debug.update(fallback_image=img, fallback_message=msg or "", final_image=img)
+        if result["media"].get("poster_image") == old_img:
+            result["media"]["poster_image"] = img
+            debug["media_poster_image"] = img
+    return result
+
+
+# ---------- in-flight coalescing ----------
+# A viral link arrives many times at once: identical URLs (by cache key)
+# share one fetch/extract(/HF) run and each caller gets its own copy.
+SUMMARY_FLIGHTS = SingleFlight()
+HF_ROUTE_FLIGHTS = SingleFlight()
+
+
+@app.get("/debug/cache")
+async def cache_stats():
+    return {
+        "summary": SUMMARY_CACHE.stats(),
+        "hf": await HF_SUMMARY_CACHE.stats(),
+        "pages": page_cache.PAGE_CACHE.stats(),
+        "in_flight": {
+            "summarize": SUMMARY_FLIGHTS.stats(),
+            "summarize_hf": HF_ROUTE_FLIGHTS.stats(),
+            "hf_call": HF_CALL_FLIGHTS.stats(),
+        },
+    }
+
+
+@app.get("/debug/hf-health")
+def hf_health():
+    return {"endpoints": HF_HEALTH.snapshot()}
+
+
+@app.get("/debug/local-engine")
+def local_engine():
+    return local_engine_stats()
+
+
+# ---------- /metrics (Prometheus text format) ----------
+# Stage histograms and answer counters are recorded as requests run (see
+# backend/metrics.py); cache, in-flight, breaker and batcher numbers are
+# read from their owners at scrape time.
+def _collect_runtime_metrics():
+    caches = {
+        "summary": SUMMARY_CACHE,
+        "pages": page_cache.PAGE_CACHE,
+        "hf_memory": HF_SUMMARY_CACHE.memory,
+    }
+    if HF_SUMMARY_CACHE.disk is not None:
+        caches["hf_disk"] = HF_SUMMARY_CACHE.disk
+
+    hits = Counter("takeaways_cache_hits_total", "Cache lookups that hit.", ("cache",))
+    misses = Counter("takeaways_cache_misses_total", "Cache lookups that missed.", ("cache",))
+    evictions = Counter(
+        "takeaways_cache_evictions_total", "Entries evicted for space.", ("cache",)
+    )
+    ratio = Gauge("takeaways_cache_hit_ratio", "hits / (hits + misses).", ("cache",))
+    for name, cache in caches.items():
+        hits.inc(cache.hits, cache=name)
+        misses.inc(cache.misses, cache=name)
+        evictions.inc(cache.evictions, cache=name)
+        lookups = cache.hits + cache.misses
+        ratio.set(cache.hits / lookups if lookups else 0.0, cache=name)
+
+    entries = Gauge("takeaways_cache_entries", "Entries held in memory.", ("cache",))
+    for name in ("summary", "pages", "hf_memory"):
+        entries.set(len(caches[name]), cache=name)
+
+    in_flight = Gauge("takeaways_in_flight", "Coalesced runs in flight.", ("flight",))
+    joined = Counter(
+        "takeaways_flight_joined_total", "Callers that joined a run in flight.", ("flight",)
+    )
+    for name, flights in (
+        ("summarize", SUMMARY_FLIGHTS),
+        ("summarize_hf", HF_ROUTE_FLIGHTS),
+        ("hf_call", HF_CALL_FLIGHTS),
+    ):
+        stats = flights.stats()
+        in_flight.set(stats["in_flight"], flight=name)
+        joined.inc(stats["joined"], flight=name)
+
+    breaker_open = Gauge(
+        "takeaways_hf_endpoint_open", "1 while an HF endpoint's breaker is open.", ("endpoint",)
+    )
+    for url, health in HF_HEALTH.snapshot().items():
+        breaker_open.set(1 if health["state"] == "open" else 0, endpoint=url)
+
+    batchers = local_engine_stats()["batchers"]
+    queue = Gauge("takeaways_local_batch_queue_depth", "Prompts waiting for the local engine.")
+    queue.set(sum(b["queue_depth"] for b in batchers))
+    batches = Counter("takeaways_local_batches_total", "generate() batches run locally.")
+    batches.inc(sum(b["batches"] for b in batchers))
+    prompts = Counter("takeaways_local_batch_prompts_total", "Prompts submitted locally.")
+    prompts.inc(sum(b["submitted"] for b in batchers))
+
+    return [
+        hits,
+        misses,
+        evictions,
+        ratio,
+        entries,
+        in_flight,
+        joined,
+        breaker_open,
+        queue,
+        batches,
+        prompts,
+    ]
+
+
+REGISTRY.add_collector(_collect_runtime_metrics)
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # =========================
 # MAIN SUMMARIZATION ROUTE
 # =========================
 @app.post("/summarize")
-async def summarize(input: URLInput):
+async def summarize(input: URLInput, trace: bool = False):
+    # ?trace=1 adds per-stage span timings under debug.trace
     url = input.url.strip()
-    print(f"🔵 URL received: {url}")
+    with start_trace("summarize", force=trace, url=url) as root:
+        result = await _summarize_cached(url)
+    if trace:
+        result.setdefault("debug", {})["trace"] = root.trace.as_debug()
+    return result
+
+
+async def _summarize_cached(url: str) -> dict:
+    log.info("🔵 URL received: %s", url, extra=SAMPLED)
+
+    cached = _cached_summary(url)
+    annotate(cache="miss" if cached is None else "hit")
+    if cached is not None:
+        log.debug("♻️ Serving cached summary")
+        _count_summary(cached)
+        return cached
+
+    result = await SUMMARY_FLIGHTS.do(
+        cache_key_for_url(url), lambda: _summarize_and_store(url)
+    )
+    result.get("debug", {})["url_received"] = url
+    _count_summary(result)
+    return result
+
+
+def _count_summary(result: dict):
+    debug = result.get("debug", {})
+    SUMMARY_SOURCE_TOTAL.inc(summary_source=debug.get("summary_source", "unknown"))
+    IMAGE_SOURCE_TOTAL.inc(image_source=debug.get("image_source", "unknown"))
+
+
+async def _summarize_and_store(url: str) -> dict:
     platform = detect_platform(url)
+    result = await _summarize_url(url, platform)
+    _store_summary(url, platform, result)
+    return result
 
+
+async def _summarize_url(url: str, platform: str) -> dict:
     try:
-        html = await fetch_html(url)
-        print("🟢 HTML fetched successfully")
+        # 1) OG tags, media flags (+ native text if needed), cached or fresh
+        record, fetch_facts = await _load_page_record(url, platform)
+        log.debug("🟢 HTML fetched successfully")
 
-        # 1) OG tags
-        og_image_from_tags, og_desc = extract_og_tags(html, url)
-        media = extract_media_metadata(html, url)
+        og_image_from_tags = record.og_image
+        og_desc = record.og_description
+        media = record.media()
 
         # 2) Stable image fallback for THIS call
-        loop_img, fallback_msg = extract_og_image(html, url)
+        loop_img, fallback_msg = image_choice(record, url)
         final_img = og_image_from_tags or loop_img
         image_source = "og_tags" if og_image_from_tags else "fallback"
         if final_img and not media.get("poster_image"):
@@ -116,7 +502,7 @@ async def summarize(input: URLInput):
         debug_base = _debug_payload(
             url_received=url,
             platform=platform,
-            html_length=len(html or ""),
+            **fetch_facts,
             og_image_from_tags=og_image_from_tags or "",
             fallback_image=loop_img or "",
             fallback_message=fallback_msg or "",
@@ -127,7 +513,7 @@ async def summarize(input: URLInput):
 
         # 3) If author provided ANY og:description, use it
         if og_desc and og_desc.strip():
-            print("🟠 Using og:description")
+            log.debug("🟠 Using og:description")
             return {
                 "summary": trim_to_280(og_desc),
                 "used_huggingface": False,
@@ -143,10 +529,10 @@ async def summarize(input: URLInput):
             }
 
         # 4) Next: native paragraph-like scrape (if anything came back)
-        native = (extract_paragraph_like_block(html) or "").strip()
-        print(f"🟡 Native text extracted: {native[:300]}")
+        native = record.native
+        log.debug("🟡 Native text extracted: %s", capped(native, 300))
         if native:
-            print("🟠 Using native scrape")
+            log.debug("🟠 Using native scrape")
             return {
                 "summary": trim_to_280(native),
                 "used_huggingface": False,
@@ -156,13 +542,16 @@ async def summarize(input: URLInput):
                     **debug_base,
                     "summary_source": "native_scrape",
                     "og_description": og_desc or "",
-                    "native_text_length": len(native),
+                    "native_text_length": record.native_length,
                     "native_text_sample": native[:500],
                 },
             }
 
         # 5) Stop here. /summarize is metadata/native-only; HF is explicit via /summarize/hf.
-        print("🧸 No OG/meta/native text found — returning non-HF fallback.")
+        log.info(
+            "🧸 No OG/meta/native text found — returning non-HF fallback.",
+            extra=SAMPLED,
+        )
         return {
             "summary": fallback_msg or "There is literally no page text to summarize!",
             "used_huggingface": False,
@@ -178,7 +567,7 @@ async def summarize(input: URLInput):
         }
 
     except Exception as e:
-        print(f"🔥 ERROR in /summarize: {e}")
+        log.error("🔥 ERROR in /summarize: %s", e, exc_info=True)
         # Show a deterministic image even on exception
         try:
             img, fallback_msg = extract_og_image("", url)
@@ -211,39 +600,143 @@ async def summarize(input: URLInput):
         }
 
 
+# =========================
+# BATCH SUMMARIZATION ROUTES
+# =========================
+# Same cached /summarize path per URL, fanned out with a global cap shared
+# by every batch in flight and a per-batch host cap so one batch can't
+# hammer a single origin.
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+BATCH_PER_HOST_CONCURRENCY = int(os.getenv("BATCH_PER_HOST_CONCURRENCY", "4"))
+_batch_slots: asyncio.Semaphore | None = None
+_batch_slots_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _batch_global_slots() -> asyncio.Semaphore:
+    # One limiter per process; rebuilt only if the event loop changed (tests)
+    global _batch_slots, _batch_slots_loop
+    loop = asyncio.get_running_loop()
+    if _batch_slots is None or _batch_slots_loop is not loop:
+        _batch_slots = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+        _batch_slots_loop = loop
+    return _batch_slots
+
+
+def _batch_urls(input: URLBatchInput) -> list[str]:
+    urls = [(u or "").strip() for u in input.urls]
+    if len(urls) > BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=413, detail=f"Batch is limited to {BATCH_MAX_URLS} URLs."
+        )
+    return urls
+
+
+def _batch_tasks(urls: list[str]) -> list[asyncio.Task]:
+    global_slots = _batch_global_slots()
+    host_slots = defaultdict(
+        lambda: asyncio.Semaphore(max(1, BATCH_PER_HOST_CONCURRENCY))
+    )
+
+    async def run_one(index: int, url: str) -> dict:
+        host = urlparse(cache_key_for_url(url)).netloc
+        try:
+            # Host slot first, so a URL queued behind its host holds no global slot
+            async with host_slots[host], global_slots:
+                with start_trace("summarize", url=url, batch_index=index):
+                    result = await _summarize_cached(url)
+        except Exception as e:
+            log.error("🔥 ERROR in batch item %d: %s", index, e, exc_info=True)
+            return {"index": index, "url": url, "ok": False, "error": str(e)}
+
+        error = result.get("debug", {}).get("error")
+        item = {"index": index, "url": url, "ok": error is None, "result": result}
+        if error is not None:
+            item["error"] = error
+        return item
+
+    return [asyncio.create_task(run_one(i, url)) for i, url in enumerate(urls)]
+
+
+@app.post("/summarize/batch")
+async def summarize_batch(input: URLBatchInput):
+    tasks = _batch_tasks(_batch_urls(input))
+    try:
+        return {"results": list(await asyncio.gather(*tasks))}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/summarize/batch/stream")
+async def summarize_batch_stream(input: URLBatchInput):
+    urls = _batch_urls(input)
+
+    async def ndjson():
+        tasks = _batch_tasks(urls)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client went away: stop the rest of the batch
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 # =========================
 # MANUAL PEGASUS ROUTE
 # =========================
 @app.post("/summarize/hf")
-async def summarize_with_hf(input: URLInput):
+async def summarize_with_hf(input: URLInput, trace: bool = False):
     url = input.url.strip()
-    print(f"🤖 FORCED HF: {url}")
+    log.info("🤖 FORCED HF: %s", url, extra=SAMPLED)
+    with start_trace("summarize_hf", force=trace, url=url) as root:
+        result = await HF_ROUTE_FLIGHTS.do(
+            cache_key_for_url(url), lambda: _summarize_with_hf(url)
+        )
+    HF_ROUTE_TOTAL.inc(used_huggingface=str(bool(result.get("used_huggingface"))).lower())
+    if trace:
+        result.setdefault("debug", {})["trace"] = root.trace.as_debug()
+    return result
 
+
+async def _summarize_with_hf(url: str) -> dict:
     try:
-        html = await fetch_html(url)
-        media = extract_media_metadata(html, url)
+        record, _ = await _load_page_record(url, detect_platform(url), with_source=True)
+        media = record.media()
 
         # Choose image + quip once
-        og_img_from_tags, _ = extract_og_tags(html, url)
-        final_img, weird_msg = extract_og_image(html, url)
+        og_img_from_tags = record.og_image
+        final_img, weird_msg = image_choice(record, url)
         if og_img_from_tags:
             final_img, weird_msg = og_img_from_tags, None  # OG wins
         if final_img and not media.get("poster_image"):
             media["poster_image"] = final_img
 
         # Source text for Pegasus
-        source_text = extract_social_content_for_hf(html, url)
+        source_text = record.source_text
 
-        # Try HF a few times; accept WeirdLink default or any non‑empty HF text
+        # Try HF a few times; accept WeirdLink default or any non‑empty HF text.
+        # Every attempt shares one budget so a dead HF can't hold the request.
         max_retries = 3
         summary = None
+        deadline = time.monotonic() + HF_ROUTE_BUDGET_SECONDS
         for attempt in range(1, max_retries + 1):
-            print(f"🔁 Pegasus attempt {attempt}...")
-            summary = await get_best_summary(source_text, default_weird_msg=weird_msg)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                log.warning("⏱️  Pegasus budget spent after %d attempt(s)", attempt - 1)
+                break
+            log.debug("🔁 Pegasus attempt %d...", attempt)
+            with span("pegasus_attempt", attempt=attempt):
+                summary = await get_best_summary(
+                    source_text, default_weird_msg=weird_msg, timeout=remaining
+                )
             if summary == weird_msg or (summary and summary.strip()):
                 break
 
-        print(f"✅ Pegasus returned after {attempt} attempt(s):\n{summary}\n")
+        log.debug("✅ Pegasus returned after %d attempt(s): %s", attempt, capped(summary))
 
         used_hf = not (summary == weird_msg)
 
@@ -255,7 +748,7 @@ async def summarize_with_hf(input: URLInput):
         }
 
     except Exception as e:
-        print(f"💥 FORCED HF ERROR: {e}")
+        log.error("💥 FORCED HF ERROR: %s", e, exc_info=True)
         try:
             img, fallback_msg = extract_og_image("", url)
         except Exception:
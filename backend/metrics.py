@@ -0,0 +1,252 @@
+# backend/metrics.py
+# ------------------------------------------------------------
+# Prometheus text-format metrics, no client library needed.
+# - Counter / Gauge / Histogram with fixed label names
+# - REGISTRY.render() -> the /metrics body (text format 0.0.4)
+# - REGISTRY.add_collector(fn): fn() returns freshly built metrics at
+#   scrape time (cache stats, in-flight counts, batcher queues...)
+# Every metric the app exports is declared at the bottom of this file, so
+# this is the one place to look up a name. Safe to update from worker
+# threads; parse/extractor timings from a process pool travel back on the
+# PageRecord (backend/pipeline.py) and are recorded in the parent.
+# ------------------------------------------------------------
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# SECONDS. FETCH/HF: NETWORK-SHAPED. STAGE: SUB-MILLISECOND UP TO A HUGE PAGE.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        if len(labels) != len(self.label_names) or set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} takes labels {self.label_names}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def lines(self) -> list[str]:
+        out = [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            for key, value in items:
+                out.extend(self._sample_lines(key, value))
+        return out
+
+    def _sample_lines(self, key: tuple[str, ...], value) -> list[str]:
+        labels = _format_labels(self.label_names, key)
+        return [f"{self.name}{labels} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        if "le" in self.label_names:
+            raise ValueError("'le' is reserved for histogram buckets")
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [PER-BUCKET COUNTS..., +Inf COUNT], SUM
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def _sample_lines(self, key: tuple[str, ...], value) -> list[str]:
+        counts, total = value
+        names = self.label_names + ("le",)
+        out = []
+        running = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            running += count
+            labels = _format_labels(names, key + (_format_value(bound),))
+            out.append(f"{self.name}_bucket{labels} {running}")
+        labels = _format_labels(self.label_names, key)
+        out.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        out.append(f"{self.name}_count{labels} {running}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[_Metric]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collect: Callable[[], Iterable[_Metric]]):
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collect in collectors:
+            metrics.extend(collect())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---- EVERY METRIC THE APP RECORDS DIRECTLY ----
+FETCH_SECONDS = REGISTRY.histogram(
+    "takeaways_fetch_seconds",
+    "Time to fetch a page (connect through last byte read), by platform and outcome.",
+    ("platform", "outcome"),
+)
+FETCH_BYTES = REGISTRY.counter(
+    "takeaways_fetch_bytes_total",
+    "Response body bytes read from origins.",
+    ("platform",),
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "takeaways_parse_seconds",
+    "HTML parse time per page (soup and/or meta index), by platform.",
+    ("platform",),
+    STAGE_BUCKETS,
+)
+EXTRACTOR_SECONDS = REGISTRY.histogram(
+    "takeaways_extractor_seconds",
+    "Time inside each extractor, excluding the parse it triggers.",
+    ("extractor",),
+    STAGE_BUCKETS,
+)
+HF_REQUEST_SECONDS = REGISTRY.histogram(
+    "takeaways_hf_request_seconds",
+    "One summarization attempt, by model, API (pipeline/models/local) and outcome.",
+    ("model", "api", "outcome"),
+)
+SUMMARY_SOURCE_TOTAL = REGISTRY.counter(
+    "takeaways_summary_source_total",
+    "/summarize answers by where the summary came from.",
+    ("summary_source",),
+)
+IMAGE_SOURCE_TOTAL = REGISTRY.counter(
+    "takeaways_image_source_total",
+    "/summarize answers by where the image came from.",
+    ("image_source",),
+)
+HF_ROUTE_TOTAL = REGISTRY.counter(
+    "takeaways_hf_route_total",
+    "/summarize/hf answers by whether a model summary was used.",
+    ("used_huggingface",),
+)
@@ -0,0 +1,156 @@
+# backend/microbatch.py
+# ------------------------------------------------------------
+# Micro-batching in front of a batch-friendly coroutine.
+# - await batcher.submit(item) -> that item's result
+# - pending items are gathered for up to max_wait_ms or max_batch items,
+#   whichever comes first, and run as ONE call to run_batch(items)
+# - at most `concurrency` batches run at once; while they're busy, new
+#   items keep piling up, so the next batch is naturally bigger
+# - the queue holds at most max_queue items; submit() waits for room
+#   (backpressure) instead of growing without bound
+# run_batch gets a list and must return a list of results in the same order.
+# close() (app shutdown) stops the collector and cancels batches in flight.
+# ------------------------------------------------------------
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        run_batch: Callable[[list[Any]], Awaitable[list[Any]]],
+        max_batch: int = 8,
+        max_wait_ms: float = 15.0,
+        max_queue: int = 256,
+        concurrency: int = 1,
+    ):
+        self.run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue = max(1, max_queue)
+        self.concurrency = max(1, concurrency)
+
+        self.submitted = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.largest_batch = 0
+        self.failed_batches = 0
+        self.total_queue_wait = 0.0
+
+        self._queue: asyncio.Queue | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._worker: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()  # STRONG REFS TO BATCHES IN FLIGHT
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._worker = None
+            self._running = set()
+            self._loop = loop
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._collect_forever())
+
+    async def submit(self, item: Any) -> Any:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.monotonic()))
+        self.submitted += 1
+        return await future
+
+    async def _collect_forever(self):
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Late arrivals that are already queued ride along for free.
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def close(self):
+        """Stop collecting, cancel batches in flight and fail whatever is queued."""
+        if self._loop is not asyncio.get_running_loop():
+            self._worker, self._running = None, set()  # ITS LOOP IS GONE
+            return
+        tasks = [t for t in (self._worker, *self._running) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("batcher closed"))
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future, float]]):
+        try:
+            live = [entry for entry in batch if not entry[1].done()]  # skip cancelled
+            if not live:
+                return
+
+            now = time.monotonic()
+            self.batches += 1
+            self.batched_items += len(live)
+            self.largest_batch = max(self.largest_batch, len(live))
+            self.total_queue_wait += sum(now - queued_at for _, _, queued_at in live)
+
+            try:
+                results = await self.run_batch([item for item, _, _ in live])
+                if len(results) != len(live):
+                    raise RuntimeError(
+                        f"run_batch returned {len(results)} results for {len(live)} items"
+                    )
+            except asyncio.CancelledError:
+                for _, future, _ in live:
+                    future.cancel()  # CLOSED UNDER THEM: DON'T LEAVE WAITERS HANGING
+                raise
+            except Exception as e:
+                self.failed_batches += 1
+                for _, future, _ in live:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for (_, future, _), result in zip(live, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "concurrency": self.concurrency,
+            "submitted": self.submitted,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": (
+                round(self.batched_items / self.batches, 3) if self.batches else 0.0
+            ),
+            "avg_queue_wait_ms": (
+                round(self.total_queue_wait / self.batched_items * 1000, 3)
+                if self.batched_items
+                else 0.0
+            ),
+        }
@@ -0,0 +1,125 @@
+# backend/page_cache.py
+# ------------------------------------------------------------
+# HTTP-aware page cache in front of the fetch + extract step.
+# - lookup(key) -> CachedPage | None
+# - conditional_headers(entry) -> If-None-Match / If-Modified-Since
+# - store(key, record, headers) after a 200
+# - refresh(key, entry, headers) after a 304
+# Fresh entries (Cache-Control max-age / s-maxage) skip the network;
+# stale ones are revalidated so an unchanged page costs one 304.
+# no-store responses are never kept; no-cache ones always revalidate.
+# Entries hold the page's PageRecord (backend/pipeline.py), not its HTML:
+# a 304 skips the download AND the parse, and each entry is ~1 KB.
+#
+# TUNING (backend/.env):
+#   PAGE_CACHE_MAX_ENTRIES=100000
+#   PAGE_CACHE_MAX_BYTES=134217728  (TOTAL RECORD SIZE, ~128 MB)
+#   PAGE_CACHE_TTL_SECONDS=86400    (HOW LONG A VALIDATOR IS WORTH KEEPING)
+#   PAGE_CACHE_TTL_SECONDS=0        (DISABLES THE PAGE CACHE)
+# ------------------------------------------------------------
+
+import os
+import time
+from typing import Any, Mapping
+
+from .cache import TTLCache
+
+PAGE_CACHE_TTL_SECONDS = float(os.getenv("PAGE_CACHE_TTL_SECONDS", "86400"))
+
+
+class CachedPage:
+    __slots__ = ("record", "etag", "last_modified", "fresh_until", "no_cache")
+
+    def __init__(
+        self,
+        record: Any,
+        etag: str = "",
+        last_modified: str = "",
+        fresh_until: float = 0.0,
+        no_cache: bool = False,
+    ):
+        self.record = record
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+        self.no_cache = no_cache
+
+    @property
+    def fresh(self) -> bool:
+        return not self.no_cache and self.fresh_until > time.monotonic()
+
+
+PAGE_CACHE = TTLCache(
+    max_entries=int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "100000")),
+    default_ttl=PAGE_CACHE_TTL_SECONDS,
+    max_weight=int(os.getenv("PAGE_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+    weigh=lambda entry: entry.record.weight(),
+)
+
+
+def parse_cache_control(value: str) -> dict[str, str]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"')
+    return directives
+
+
+def _max_age(directives: dict[str, str]) -> float:
+    for name in ("s-maxage", "max-age"):
+        try:
+            return max(0.0, float(directives[name]))
+        except (KeyError, ValueError):
+            continue
+    return 0.0
+
+
+def lookup(key: str) -> CachedPage | None:
+    return PAGE_CACHE.get(key)
+
+
+def conditional_headers(entry: CachedPage) -> dict[str, str]:
+    headers = {}
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def store(key: str, record: Any, headers: Mapping[str, str]):
+    directives = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-store" in directives:
+        PAGE_CACHE.pop(key)
+        return
+
+    entry = CachedPage(
+        record,
+        etag=headers.get("ETag", ""),
+        last_modified=headers.get("Last-Modified", ""),
+        fresh_until=time.monotonic() + _max_age(directives),
+        no_cache="no-cache" in directives,
+    )
+    if entry.etag or entry.last_modified or entry.fresh:
+        PAGE_CACHE.set(key, entry)
+    else:
+        PAGE_CACHE.pop(key)  # NOTHING TO REVALIDATE WITH, NOTHING FRESH
+
+
+def refresh(key: str, entry: CachedPage, headers: Mapping[str, str]):
+    """A 304 confirmed `entry`; take any updated validators/freshness."""
+    directives = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-store" in directives:
+        PAGE_CACHE.pop(key)
+        return
+    entry.etag = headers.get("ETag", entry.etag)
+    entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+    if directives:
+        entry.fresh_until = time.monotonic() + _max_age(directives)
+        entry.no_cache = "no-cache" in directives
+    PAGE_CACHE.set(key, entry)
+
+
+def forget(key: str):
+    PAGE_CACHE.pop(key)
@@ -0,0 +1,168 @@
+# backend/pipeline.py
+# ------------------------------------------------------------
+# The parse-bound half of each route, as plain sync functions.
+# main.py ships these to the worker pool (backend/workers.py) so a
+# multi-megabyte page never stalls the event loop. Inputs and outputs
+# are plain str / PageRecord so they also work with EXTRACT_POOL=process.
+#
+# A PageRecord is everything both routes use from a page, in a few hundred
+# bytes: it is what the page cache (backend/page_cache.py) keeps instead of
+# the raw HTML, so a cached URL costs ~1 KB rather than ~1 MB. It also carries
+# the parse/extractor timings back from the worker for /metrics.
+# ------------------------------------------------------------
+
+import re
+import time
+from typing import Any
+
+from .document import parse_document
+from .extract import (
+    extract_media_metadata,
+    extract_og_tags,
+    extract_paragraph_like_block,
+)
+from .summarizer import (
+    INPUT_CHAR_CAP,
+    _is_twitter_url,
+    extract_og_image,
+    extract_social_content_for_hf,
+)
+
+NATIVE_TEXT_CAP = 2000  # /summarize shows 280 chars and a 500-char debug sample
+_NON_SPACE_RE = re.compile(r"\S")
+
+
+def hf_source_prefix(text: str) -> str:
+    """
+    The shortest prefix of stripped `text` that get_best_summary treats exactly
+    like the whole: same first INPUT_CHAR_CAP chars, still longer than the cap
+    after its own strip() (so _cap_to cuts the same way), and the same
+    SHORT_COPY_LEN verdict. Whitespace right at the cap is kept up to the next
+    visible char, which stops strip() pulling the text back under the cap.
+    """
+    if len(text) <= INPUT_CHAR_CAP:
+        return text
+    m = _NON_SPACE_RE.search(text, INPUT_CHAR_CAP)
+    return text[: m.end()] if m else text[:INPUT_CHAR_CAP].rstrip()
+
+
+class PageRecord:
+    """
+    Compact extraction result for one fetched page. `source_text` is None
+    when the Pegasus source text wasn't computed (the /summarize path).
+    """
+
+    __slots__ = (
+        "og_image",
+        "og_description",
+        "platform",
+        "kind",
+        "is_video",
+        "is_reel",
+        "is_carousel",
+        "poster_image",
+        "content_type",
+        "signals",
+        "native",
+        "native_length",
+        "source_text",
+        "html_length",
+        "timings",
+    )
+
+    def __init__(
+        self,
+        og_image: str,
+        og_description: str,
+        media: dict[str, Any],
+        native: str = "",
+        source_text: str | None = None,
+        html_length: int = 0,
+        timings: tuple[tuple[str, float], ...] = (),
+    ):
+        self.og_image = og_image or ""
+        self.og_description = og_description or ""
+        self.platform = media.get("platform", "web")
+        self.kind = media.get("kind", "link")
+        self.is_video = bool(media.get("is_video"))
+        self.is_reel = bool(media.get("is_reel"))
+        self.is_carousel = bool(media.get("is_carousel"))
+        self.poster_image = media.get("poster_image", "") or ""
+        self.content_type = media.get("content_type", "") or ""
+        self.signals = tuple(media.get("signals", ()))
+        self.native = native[:NATIVE_TEXT_CAP]
+        self.native_length = len(native)  # BEFORE THE CAP, FOR THE DEBUG PAYLOAD
+        self.source_text = source_text
+        self.html_length = html_length
+        self.timings = timings
+
+    def media(self) -> dict[str, Any]:
+        """A fresh media dict in the shape extract_media_metadata returns."""
+        return {
+            "platform": self.platform,
+            "kind": self.kind,
+            "is_video": self.is_video,
+            "is_reel": self.is_reel,
+            "is_carousel": self.is_carousel,
+            "poster_image": self.poster_image,
+            "content_type": self.content_type,
+            "signals": list(self.signals),
+        }
+
+    def weight(self) -> int:
+        """Rough size in characters, for the page cache's byte budget."""
+        return (
+            len(self.og_image)
+            + len(self.og_description)
+            + len(self.poster_image)
+            + len(self.content_type)
+            + sum(len(s) for s in self.signals)
+            + len(self.native)
+            + len(self.source_text or "")
+            + 64
+        )
+
+
+def extract_page_record(html: str, url: str, with_source: bool = False) -> PageRecord:
+    """
+    Everything the routes need from one page. The native scrape only runs
+    when there is no og:description to use; the Pegasus source text only
+    when `with_source` (/summarize/hf).
+    """
+    doc = parse_document(html)  # parsed once, shared by every extractor below
+    timings = []
+
+    def timed(fn, *args):
+        # Extractor time minus whatever lazy parse it triggered
+        started, parsed = time.perf_counter(), doc.parse_seconds
+        out = fn(*args)
+        elapsed = time.perf_counter() - started - (doc.parse_seconds - parsed)
+        timings.append((fn.__name__, elapsed))
+        return out
+
+    og_image, og_desc = timed(extract_og_tags, doc, url)
+    media = timed(extract_media_metadata, doc, url)
+
+    native = ""
+    if not (og_desc and og_desc.strip()):
+        native = (timed(extract_paragraph_like_block, doc) or "").strip()
+
+    source_text = None
+    if with_source:
+        source_text = timed(extract_social_content_for_hf, doc, url).strip()
+        source_text = hf_source_prefix(source_text)
+
+    timings.append(("parse", doc.parse_seconds))
+    return PageRecord(
+        og_image, og_desc, media, native, source_text, len(html or ""), tuple(timings)
+    )
+
+
+def image_choice(record: PageRecord, url: str) -> tuple[str, str | None]:
+    """
+    extract_og_image() without the HTML: the page's og:image if it had one
+    (X always gets its fallback), otherwise a fallback image + quip.
+    """
+    if record.og_image and not _is_twitter_url(url):
+        return record.og_image, None
+    return extract_og_image("", url)
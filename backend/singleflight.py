@@ -0,0 +1,50 @@
+# backend/singleflight.py
+# ------------------------------------------------------------
+# In-flight request coalescing.
+# - SingleFlight.do(key, fn) runs fn() once per key at a time; callers that
+#   arrive while it is running await the same task instead of starting another
+# Everyone gets their own deep copy of the result, so one caller mutating
+# its dict can't leak into another response. Errors reach every caller.
+# The shared task is shielded: one client disconnecting doesn't cancel the
+# work the others are waiting on.
+# ------------------------------------------------------------
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self, copy_result: Callable[[Any], Any] = copy.deepcopy):
+        self._copy = copy_result
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.joined = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.joined += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+
+        return self._copy(await asyncio.shield(task))
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # MARK RETRIEVED EVEN IF EVERY CALLER WENT AWAY
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "joined": self.joined,
+        }
@@ -6,13 +6,45 @@
 
 import os
 import re
-import sys
+import logging
 import json
+import time
+import codecs
+import asyncio
+import hashlib
 import aiohttp
-from bs4 import BeautifulSoup
+from bs4 import Tag
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from urllib.parse import urlparse
-
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from .cache import SqliteTTLStore, TieredCache, TTLCache
+from .cleaning import (  # noqa: F401 (RE-EXPORTED)
+    DATE_RE,
+    HASHTAG_RE,
+    IG_PREFIX_RE,
+    IG_STATS_PREFIX_RE,
+    LIKED_BY_RE,
+    LIKES_COUNT_RE,
+    MENTION_RE,
+    TIME_AGO_RE,
+    TRAILING_ELLIPSIS_RE,
+    TRAILING_PUNCT_RE,
+    WHITESPACE_RE,
+    collapse_whitespace,
+    end_on_solid_word,
+    looks_like_threads_chrome as _looks_like_threads_chrome,
+    strip_caption_noise,
+    strip_matching_quotes,
+)
+from .document import ParsedDocument, as_document
+from .hf_health import HF_HEALTH
+from .http_client import get_session
+from .local_engine import engine_fingerprint, local_engine_enabled, summarize_batched
+from .logs import capped as _cap, get_logger
+from .metrics import HF_REQUEST_SECONDS
+from .tracing import span
+from .singleflight import SingleFlight
 from .fallbacks import (
     next_threads_fallback,
     next_twitter_fallback,
@@ -30,41 +62,24 @@ load_dotenv()
 # DEBUGGING
 # ------------------------------------------------------------
 # SET ONE OF THESE IN backend/.env IF YOU WANT NOISE:
-#   DEBUG_SUMMARY=1          (GENERAL FLOW LOGS)
-#   DEBUG_OG=1               (OG TAG LOGS + CLEANING)
-#   DEBUG_HF=1               (HF PROMPT + HF CALL LOGS)
+#   LOG_LEVELS=summary=DEBUG (GENERAL FLOW LOGS)
+#   LOG_LEVELS=og=DEBUG      (OG TAG LOGS + CLEANING)
+#   LOG_LEVELS=hf=DEBUG      (HF PROMPT + HF CALL LOGS)
+# THE OLD DEBUG_SUMMARY=1 / DEBUG_OG=1 / DEBUG_HF=1 STILL WORK.
+# SEE backend/logs.py. PASS ARGS, NOT F-STRINGS: NOTHING IS FORMATTED
+# (OR CAPPED) UNLESS THAT LEVEL IS ON.
 #
 # EXAMPLE:
-#   DEBUG_OG=1
-#   DEBUG_SUMMARY=1
+#   LOG_LEVELS=og=DEBUG,summary=DEBUG
 # ------------------------------------------------------------
 
-DEBUG_SUMMARY = os.getenv("DEBUG_SUMMARY", "0") == "1"
-DEBUG_OG = os.getenv("DEBUG_OG", "0") == "1"
-DEBUG_HF = os.getenv("DEBUG_HF", "0") == "1"
-
-
-def _dbg(msg: str):
-    if DEBUG_SUMMARY or DEBUG_OG or DEBUG_HF:
-        print(msg)
-        sys.stdout.flush()
-
-
-def _dbg_og(msg: str):
-    if DEBUG_OG:
-        print(msg)
-        sys.stdout.flush()
-
-
-def _dbg_hf(msg: str):
-    if DEBUG_HF:
-        print(msg)
-        sys.stdout.flush()
-
+SUMMARY_LOG = get_logger("summary")
+OG_LOG = get_logger("og")
+HF_LOG = get_logger("hf")
 
-def _cap(s: str, n: int = 240) -> str:
-    s = (s or "").replace("\n", " ").strip()
-    return (s[:n] + "…") if len(s) > n else s
+_dbg = SUMMARY_LOG.debug
+_dbg_og = OG_LOG.debug
+_dbg_hf = HF_LOG.debug
 
 
 # ------------------------------------------------------------
@@ -79,8 +94,56 @@ HF_MODEL_ROLL = [
     "facebook/bart-large-cnn",
 ]
 
-PIPELINE_BASE = "https://api-inference.huggingface.co/pipeline/text2text-generation"
-MODELS_BASE = "https://api-inference.huggingface.co/models"
+# HF_INFERENCE_BASE POINTS BOTH ENDPOINT FAMILIES SOMEWHERE ELSE (A PROXY, OR
+# THE FAKE SERVER IN backend/benchmarks/loadtest.py). DEFAULT: THE REAL API.
+HF_INFERENCE_BASE = os.getenv(
+    "HF_INFERENCE_BASE", "https://api-inference.huggingface.co"
+).rstrip("/")
+PIPELINE_BASE = f"{HF_INFERENCE_BASE}/pipeline/text2text-generation"
+MODELS_BASE = f"{HF_INFERENCE_BASE}/models"
+
+# HEDGED HF CALLS: START THE PREFERRED ENDPOINT, LAUNCH THE NEXT ONE IF IT HAS
+# NOT ANSWERED AFTER HF_HEDGE_DELAY_SECONDS, TAKE THE FIRST VALID ANSWER AND
+# CANCEL THE REST. HF_HEDGE=0 WALKS THE ENDPOINTS ONE AT A TIME INSTEAD.
+HF_HEDGE = os.getenv("HF_HEDGE", "1") == "1"
+HF_HEDGE_DELAY_SECONDS = float(os.getenv("HF_HEDGE_DELAY_SECONDS", "2.5"))
+HF_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("HF_ATTEMPT_TIMEOUT_SECONDS", "20"))
+HF_TOTAL_TIMEOUT_SECONDS = float(os.getenv("HF_TOTAL_TIMEOUT_SECONDS", "30"))
+
+HF_GENERATION_PARAMETERS = {
+    "do_sample": False,
+    "num_beams": 5,
+    "max_new_tokens": 60,
+    "no_repeat_ngram_size": 3,
+    "early_stopping": True,
+}
+
+# HF SUMMARY CACHE: GENERATION IS DETERMINISTIC (do_sample=False), SO THE SAME
+# PROMPT + MODEL ROLL + PARAMETERS ALWAYS GIVES THE SAME SUMMARY. MEMORY TIER IN
+# FRONT OF A SQLITE FILE THAT SURVIVES RESTARTS (OPENED ON FIRST USE, NOT AT
+# IMPORT). HF_CACHE_PATH= (EMPTY) KEEPS IT IN MEMORY ONLY.
+HF_CACHE_PATH = os.getenv(
+    "HF_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), ".cache", "hf_summaries.sqlite3"),
+)
+HF_CACHE_TTL_SECONDS = float(os.getenv("HF_CACHE_TTL_SECONDS", str(7 * 86400)))
+HF_CACHE_MAX_ENTRIES = int(os.getenv("HF_CACHE_MAX_ENTRIES", "5000"))
+HF_CACHE_MEMORY_ENTRIES = int(os.getenv("HF_CACHE_MEMORY_ENTRIES", "512"))
+
+HF_SUMMARY_CACHE = TieredCache(
+    TTLCache(max_entries=HF_CACHE_MEMORY_ENTRIES, default_ttl=HF_CACHE_TTL_SECONDS),
+    (
+        SqliteTTLStore(
+            HF_CACHE_PATH,
+            max_entries=HF_CACHE_MAX_ENTRIES,
+            default_ttl=HF_CACHE_TTL_SECONDS,
+        )
+        if HF_CACHE_PATH
+        else None
+    ),
+)
+# IDENTICAL PROMPTS IN FLIGHT AT THE SAME TIME SHARE ONE HF CALL
+HF_CALL_FLIGHTS = SingleFlight()
 
 DEFAULT_HEADERS = {
     # SOME SITES (INCLUDING META PROPERTIES) BEHAVE BETTER WITH A UA.
@@ -88,61 +151,12 @@ DEFAULT_HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 }
 
-# ------------------------------------------------------------
-# REGEX (COMPILED ONCE)
-# ------------------------------------------------------------
-# TARGETS IG OG:DESCRIPTION PREFIX LIKE:
-#   "schimpfstagram on December 11, 2025: "
-# ALSO HANDLES:
-#   "username on Dec 11, 2025:"
-#   "username on September 1, 2025"
-# ------------------------------------------------------------
-
-IG_PREFIX_RE = re.compile(
-    r"^\s*[A-Za-z0-9_.]+\s+on\s+"
-    r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec|"
-    r"January|February|March|April|May|June|July|August|September|"
-    r"October|November|December)"
-    r"\s+\d{1,2},?\s+\d{4}:?\s*",
-    re.IGNORECASE,
-)
-
-IG_STATS_PREFIX_RE = re.compile(
-    r"^\s*(?:[\d,.]+(?:\.\d+)?[KMB]?\s+likes?,\s*)?"
-    r"[\d,.]+(?:\.\d+)?[KMB]?\s+comments?\s*[-–—]\s*",
-    re.IGNORECASE,
-)
-
-LIKED_BY_RE = re.compile(r"Liked by .*?(?: and \d+ others)?", re.IGNORECASE)
-LIKES_COUNT_RE = re.compile(r"\b\d[\d,]*\s+likes\b", re.IGNORECASE)
-TIME_AGO_RE = re.compile(r"\b\d{1,2}[smhdw]\s+ago\b", re.IGNORECASE)
-DATE_RE = re.compile(
-    r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]* "
-    r"\d{1,2},?\s+\d{4}\b",
-    re.IGNORECASE,
-)
-
-MENTION_RE = re.compile(r"@[\w.]+")
-HASHTAG_RE = re.compile(r"#[\w.]+")
-WHITESPACE_RE = re.compile(r"\s+")
-
-
 # ------------------------------------------------------------
 # TEXT CLEANING
 # ------------------------------------------------------------
-
-TRAILING_ELLIPSIS_RE = re.compile(r"(?:\s*(?:\.{3,}|…)+\s*)+$")
-TRAILING_PUNCT_RE = re.compile(r"\s+[^\w\s]+$")
-
-
-def end_on_solid_word(text: str) -> str:
-    if not text:
-        return ""
-
-    text = TRAILING_ELLIPSIS_RE.sub("", text).strip()
-    text = TRAILING_PUNCT_RE.sub("", text).strip()
-
-    return text
+# PATTERNS LIVE IN backend/cleaning.py (SHARED WITH extract.py);
+# THE NAMES BELOW STAY IMPORTABLE FROM HERE.
+# ------------------------------------------------------------
 
 
 def clean_social_caption(text: str) -> str:
@@ -155,28 +169,18 @@ def clean_social_caption(text: str) -> str:
 
     m = IG_PREFIX_RE.match(text)
     if m:
-        _dbg_og(f"🧼 IG_PREFIX_RE MATCH -> '{_cap(m.group(0), 120)}'")
+        _dbg_og("🧼 IG_PREFIX_RE MATCH -> '%s'", _cap(m.group(0), 120))
         text = IG_PREFIX_RE.sub("", text, count=1)
     else:
         _dbg_og("🧼 IG_PREFIX_RE NO MATCH")
 
-    text = MENTION_RE.sub("", text)
-    text = HASHTAG_RE.sub("", text)
-    text = LIKED_BY_RE.sub("", text)
-    text = LIKES_COUNT_RE.sub("", text)
-    text = TIME_AGO_RE.sub("", text)
-    text = DATE_RE.sub("", text)
-
-    text = WHITESPACE_RE.sub(" ", text).strip()
-
-    if len(text) >= 2 and text[0] == text[-1] and text[0] in {"'", '"'}:
-        text = text[1:-1].strip()
-
-    text = end_on_solid_word(text)
+    # MENTIONS, HASHTAGS, "LIKED BY", LIKE COUNTS, "5m AGO", DATES: ONE PASS
+    text = collapse_whitespace(strip_caption_noise(text))
+    text = end_on_solid_word(strip_matching_quotes(text))
 
-    if DEBUG_OG:
-        _dbg_og(f"🧼 CLEAN_SOCIAL_CAPTION RAW    -> '{_cap(raw)}'")
-        _dbg_og(f"🧼 CLEAN_SOCIAL_CAPTION CLEAN  -> '{_cap(text)}'")
+    if OG_LOG.isEnabledFor(logging.DEBUG):
+        _dbg_og("🧼 CLEAN_SOCIAL_CAPTION RAW    -> '%s'", _cap(raw))
+        _dbg_og("🧼 CLEAN_SOCIAL_CAPTION CLEAN  -> '%s'", _cap(text))
 
     return text
 
@@ -192,23 +196,298 @@ def _normalize_fetch_url(url: str) -> str:
     return url
 
 
-async def fetch_html(url: str) -> str:
+# SHARE/TRACKING PARAMS THAT NEVER CHANGE WHAT THE PAGE SAYS
+TRACKING_PARAMS = frozenset(
+    {"igsh", "igshid", "fbclid", "gclid", "mibextid", "si", "ref_src", "ref_url"}
+)
+
+
+def cache_key_for_url(url: str) -> str:
+    """
+    Stable identity for a submitted link: https-defaulted, lowercased host,
+    no fragment/default port, tracking params dropped, remaining params sorted.
+    """
+    parsed = urlparse(_normalize_fetch_url(url))
+    scheme = (parsed.scheme or "https").lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and not (
+        (scheme == "https" and parsed.port == 443)
+        or (scheme == "http" and parsed.port == 80)
+    ):
+        host = f"{host}:{parsed.port}"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunparse((scheme, host, parsed.path or "/", "", urlencode(query), ""))
+
+
+# ------------------------------------------------------------
+# STREAMING FETCH
+# ------------------------------------------------------------
+# MOST /summarize CALLS END ON og:description, WHICH LIVES IN <head>.
+# stream_html() HANDS BACK A StreamedPage WHOSE BODY IS READ ON DEMAND:
+#   page.read_head()  -> READS CHUNKS UNTIL </head> HAS GONE BY
+#   page.read_all()   -> DRAINS THE REST (NATIVE SCRAPE / MEDIA JSON)
+# LEAVING THE CONTEXT CLOSES THE RESPONSE, SO UNREAD BYTES ARE NEVER
+# DOWNLOADED.
+#
+# SIZE LIMITS (backend/.env):
+#   FETCH_MAX_BYTES=8388608        (DECOMPRESSED BODY CAP FOR 200s; 8 MB)
+#   FETCH_ERROR_MAX_BYTES=262144   (SAME FOR NON-200 BODIES; 256 KB)
+# THE CAP COUNTS DECOMPRESSED BYTES AS THEY STREAM, SO A GZIP BOMB STOPS AT
+# THE CAP TOO. A Content-Length ABOVE THE CAP OR A NON-HTML Content-Type IS
+# REJECTED BEFORE ANY BODY IS READ.
+# ------------------------------------------------------------
+
+FETCH_TIMEOUT_SECONDS = 15
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(8 * 1024 * 1024)))
+FETCH_ERROR_MAX_BYTES = int(os.getenv("FETCH_ERROR_MAX_BYTES", str(256 * 1024)))
+# EMPTY Content-Type IS ALLOWED: PLENTY OF SERVERS FORGET IT ON HTML
+HTML_CONTENT_TYPES = frozenset(
+    {"", "text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml"}
+)
+FETCH_CHUNK_BYTES = 16 * 1024
+HEAD_SCAN_MAX_CHARS = 512 * 1024
+HEAD_SCAN_TAIL_CHARS = 64 * 1024
+
+HEAD_CLOSE_RE = re.compile(r"</head\s*>|<body[\s>]", re.IGNORECASE)
+META_KEY_RE = re.compile(
+    r"""<meta\b[^>]*?\b(?:property|name)\s*=\s*["']?"""
+    r"""((?:og|twitter):[\w:]+|description)\b""",
+    re.IGNORECASE,
+)
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.I)
+
+DESCRIPTION_META_KEYS = frozenset(
+    {"og:description", "twitter:description", "description"}
+)
+
+
+class HeadScanner:
+    """
+    Incremental <meta> scanner fed decoded chunks as they arrive.
+    Tracks which OG/Twitter keys have gone by and whether </head> has.
+    """
+
+    def __init__(self):
+        self.keys: set[str] = set()
+        self.head_closed = False
+        self._tail = ""
+
+    def feed(self, chunk: str):
+        # ONLY SCAN UP TO THE LAST COMPLETE TAG; CARRY THE REST INTO THE
+        # NEXT CHUNK SO A <meta> SPLIT ACROSS READS IS STILL SEEN WHOLE.
+        window = self._tail + chunk
+        end = window.rfind(">") + 1
+        complete = window[:end]
+        self._tail = window[end:][-HEAD_SCAN_TAIL_CHARS:]
+
+        if self.head_closed:
+            return
+        close = HEAD_CLOSE_RE.search(complete)
+        if close:
+            complete = complete[: close.start()]  # BODY <meta>s DON'T COUNT
+            self.head_closed = True
+        for m in META_KEY_RE.finditer(complete):
+            self.keys.add(m.group(1).lower())
+
+    @property
+    def has_description(self) -> bool:
+        return bool(self.keys & DESCRIPTION_META_KEYS)
+
+    @property
+    def needs_body(self) -> bool:
+        """</head> is done and nothing in it can be the summary."""
+        return self.head_closed and not self.has_description
+
+
+class StreamedPage:
+    """
+    A fetched page whose body is pulled in chunks only as far as a caller
+    asks. `html` is whatever has been decoded so far; `complete` flips once
+    nothing more will be read: the body is exhausted (`drained`), the byte
+    cap was hit (`truncated`), the response was refused up front
+    (`rejected` says why), a body read failed part-way (`failed` says why)
+    or the fetch failed.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        resp: aiohttp.ClientResponse | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.url = url
+        self.status = resp.status if resp is not None else None
+        self.complete = resp is None
+        self.drained = False
+        self.truncated = False
+        self.rejected = ""
+        self.failed = ""
+        self.not_modified = False  # 304 TO A CONDITIONAL REQUEST
+        self.headers = resp.headers if resp is not None else {}
+        self.bytes_read = 0
+        self.max_bytes = FETCH_MAX_BYTES if max_bytes is None else max_bytes
+        self.scanner = HeadScanner()
+        self._resp = resp
+        self._decoder = None
+        self._parts: list[str] = []
+        self._chars = 0
+
+    def reject(self, reason: str):
+        _dbg("🌐 FETCH REJECTED %s -> %s", self.url, reason)
+        self.rejected = reason
+        self.complete = True
+
+    @property
+    def intact(self) -> bool:
+        """What was read is the page as served and within the limits (maybe not all of it)."""
+        return not (self.truncated or self.rejected or self.failed)
+
+    @property
+    def html(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    async def read_head(self) -> str:
+        with span("read_body", part="head") as read:
+            while (
+                not self.scanner.head_closed
+                and self._chars < HEAD_SCAN_MAX_CHARS
+                and await self._read_chunk()
+            ):
+                pass
+            read.set(bytes_read=self.bytes_read)
+        return self.html
+
+    async def read_all(self) -> str:
+        with span("read_body", part="all") as read:
+            while await self._read_chunk():
+                pass
+            read.set(bytes_read=self.bytes_read)
+        return self.html
+
+    async def _read_chunk(self) -> bool:
+        if self.complete:
+            return False
+
+        budget = self.max_bytes - self.bytes_read
+        if budget <= 0:
+            if not self._resp.content.at_eof():
+                self.truncated = True
+                _dbg("🌐 FETCH TRUNCATED AT %s BYTES -> %s", self.bytes_read, self.url)
+            chunk = b""
+        else:
+            try:
+                chunk = await self._resp.content.read(min(FETCH_CHUNK_BYTES, budget))
+            except Exception as e:
+                # CUT OFF MID-BODY: KEEP WHAT ARRIVED, BUT IT ISN'T THE PAGE
+                _dbg("🌐 FETCH READ EXCEPTION -> %s", e)
+                self.failed = type(e).__name__
+                chunk = b""
+            self.bytes_read += len(chunk)
+
+        if self._decoder is None:
+            self._decoder = codecs.getincrementaldecoder(
+                _response_encoding(self._resp, chunk)
+            )(errors="replace")
+
+        text = self._decoder.decode(chunk, final=not chunk)
+        if text:
+            self._parts.append(text)
+            self._chars += len(text)
+            self.scanner.feed(text)
+
+        if not chunk:
+            self.complete = True
+            self.drained = not (self.truncated or self.failed)
+            return False
+        return True
+
+
+def _response_encoding(resp: aiohttp.ClientResponse, first_chunk: bytes) -> str:
+    for candidate in (resp.charset, _sniff_meta_charset(first_chunk)):
+        if candidate:
+            try:
+                return codecs.lookup(candidate).name
+            except LookupError:
+                continue
+    return "utf-8"
+
+
+def _sniff_meta_charset(chunk: bytes) -> str:
+    m = META_CHARSET_RE.search(chunk[:4096])
+    return m.group(1).decode("ascii", "ignore") if m else ""
+
+
+@asynccontextmanager
+async def stream_html(url: str, validators: dict[str, str] | None = None):
+    """
+    `validators` (If-None-Match / If-Modified-Since, see backend/page_cache.py)
+    make the request conditional; a 304 comes back as page.not_modified.
+    """
     url = _normalize_fetch_url(url)
-    timeout = aiohttp.ClientTimeout(total=15)
-    async with aiohttp.ClientSession(
-        timeout=timeout, headers=DEFAULT_HEADERS
-    ) as session:
+    headers = {**DEFAULT_HEADERS, **validators} if validators else DEFAULT_HEADERS
+    # DNS / CONNECT / TIME-TO-HEADERS SPANS NEST UNDER THIS ONE (SEE tracing.py);
+    # BODY READS ARE read_body SPANS UNDER WHOEVER READS
+    with span("fetch", url=url, conditional=bool(validators)) as fetch:
         try:
-            async with session.get(url, allow_redirects=True) as resp:
-                _dbg(f"🌐 FETCH {url} -> STATUS {resp.status}")
-                if resp.status != 200:
-                    body = await resp.text()
-                    _dbg(f"🌐 FETCH NON-200 BODY (CAP) -> '{_cap(body)}'")
-                    return body or ""
-                return await resp.text()
+            session = await get_session()
+            resp = await session.get(
+                url,
+                allow_redirects=True,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT_SECONDS),
+            )
+            fetch.set(status=resp.status)
         except Exception as e:
-            _dbg(f"🌐 FETCH EXCEPTION -> {e}")
-            return ""
+            _dbg("🌐 FETCH EXCEPTION -> %s", e)
+            fetch.set(error=type(e).__name__)
+            resp = None
+
+    page = StreamedPage(url, resp)
+    if resp is not None:
+        _dbg("🌐 FETCH %s -> STATUS %s", url, resp.status)
+        if resp.status == 304 and validators:
+            page.not_modified = page.complete = page.drained = True
+        else:
+            _check_response_limits(page, resp)
+
+    try:
+        yield page
+    finally:
+        if resp is not None and page.drained and page.intact:
+            resp.release()  # FULLY READ: THE CONNECTION GOES BACK TO THE POOL
+        elif resp is not None:
+            _dbg("🌐 FETCH STOPPED EARLY AFTER %s CHARS", len(page.html))
+            resp.close()
+
+
+def _check_response_limits(page: StreamedPage, resp: aiohttp.ClientResponse):
+    if resp.status != 200:
+        page.max_bytes = min(page.max_bytes, FETCH_ERROR_MAX_BYTES)
+
+    content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type not in HTML_CONTENT_TYPES:
+        page.reject(f"content-type {content_type}")
+        return
+
+    # Content-Length IS THE WIRE SIZE; THE STREAMING CAP STILL GUARDS THE
+    # DECOMPRESSED SIZE WHEN IT IS SMALL BUT THE BODY INFLATES.
+    if resp.content_length is not None and resp.content_length > page.max_bytes:
+        page.reject(f"content-length {resp.content_length} > {page.max_bytes}")
+
+
+async def fetch_html(url: str) -> str:
+    async with stream_html(url) as page:
+        html = await page.read_all()
+        if page.status != 200:
+            _dbg("🌐 FETCH NON-200 BODY (CAP) -> '%s'", _cap(html))
+        return html
 
 
 # ------------------------------------------------------------
@@ -233,24 +512,6 @@ def _valid_content(s: str) -> bool:
     return len(re.findall(r"[A-Za-z]{3,}", s)) >= 6
 
 
-def _looks_like_threads_chrome(text: str) -> bool:
-    lower = (text or "").lower()
-    nav_hits = sum(
-        phrase in lower
-        for phrase in (
-            "home search",
-            "create notifications profile",
-            "back thread",
-            "like comment repost share",
-            "log in or sign up for threads",
-            "see what people are talking about",
-            "instagram log in with username",
-            "threads terms",
-        )
-    )
-    return nav_hits >= 2
-
-
 def _is_twitter_url(url: str) -> bool:
     url = (url or "").strip()
     parseable = url if re.match(r"^[a-z][a-z0-9+.-]*://", url, re.I) else f"https://{url}"
@@ -283,22 +544,44 @@ def _get_hf_token() -> str:
 # ------------------------------------------------------------
 
 
-async def get_best_summary(meta_text: str, default_weird_msg: str | None = None) -> str:
+async def get_best_summary(
+    meta_text: str,
+    default_weird_msg: str | None = None,
+    timeout: float | None = None,
+) -> str:
     meta_text = (meta_text or "").strip()
 
     if not meta_text:
         msg = default_weird_msg or next_weirdlink_pair()[1]
-        _dbg_hf(f"🌀 HF CALLED WITH EMPTY META -> RETURNING WEIRD MSG: '{_cap(msg)}'")
+        _dbg_hf("🌀 HF CALLED WITH EMPTY META -> RETURNING WEIRD MSG: '%s'", _cap(msg))
         return msg
 
     if len(meta_text) <= SHORT_COPY_LEN:
-        _dbg_hf(f"🧾 HF PASSTHROUGH SHORT ({len(meta_text)} CHARS)")
+        _dbg_hf("🧾 HF PASSTHROUGH SHORT (%s CHARS)", len(meta_text))
         return meta_text
 
     capped = _cap_to(meta_text, INPUT_CHAR_CAP)
     prompt = build_pegasus_prompt(capped)
 
-    _dbg_hf("📝 HF PROMPT (CAP) -> " + _cap(prompt, 500))
+    _dbg_hf("📝 HF PROMPT (CAP) -> %s", _cap(prompt, 500))
+
+    cache_key = hf_cache_key(prompt)
+    cached = await HF_SUMMARY_CACHE.get(cache_key)
+    if cached:
+        _dbg_hf("💾 HF CACHE HIT -> '%s'", _cap(cached))
+        return cached
+
+    budget = HF_TOTAL_TIMEOUT_SECONDS if timeout is None else timeout
+
+    if local_engine_enabled():
+        out = await HF_CALL_FLIGHTS.do(
+            cache_key, lambda: _summarize_locally(prompt, capped, cache_key, budget)
+        )
+        if out:
+            return out
+        msg = default_weird_msg or next_weirdlink_pair()[1]
+        _dbg_hf("🧸 LOCAL ENGINE FAILED -> FALLBACK: '%s'", _cap(msg))
+        return msg
 
     token = _get_hf_token()
     if not token:
@@ -313,77 +596,252 @@ async def get_best_summary(meta_text: str, default_weird_msg: str | None = None)
 
     payload = {
         "inputs": prompt,
-        "parameters": {
-            "do_sample": False,
-            "num_beams": 5,
-            "max_new_tokens": 60,
-            "no_repeat_ngram_size": 3,
-            "early_stopping": True,
-        },
+        "parameters": HF_GENERATION_PARAMETERS,
         "options": {"wait_for_model": True},
     }
 
-    timeout = aiohttp.ClientTimeout(total=25)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        for model in HF_MODEL_ROLL:
-            for base in (PIPELINE_BASE, MODELS_BASE):
-                url = f"{base}/{model}"
-                try:
-                    _dbg_hf(f"🤖 HF POST -> {url}")
-                    async with session.post(url, headers=headers, json=payload) as r:
-                        if r.status != 200:
-                            body = await r.text()
-                            _dbg_hf(f"⚠️  HF {r.status} (CAP) -> '{_cap(body)}'")
-                            continue
-
-                        data = await r.json()
-                        if (
-                            not isinstance(data, list)
-                            or not data
-                            or not isinstance(data[0], dict)
-                        ):
-                            _dbg_hf(f"⚠️  HF UNEXPECTED JSON SHAPE -> {type(data)}")
-                            continue
-
-                        text = data[0].get("summary_text") or data[0].get(
-                            "generated_text"
-                        )
-                        if text:
-                            out = trim_to_280(
-                                enforce_source_vocab(text.strip(), capped)
-                            )
-                            _dbg_hf(
-                                f"✅ HF SUCCESS ({len(out)} CHARS) -> '{_cap(out)}'"
-                            )
-                            return out
-                except Exception as e:
-                    _dbg_hf(f"⚠️  HF EXCEPTION -> {e}")
-                    continue
+    async def call_and_cache() -> str:
+        out = await _hedged_hf_call(_hf_endpoints(), headers, payload, capped, budget)
+        if out:
+            await HF_SUMMARY_CACHE.set(cache_key, out)
+        return out
+
+    out = await HF_CALL_FLIGHTS.do(cache_key, call_and_cache)
+    if out:
+        return out
 
     msg = default_weird_msg or next_weirdlink_pair()[1]
-    _dbg_hf(f"🧸 HF FAILED ENTIRELY -> FALLBACK: '{_cap(msg)}'")
+    _dbg_hf("🧸 HF FAILED ENTIRELY -> FALLBACK: '%s'", _cap(msg))
     return msg
 
 
+def hf_cache_key(prompt: str) -> str:
+    """sha256 over the whitespace-normalized prompt, model(s) and parameters."""
+    material = json.dumps(
+        {
+            "prompt": " ".join(prompt.split()),
+            "models": engine_fingerprint() if local_engine_enabled() else HF_MODEL_ROLL,
+            "parameters": HF_GENERATION_PARAMETERS,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _hf_endpoints() -> list[str]:
+    return [
+        f"{base}/{model}"
+        for model in HF_MODEL_ROLL
+        for base in (PIPELINE_BASE, MODELS_BASE)
+    ]
+
+
+def _finalize_hf_text(text: str, capped: str) -> str:
+    # SAME POST-PROCESSING FOR API AND LOCAL OUTPUT
+    return trim_to_280(enforce_source_vocab(text.strip(), capped))
+
+
+async def _summarize_locally(
+    prompt: str, capped: str, cache_key: str, budget: float
+) -> str:
+    model = engine_fingerprint()[1]
+    started = time.monotonic()
+    with span("hf_attempt", model=model, api="local") as attempt:
+        outcome = "error"
+        try:
+            _dbg_hf("🖥️  LOCAL SUMMARIZE")
+            # SAME WALL-CLOCK BUDGET AS THE API PATH; A CANCELLED PROMPT IS
+            # DROPPED FROM ITS BATCH IF IT HASN'T STARTED YET
+            text = await asyncio.wait_for(
+                summarize_batched(prompt, HF_GENERATION_PARAMETERS), max(0.0, budget)
+            )
+        except asyncio.TimeoutError:
+            _dbg_hf("⏱️  LOCAL ENGINE TIMED OUT AFTER %.1fs", budget)
+            text, outcome = "", "timeout"
+        except Exception as e:
+            _dbg_hf("⚠️  LOCAL ENGINE EXCEPTION -> %s", e)
+            text = ""
+        if text:
+            outcome = "ok"
+        attempt.set(outcome=outcome)
+    HF_REQUEST_SECONDS.observe(
+        time.monotonic() - started, model=model, api="local", outcome=outcome
+    )
+    if not text:
+        return ""
+
+    out = _finalize_hf_text(text, capped)
+    if out:
+        _dbg_hf("✅ LOCAL SUCCESS (%s CHARS) -> '%s'", len(out), _cap(out))
+        await HF_SUMMARY_CACHE.set(cache_key, out)
+    return out
+
+
+async def _hedged_hf_call(
+    endpoints: list[str],
+    headers: dict,
+    payload: dict,
+    capped: str,
+    budget: float,
+) -> str:
+    """
+    Race the endpoints healthiest-first (open breakers are skipped, see
+    backend/hf_health.py). A new attempt starts when the hedge delay passes
+    without an answer, or right away when an attempt fails. Each attempt has
+    its own deadline; `budget` bounds the whole call.
+    Returns "" when nothing valid came back in time.
+    """
+    deadline = time.monotonic() + max(0.0, budget)
+    queue = HF_HEALTH.rank(endpoints)
+    if not queue:
+        _dbg_hf("🚧 HF ALL ENDPOINTS OPEN -> SKIPPING")
+    running: set[asyncio.Task] = set()
+    session = await get_session()
+
+    try:
+        while queue or running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _dbg_hf("⏱️  HF BUDGET EXHAUSTED")
+                return ""
+
+            if queue and (not running or HF_HEDGE):
+                url = queue.pop(0)
+                if not HF_HEALTH.try_acquire(url):
+                    continue  # ANOTHER REQUEST IS ALREADY PROBING IT
+                attempt_timeout = min(HF_ATTEMPT_TIMEOUT_SECONDS, remaining)
+                running.add(
+                    asyncio.create_task(
+                        _hf_attempt(session, url, headers, payload, attempt_timeout)
+                    )
+                )
+
+            wait = remaining
+            if queue and HF_HEDGE:
+                wait = min(wait, HF_HEDGE_DELAY_SECONDS)
+            done, running = await asyncio.wait(
+                running, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                text = task.result()
+                out = _finalize_hf_text(text, capped) if text else ""
+                if out:
+                    _dbg_hf("✅ HF SUCCESS (%s CHARS) -> '%s'", len(out), _cap(out))
+                    return out
+    finally:
+        for task in running:
+            task.cancel()
+
+    return ""
+
+
+async def _hf_attempt(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: dict,
+    payload: dict,
+    timeout: float,
+) -> str:
+    """One POST to one endpoint; raw summary text or "" on any failure."""
+    started = time.monotonic()
+    model, api = _hf_endpoint_labels(url)
+    with span("hf_attempt", model=model, api=api) as attempt:
+        try:
+            text = await _hf_post(session, url, headers, payload, timeout)
+        except asyncio.CancelledError:
+            HF_HEALTH.release(url)  # LOST A HEDGE RACE: NO VERDICT ON THE ENDPOINT
+            HF_REQUEST_SECONDS.observe(
+                time.monotonic() - started, model=model, api=api, outcome="cancelled"
+            )
+            raise
+        outcome = "ok" if text else "error"
+        attempt.set(outcome=outcome)
+    elapsed = time.monotonic() - started
+    HF_HEALTH.record(url, bool(text), elapsed)
+    HF_REQUEST_SECONDS.observe(elapsed, model=model, api=api, outcome=outcome)
+    return text
+
+
+def _hf_endpoint_labels(url: str) -> tuple[str, str]:
+    """(model, "pipeline" | "models") for one of _hf_endpoints()."""
+    for api, base in (("pipeline", PIPELINE_BASE), ("models", MODELS_BASE)):
+        if url.startswith(base + "/"):
+            return url[len(base) + 1 :], api
+    return url, "other"
+
+
+async def _hf_post(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: dict,
+    payload: dict,
+    timeout: float,
+) -> str:
+    try:
+        _dbg_hf("🤖 HF POST -> %s", url)
+        async with session.post(
+            url,
+            headers=headers,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as r:
+            if r.status != 200:
+                body = await r.text()
+                _dbg_hf("⚠️  HF %s (CAP) -> '%s'", r.status, _cap(body))
+                return ""
+
+            data = await r.json()
+            if not isinstance(data, list) or not data or not isinstance(data[0], dict):
+                _dbg_hf("⚠️  HF UNEXPECTED JSON SHAPE -> %s", type(data))
+                return ""
+
+            text = data[0].get("summary_text") or data[0].get("generated_text")
+            return text if isinstance(text, str) else ""
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        _dbg_hf("⚠️  HF EXCEPTION %s -> %s", url, e)
+        return ""
+
+
 # ------------------------------------------------------------
 # HTML SANITIZATION (LAST RESORT TEXT SOURCE)
 # ------------------------------------------------------------
 
 
-def sanitize_html_for_summary(html: str) -> str:
-    soup = BeautifulSoup(html or "", "html.parser")
+SANITIZE_SKIP_TAGS = frozenset(
+    {"script", "style", "nav", "header", "footer", "aside", "noscript"}
+)
+
 
-    for tag in soup(
-        ["script", "style", "nav", "header", "footer", "aside", "noscript"]
-    ):
-        tag.decompose()
+def _visible_strings(root: Tag):
+    # ONE TOP-DOWN WALK THAT NEVER ENTERS A SKIPPED SUBTREE, SO EACH NODE IS
+    # VISITED ONCE (NO PER-STRING CLIMB BACK UP THROUGH ITS PARENTS). YIELDS
+    # THE SAME STRING TYPES, IN THE SAME ORDER, AS root.strings.
+    string_types = root.interesting_string_types
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tag):
+            if node.name not in SANITIZE_SKIP_TAGS:
+                stack.extend(reversed(node.contents))
+        elif type(node) in string_types:
+            yield node
+
+
+def sanitize_html_for_summary(html: str | ParsedDocument) -> str:
+    # THE SOUP IS SHARED WITH THE OTHER EXTRACTORS, SO SKIP CHROME TAGS
+    # WHILE WALKING INSTEAD OF DECOMPOSING THEM OUT OF THE TREE.
+    soup = as_document(html).soup
 
-    text = soup.get_text(" ", strip=True)
+    text = " ".join(s.strip() for s in _visible_strings(soup) if s.strip())
     text = WHITESPACE_RE.sub(" ", text).strip()
     cleaned = clean_social_caption(text)
 
-    _dbg_og(f"🧹 SANITIZE_HTML TEXT (CAP) -> '{_cap(text)}'")
-    _dbg_og(f"🧹 SANITIZE_HTML CLEAN (CAP) -> '{_cap(cleaned)}'")
+    _dbg_og("🧹 SANITIZE_HTML TEXT (CAP) -> '%s'", _cap(text))
+    _dbg_og("🧹 SANITIZE_HTML CLEAN (CAP) -> '%s'", _cap(cleaned))
 
     return cleaned
 
@@ -395,11 +853,11 @@ def sanitize_html_for_summary(html: str) -> str:
 # ------------------------------------------------------------
 
 
-def extract_social_content_for_hf(html: str, url: str) -> str:
-    soup = BeautifulSoup(html or "", "html.parser")
+def extract_social_content_for_hf(html: str | ParsedDocument, url: str) -> str:
+    doc = as_document(html)
     url_l = (url or "").lower()
 
-    _dbg_og(f"🔎 EXTRACT_SOCIAL_CONTENT URL -> {url}")
+    _dbg_og("🔎 EXTRACT_SOCIAL_CONTENT URL -> %s", url)
 
     def cleaned(val: str) -> str:
         return clean_social_caption((val or "").strip())
@@ -407,23 +865,22 @@ def extract_social_content_for_hf(html: str, url: str) -> str:
     # INSTAGRAM
     if "instagram.com" in url_l:
         for prop in ("og:description", "og:title"):
-            tag = soup.find("meta", property=prop)
-            if tag and tag.get("content"):
-                raw = tag["content"]
+            raw = doc.meta("property", prop)
+            if raw:
                 text = cleaned(raw)
-                _dbg_og(f"📌 IG {prop.upper()} RAW   -> '{_cap(raw)}'")
-                _dbg_og(f"📌 IG {prop.upper()} CLEAN -> '{_cap(text)}'")
+                _dbg_og("📌 IG %s RAW   -> '%s'", prop.upper(), _cap(raw))
+                _dbg_og("📌 IG %s CLEAN -> '%s'", prop.upper(), _cap(text))
 
                 if _valid_content(text) or len(text) <= SHORT_COPY_LEN:
-                    _dbg_og(f"✅ PICKED {prop} ({len(text)} CHARS)")
+                    _dbg_og("✅ PICKED %s (%s CHARS)", prop, len(text))
                     return text
                 else:
-                    _dbg_og(f"⛔ REJECTED {prop} (NOT VALID)")
+                    _dbg_og("⛔ REJECTED %s (NOT VALID)", prop)
 
         # JSON-LD (RARELY PRESENT FOR IG NOW, BUT KEEP IT)
-        for s in soup.find_all("script", type="application/ld+json"):
+        for script_text in doc.script_texts("application/ld+json"):
             try:
-                data = json.loads(s.string or "")
+                data = json.loads(script_text)
                 if isinstance(data, list) and data:
                     data = data[0]
                 if not isinstance(data, dict):
@@ -433,38 +890,37 @@ def extract_social_content_for_hf(html: str, url: str) -> str:
                     if isinstance(data.get(k), str):
                         raw = data[k]
                         text = cleaned(raw)
-                        _dbg_og(f"📌 IG JSON-LD {k.upper()} RAW   -> '{_cap(raw)}'")
-                        _dbg_og(f"📌 IG JSON-LD {k.upper()} CLEAN -> '{_cap(text)}'")
+                        _dbg_og("📌 IG JSON-LD %s RAW   -> '%s'", k.upper(), _cap(raw))
+                        _dbg_og("📌 IG JSON-LD %s CLEAN -> '%s'", k.upper(), _cap(text))
 
                         if _valid_content(text) or len(text) <= SHORT_COPY_LEN:
-                            _dbg_og(f"✅ PICKED JSON-LD {k} ({len(text)} CHARS)")
+                            _dbg_og("✅ PICKED JSON-LD %s (%s CHARS)", k, len(text))
                             return text
                         else:
-                            _dbg_og(f"⛔ REJECTED JSON-LD {k} (NOT VALID)")
+                            _dbg_og("⛔ REJECTED JSON-LD %s (NOT VALID)", k)
             except Exception as e:
-                _dbg_og(f"⚠️  JSON-LD PARSE ERROR -> {e}")
+                _dbg_og("⚠️  JSON-LD PARSE ERROR -> %s", e)
                 pass
 
     # FACEBOOK / THREADS (AND GENERIC META OG:DESCRIPTION)
     if any(p in url_l for p in ("facebook.com", "threads.net", "threads.com")):
-        tag = soup.find("meta", property="og:description")
-        if tag and tag.get("content"):
-            raw = tag["content"]
+        raw = doc.meta("property", "og:description")
+        if raw:
             text = cleaned(raw)
-            _dbg_og(f"📌 SOCIAL OG:DESCRIPTION RAW   -> '{_cap(raw)}'")
-            _dbg_og(f"📌 SOCIAL OG:DESCRIPTION CLEAN -> '{_cap(text)}'")
+            _dbg_og("📌 SOCIAL OG:DESCRIPTION RAW   -> '%s'", _cap(raw))
+            _dbg_og("📌 SOCIAL OG:DESCRIPTION CLEAN -> '%s'", _cap(text))
 
             if _valid_content(text) or len(text) <= SHORT_COPY_LEN:
-                _dbg_og(f"✅ PICKED SOCIAL OG:DESCRIPTION ({len(text)} CHARS)")
+                _dbg_og("✅ PICKED SOCIAL OG:DESCRIPTION (%s CHARS)", len(text))
                 return text
             else:
                 _dbg_og("⛔ REJECTED SOCIAL OG:DESCRIPTION (NOT VALID)")
 
     # FALLBACK: SANITIZED PAGE TEXT (LAST RESORT)
     _dbg_og("🧹 FALLING BACK TO SANITIZED HTML TEXT")
-    sanitized = sanitize_html_for_summary(html)
+    sanitized = sanitize_html_for_summary(doc)
     if _valid_content(sanitized):
-        _dbg_og(f"✅ PICKED SANITIZED HTML ({len(sanitized)} CHARS)")
+        _dbg_og("✅ PICKED SANITIZED HTML (%s CHARS)", len(sanitized))
         return sanitized
 
     _dbg_og("⛔ NO VALID TEXT FOUND -> RETURNING EMPTY STRING")
@@ -476,33 +932,35 @@ def extract_social_content_for_hf(html: str, url: str) -> str:
 # ------------------------------------------------------------
 
 
-def extract_og_image(html: str, url: str) -> tuple[str, str | None]:
-    _dbg_og(f"🖼️  EXTRACT_OG_IMAGE URL -> {url}")
+def extract_og_image(
+    html: str | ParsedDocument, url: str
+) -> tuple[str, str | None]:
+    _dbg_og("🖼️  EXTRACT_OG_IMAGE URL -> %s", url)
 
     if _is_twitter_url(url):
         img, msg = next_twitter_fallback()
-        _dbg_og(f"🖼️  TWITTER FALLBACK IMAGE -> '{_cap(img)}'")
-        _dbg_og(f"🖼️  TWITTER FALLBACK MSG -> '{_cap(msg)}'")
+        _dbg_og("🖼️  TWITTER FALLBACK IMAGE -> '%s'", _cap(img))
+        _dbg_og("🖼️  TWITTER FALLBACK MSG -> '%s'", _cap(msg))
         return img, msg
 
     try:
         from .extract import extract_og_tags
 
         img, title = extract_og_tags(html, url)
-        _dbg_og(f"🖼️  extract_og_tags IMG (CAP) -> '{_cap(img)}'")
-        _dbg_og(f"🖼️  extract_og_tags TITLE (CAP) -> '{_cap(title)}'")
+        _dbg_og("🖼️  extract_og_tags IMG (CAP) -> '%s'", _cap(img))
+        _dbg_og("🖼️  extract_og_tags TITLE (CAP) -> '%s'", _cap(title))
         if img:
             return img, None
     except Exception as e:
-        _dbg_og(f"⚠️  extract_og_tags ERROR -> {e}")
+        _dbg_og("⚠️  extract_og_tags ERROR -> %s", e)
         pass
 
     if "threads" in (url or "").lower():
         img = next_threads_fallback()
-        _dbg_og(f"🖼️  THREADS FALLBACK IMAGE -> '{_cap(img)}'")
+        _dbg_og("🖼️  THREADS FALLBACK IMAGE -> '%s'", _cap(img))
         return img, None
 
     img, msg = next_weirdlink_pair()
-    _dbg_og(f"🖼️  WEIRDLINK FALLBACK IMAGE -> '{_cap(img)}'")
-    _dbg_og(f"🖼️  WEIRDLINK FALLBACK MSG (CAP) -> '{_cap(msg)}'")
+    _dbg_og("🖼️  WEIRDLINK FALLBACK IMAGE -> '%s'", _cap(img))
+    _dbg_og("🖼️  WEIRDLINK FALLBACK MSG (CAP) -> '%s'", _cap(msg))
     return img, msg
@@ -0,0 +1,162 @@
+import asyncio
+import unittest
+
+import aiohttp
+from aiohttp import web
+
+from backend.benchmarks import bench_pipeline, loadtest
+from backend.pipeline import extract_page_record
+
+
+class PercentileTests(unittest.TestCase):
+    def test_nearest_rank(self):
+        samples = [float(i) for i in range(1, 101)]
+
+        self.assertEqual(bench_pipeline.percentile(samples, 50), 50.0)
+        self.assertEqual(bench_pipeline.percentile(samples, 99), 99.0)
+        self.assertEqual(bench_pipeline.percentile([3.0], 95), 3.0)
+        self.assertEqual(bench_pipeline.percentile([], 50), 0.0)
+
+    def test_summary_reports_throughput_and_ms(self):
+        row = bench_pipeline.summarize_samples([0.002, 0.001, 0.003, 0.002])
+
+        self.assertEqual(row["n"], 4)
+        self.assertEqual(row["p50_ms"], 2.0)
+        self.assertEqual(row["p99_ms"], 3.0)
+        self.assertEqual(row["throughput_per_s"], 500.0)
+
+
+class CorpusTests(unittest.TestCase):
+    """The corpus only earns its numbers if each page still hits its branch."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pages = {page["name"]: page for page in bench_pipeline.load_corpus()}
+
+    def record(self, name):
+        page = self.pages[name]
+        return extract_page_record(page["html"], page["url"])
+
+    def test_instagram_shapes(self):
+        self.assertEqual(self.record("ig_carousel").kind, "carousel")
+        self.assertEqual(self.record("ig_reel").kind, "reel")
+        post = self.record("ig_post")
+        self.assertTrue(post.og_description.startswith("messages around the neighborhood"))
+
+    def test_facebook_background_beats_group_cover(self):
+        self.assertTrue(
+            self.record("fb_formatted_background").og_image.endswith(
+                "post-background-landscape.jpg"
+            )
+        )
+
+    def test_threads_chrome_is_rejected(self):
+        self.assertEqual(self.record("threads_chrome").og_description, "")
+
+    def test_huge_page_is_inflated(self):
+        self.assertGreaterEqual(len(self.pages["huge_article"]["html"]), 4_000_000)
+
+    def test_inflate_repeats_paragraphs_or_pads_pages_without_them(self):
+        html = "<html><body><p>one</p><p>two</p></body></html>"
+        inflated = bench_pipeline.inflate_html(html, 500)
+        self.assertGreaterEqual(len(inflated), 500)
+        self.assertTrue(inflated.endswith("</p></body></html>"))
+        self.assertGreater(inflated.count("<p>two</p>"), 1)
+
+        bare = '<html><head><meta property="og:description" content="Hi."></head><body></body></html>'
+        padded = bench_pipeline.inflate_html(bare, 500)
+        self.assertEqual(len(padded), 500)
+        self.assertTrue(padded.endswith("--></body></html>"))
+        self.assertEqual(bench_pipeline.inflate_html(bare, 10), bare)
+
+
+class LoadTestStandInTests(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(
+            loadtest.parse_mix("summarize=0.7, hf=0.3", loadtest.ENDPOINTS),
+            {"summarize": 0.7, "hf": 0.3},
+        )
+        self.assertEqual(loadtest.parse_mix("batch", loadtest.ENDPOINTS), {"batch": 1.0})
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("summarise=1", loadtest.ENDPOINTS)
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("hf=0", loadtest.ENDPOINTS)
+
+    def test_fake_hf_speaks_the_inference_api(self):
+        async def go():
+            fake = loadtest.FakeHF({"200": 1, "503": 1, "429": 1}, 0, 0, seed=3)
+            runner, base = await loadtest._start(fake.app())
+            statuses = []
+            try:
+                async with aiohttp.ClientSession() as session:
+                    for path in ("/pipeline/text2text-generation/a/b", "/models/a/b") * 6:
+                        async with session.post(
+                            base + path, json={"inputs": "one two three"}
+                        ) as r:
+                            body = await r.json()
+                            statuses.append(r.status)
+                            if r.status == 200:
+                                self.assertEqual(body, [{"summary_text": "one two three"}])
+                            else:
+                                self.assertIn("error", body)
+            finally:
+                await runner.cleanup()
+            return fake, statuses
+
+        fake, statuses = asyncio.run(go())
+
+        self.assertEqual(set(statuses), {200, 503, 429})
+        self.assertEqual(sum(fake.outcomes.values()), 12)
+
+    def test_origin_stamps_each_variant(self):
+        async def go():
+            pages = bench_pipeline.load_corpus(["news_article"])
+            origin = loadtest.Origin(pages, 0, 0, page_bytes=300_000)
+            runner, base = await loadtest._start(origin.app())
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"{base}/page/news_article?v=42") as r:
+                        return origin, await r.text()
+            finally:
+                await runner.cleanup()
+
+        origin, html = asyncio.run(go())
+
+        self.assertIn("<title>Edition 42 · ", html)
+        self.assertIn("delayed the bike lane vote. (edition 42)", html)
+        self.assertGreaterEqual(len(html), 300_000)
+        self.assertEqual(origin.hits, 1)
+
+    def test_malformed_stream_line_is_an_error_not_an_abort(self):
+        async def stream(request):
+            urls = (await request.json())["urls"]
+            tail = b'{"ok": tr\n' if "bad" in urls[0] else b""
+            return web.Response(body=b'{"ok": true}\n' + tail, content_type="application/x-ndjson")
+
+        async def go():
+            app = web.Application()
+            app.router.add_post(loadtest.ENDPOINTS["batch_stream"], stream)
+            runner, base = await loadtest._start(app)
+            try:
+                return await loadtest.drive(
+                    base,
+                    ["https://news.example/good", "https://news.example/bad"],
+                    {"batch_stream": 1.0},
+                    rps=100,
+                    duration=0.04,
+                    batch_size=1,
+                    distinct_urls=0,
+                    timeout=5,
+                    seed=1,
+                )
+            finally:
+                await runner.cleanup()
+
+        records, _ = asyncio.run(go())
+
+        self.assertEqual(len(records), 4)
+        self.assertEqual(sorted(r["error"] for r in records), ["", "", "JSONDecodeError", "JSONDecodeError"])
+
+
+if __name__ == "__main__":
+    unittest.main()
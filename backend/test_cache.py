@@ -0,0 +1,109 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.cache import SqliteTTLStore, TieredCache, TTLCache
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_entries=2, default_ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_expire_after_their_own_ttl(self):
+        cache = TTLCache(default_ttl=60)
+        with mock.patch("backend.cache.time.monotonic", return_value=100.0):
+            cache.set("short", "x", ttl=5)
+            cache.set("long", "y")
+        with mock.patch("backend.cache.time.monotonic", return_value=110.0):
+            self.assertIsNone(cache.get("short"))
+            self.assertEqual(cache.get("long"), "y")
+
+    def test_zero_ttl_is_not_stored_and_counts_misses(self):
+        cache = TTLCache()
+        cache.set("k", "v", ttl=0)
+
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hit_ratio"], 0.0)
+
+    def test_weight_budget_evicts_least_recent_and_skips_oversized(self):
+        cache = TTLCache(max_entries=10, max_weight=10, weigh=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        cache.set("c", "xxxx")
+        cache.set("huge", "x" * 11)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual(cache.stats()["weight"], 8)
+
+
+class SqliteTTLStoreTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "nested", "cache.sqlite3")
+
+    def _store(self, **kwargs):
+        store = SqliteTTLStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_values_survive_reopening_and_expire(self):
+        with mock.patch("backend.cache.time.time", return_value=1000.0):
+            first = self._store(default_ttl=60)
+            first.set("k", {"summary": "Harbor reopens."})
+            first.close()
+
+        with mock.patch("backend.cache.time.time", return_value=1030.0):
+            value, ttl_left = self._store().get("k")
+        self.assertEqual(value, {"summary": "Harbor reopens."})
+        self.assertEqual(ttl_left, 30.0)
+
+        with mock.patch("backend.cache.time.time", return_value=1061.0):
+            self.assertIsNone(self._store().get("k"))
+
+    def test_least_recently_read_rows_are_evicted(self):
+        store = self._store(max_entries=2)
+        for now, key in ((1.0, "a"), (2.0, "b")):
+            with mock.patch("backend.cache.time.time", return_value=now):
+                store.set(key, key)
+        with mock.patch("backend.cache.time.time", return_value=3.0):
+            store.get("a")
+        with mock.patch("backend.cache.time.time", return_value=4.0):
+            store.set("c", "c")
+            self.assertIsNone(store.get("b"))
+            self.assertEqual(store.get("a")[0], "a")
+        self.assertEqual(store.stats()["evictions"], 1)
+
+
+class TieredCacheTests(unittest.TestCase):
+    def test_disk_hit_is_promoted_to_memory(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        disk = SqliteTTLStore(os.path.join(tmp.name, "c.sqlite3"))
+        self.addCleanup(disk.close)
+        disk.set("k", "cached summary")
+        cache = TieredCache(TTLCache(), disk)
+
+        async def go():
+            self.assertEqual(await cache.get("k"), "cached summary")
+            self.assertEqual(cache.memory.get("k"), "cached summary")
+            self.assertIsNone(await cache.get("missing"))
+
+        asyncio.run(go())
+
+
+if __name__ == "__main__":
+    unittest.main()
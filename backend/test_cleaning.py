@@ -0,0 +1,150 @@
+import random
+import unittest
+
+from backend import cleaning
+from backend.benchmarks import legacy_cleaning as legacy
+from backend.summarizer import clean_social_caption
+
+CAPTIONS = [
+    "",
+    "   ",
+    "1,234 likes, 56 comments - schimpfstagram on December 11, 2025: \"Sunset over the bay.\"",
+    "schimpfstagram on Dec 11, 2025: Liked by @ana and 3 others Golden hour again #sunset #nofilter",
+    "Liked by @ana, @ben and 12 others",
+    "Liked by @ana and @ben",
+    "Liked by and 3 others",
+    "Big day for the team 🎉 @coach.k thanks for everything… 2h ago",
+    "Posted Jan 5, 2024 likes were great",
+    "Posted Jan 5, 2024, 1,200 likes so far",
+    "March 3, 2024 - 12 likes - the launch went well...",
+    "New menu drops Sept 14, 2025!!! #food #nyc ...",
+    "'Quoted caption, all of it.'",
+    "\"A tiny caption with useful context.\"",
+    "5m ago 3d ago 10w ago 100d ago — still going",
+    "liked BY #tag and 7 others: lowercase still counts",
+    "See posts, photos and more on Facebook.",
+    "View Jane's photos on Instagram. Log in to see more",
+    "12K likes - Some reel caption here Log in to view",
+    "@only @mentions #and #tags",
+    "Numbers 1,000 likes, 2,000 likes, 3d ago, Oct 1 2023 end ...",
+]
+
+# Fuzz captions are prose words with whole noise units dropped in, the way
+# they show up in real OG descriptions. FRAGMENTS add the pieces that noise
+# split by other noise is made of ("12 #tag likes"); see the note on
+# CAPTION_NOISE_RE and _legacy_without_glue below.
+WORDS = [
+    "golden", "hour", "at", "the", "pier", "with", "friends", "new", "menu",
+    "drop", "thanks", "for", "coming", "out", "tonight", "🎉", "—", "-", "!",
+    "...", "…", "'", '"', "by", "and", "others", "on", "Log in to see",
+]
+NOISE = [
+    "@ana", "@coach.k", "#sunset", "#x_y", "Liked by @ana and 3 others",
+    "Liked by @ana, @ben and 12 others", "Liked by #tag", "Liked by",
+    "1,234 likes", "12 likes", "5m ago", "3d ago", "10w ago", "Jan 5, 2024",
+    "Sept 14 2025", "December 3, 2023", "2 likes, 4 comments -",
+]
+FRAGMENTS = ["likes", "ago", "2h", "12", "5", "Jan 5,", "2024", "Liked by", "and 3 others"]
+
+# Where the two cleaners part ways on purpose: the old passes deleted a token,
+# glued its neighbours together and then deleted the new match as well.
+GLUED_NOISE = {
+    "Jan 5, 2024 @ana likes": "likes",
+    "2h Liked by ago": "2h ago",
+    "12 #tag likes": "12 likes",
+    "Great view Jan 5, 2024 @ana likes the sun": "Great view likes the sun",
+}
+
+
+def _fuzz_inputs(count: int, seed: int = 20, fragments: bool = False):
+    rng = random.Random(seed)
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 14)):
+            roll = rng.random()
+            if roll < 0.35:
+                parts.append(rng.choice(NOISE))
+            elif fragments and roll < 0.55:
+                parts.append(rng.choice(FRAGMENTS))
+            else:
+                parts.append(rng.choice(WORDS))
+        yield " ".join(parts)
+
+
+def _legacy_without_glue(text: str) -> str:
+    """The old sequential cleaner, but every deletion leaves a space behind."""
+    text = legacy.IG_STATS_PREFIX_RE.sub("", text, count=1)
+    if legacy.IG_PREFIX_RE.match(text):
+        text = legacy.IG_PREFIX_RE.sub("", text, count=1)
+    for pattern in (
+        legacy.MENTION_RE,
+        legacy.HASHTAG_RE,
+        legacy.LIKED_BY_RE,
+        legacy.LIKES_COUNT_RE,
+        legacy.TIME_AGO_RE,
+        legacy.DATE_RE,
+    ):
+        text = pattern.sub("\x00", text)
+    text = legacy.WHITESPACE_RE.sub(" ", text.replace("\x00", " ")).strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in {"'", '"'}:
+        text = text[1:-1].strip()
+    return legacy.end_on_solid_word(text)
+
+
+class CaptionNoiseTests(unittest.TestCase):
+    def test_single_pass_matches_sequential_cleaner(self):
+        for text in CAPTIONS + list(_fuzz_inputs(3000)):
+            with self.subTest(text=text):
+                self.assertEqual(
+                    clean_social_caption(text), legacy.clean_social_caption(text)
+                )
+
+    def test_split_noise_matches_wherever_the_old_passes_did_not_glue(self):
+        glued = 0
+        for text in _fuzz_inputs(5000, seed=22, fragments=True):
+            old = legacy.clean_social_caption(text)
+            if old != _legacy_without_glue(text):
+                glued += 1  # OLD OUTPUT DEPENDED ON A DELETION JOINING ITS NEIGHBOURS
+                continue
+            with self.subTest(text=text):
+                self.assertEqual(clean_social_caption(text), old)
+        self.assertGreater(glued, 0)  # THE DIVERGENT SHAPES ARE STILL GENERATED
+
+    def test_glued_noise_keeps_the_one_pass_output(self):
+        for text, expected in GLUED_NOISE.items():
+            with self.subTest(text=text):
+                self.assertEqual(clean_social_caption(text), expected)
+                self.assertNotEqual(legacy.clean_social_caption(text), expected)
+                self.assertEqual(_legacy_without_glue(text), expected)
+
+    def test_liked_by_tail_goes_with_its_mentions(self):
+        self.assertEqual(
+            cleaning.strip_caption_noise("Liked by @ana and 3 others"), ""
+        )
+
+    def test_like_count_wins_over_date_that_ends_in_it(self):
+        self.assertEqual(
+            cleaning.strip_caption_noise("Jan 5, 2024 likes"), "Jan 5, "
+        )
+
+
+class MetaDescriptionTests(unittest.TestCase):
+    def test_matches_previous_implementation(self):
+        for text in CAPTIONS + list(_fuzz_inputs(1000, seed=21)):
+            with self.subTest(text=text):
+                self.assertEqual(
+                    cleaning.clean_meta_description(text),
+                    legacy.clean_meta_description(text),
+                )
+
+    def test_threads_chrome_is_dropped(self):
+        self.assertEqual(
+            cleaning.clean_meta_description(
+                "Log in or sign up for Threads. See what people are talking about"
+            ),
+            "",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+from backend import document
+from backend.benchmarks.bench_pipeline import load_corpus
+from backend.document import _installed, _resolve_meta_engine, _resolve_tree_builder
+from backend.pipeline import extract_page_record
+
+BACKENDS = [
+    (tree, meta)
+    for tree in ("html.parser", "lxml")
+    for meta in ("soup", "selectolax")
+    if _installed(tree) or tree == "html.parser"
+    if _installed(meta) or meta == "soup"
+]
+
+
+class ParserChoiceTests(unittest.TestCase):
+    def test_missing_packages_fall_back_to_the_stdlib_parser(self):
+        with mock.patch.object(document, "_installed", return_value=False):
+            for choice in ("auto", "lxml", "selectolax", "html.parser"):
+                with self.subTest(choice=choice):
+                    self.assertEqual(_resolve_tree_builder(choice), "html.parser")
+                    self.assertEqual(_resolve_meta_engine(choice), "soup")
+
+    def test_explicit_choices_pin_one_engine(self):
+        with mock.patch.object(document, "_installed", return_value=True):
+            self.assertEqual(_resolve_tree_builder("html.parser"), "html.parser")
+            self.assertEqual(_resolve_meta_engine("html.parser"), "soup")
+            self.assertEqual(_resolve_tree_builder("selectolax"), "html.parser")
+            self.assertEqual(_resolve_meta_engine("lxml"), "soup")
+            self.assertEqual(_resolve_tree_builder("auto"), "lxml")
+            self.assertEqual(_resolve_meta_engine("auto"), "selectolax")
+
+
+class BackendParityTests(unittest.TestCase):
+    FIELDS = (
+        "og_image",
+        "og_description",
+        "native",
+        "platform",
+        "kind",
+        "is_video",
+        "is_reel",
+        "is_carousel",
+        "poster_image",
+    )
+
+    def _record(self, page, tree, meta):
+        with mock.patch.multiple(document, TREE_BUILDER=tree, META_ENGINE=meta):
+            record = extract_page_record(page["html"], page["url"], with_source=True)
+        fields = {name: getattr(record, name) for name in self.FIELDS}
+        fields["source_text"] = record.source_text
+        return fields
+
+    def test_corpus_extracts_the_same_under_every_backend(self):
+        # huge_article is news_article inflated to 4 MB: same markup, just slow
+        for page in (p for p in load_corpus() if p["name"] != "huge_article"):
+            baseline = self._record(page, "html.parser", "soup")
+            for tree, meta in BACKENDS:
+                with self.subTest(page=page["name"], tree=tree, meta=meta):
+                    self.assertEqual(self._record(page, tree, meta), baseline)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
+from unittest import mock
 
+from backend.document import _installed, parse_document
+from backend import document, extract
 from backend.extract import (
     clean_meta_description,
     detect_platform,
@@ -8,7 +11,7 @@ from backend.extract import (
     extract_paragraph_like_block,
 )
 from backend.fallbacks import TWITTER_TAKEAWAYS
-from backend.summarizer import extract_og_image
+from backend.summarizer import extract_og_image, extract_social_content_for_hf
 
 
 class ExtractMetaTests(unittest.TestCase):
@@ -254,6 +257,102 @@ class ExtractMetaTests(unittest.TestCase):
 
         self.assertIn("Dear Algorithm", extract_paragraph_like_block(html))
 
+    def test_shared_document_is_parsed_once_and_left_intact(self):
+        html = """
+        <html><head>
+          <meta property="og:description" content="1,234 likes, 56 comments - schimpfstagram on December 11, 2025: &quot;A tiny caption with useful context.&quot;">
+          <meta property="og:image" content="/poster.jpg">
+        </head><body><nav>Menu</nav><script>{"code":"test"}</script></body></html>
+        """
+        url = "https://www.instagram.com/p/test/"
+        doc = parse_document(html)
+
+        tags = extract_og_tags(doc, url)
+        soup = doc.soup
+        media = extract_media_metadata(doc, url)
+        image, _ = extract_og_image(doc, url)
+        extract_social_content_for_hf(doc, url)
+
+        self.assertIs(doc.soup, soup)
+        self.assertEqual(tags, extract_og_tags(html, url))
+        self.assertEqual(media, extract_media_metadata(html, url))
+        self.assertEqual(image, "https://www.instagram.com/poster.jpg")
+        self.assertIsNotNone(doc.soup.find("nav"))
+        self.assertIsNotNone(doc.soup.find("script"))
+
+    def test_embedded_json_spans_handle_escapes_and_cap(self):
+        text = (
+            'bare carousel_media=[0] "edge_sidecar_to_children":{"edges":[{"node":'
+            '{"caption":"a \\"}]\\" b"}}]} "carousel_media":[{"id":"x]"},2]'
+        )
+
+        values = extract._extract_json_values_after_keys(
+            text, extract.EMBEDDED_JSON_KEYS
+        )
+
+        self.assertEqual(values["carousel_media"], [{"id": "x]"}, 2])
+        self.assertEqual(
+            values["edge_sidecar_to_children"]["edges"][0]["node"]["caption"],
+            'a "}]" b',
+        )
+        self.assertIsNone(values["text_format_metadata"])
+
+        with mock.patch.object(extract, "JSON_SPAN_MAX_CHARS", 10):
+            self.assertIsNone(
+                extract._extract_json_array_after_key(text, "carousel_media")
+            )
+
+    def test_embedded_json_index_is_built_once_per_document(self):
+        html = """
+        <script type="application/json">
+          {"items":[{"code":"SinglePic","carousel_media":null,"is_video":false}]}
+        </script>
+        <script>
+          {"related":[{"code":"Other","carousel_media":[{"id":1},{"id":2}]}]}
+        </script>
+        """
+        doc = parse_document(html)
+
+        index = extract._embedded_json_index(doc)
+        media = extract_media_metadata(doc, "https://www.instagram.com/p/Other/")
+
+        self.assertIs(extract._embedded_json_index(doc), index)
+        self.assertEqual(set(index.posts_by_code), {"SinglePic", "Other"})
+        self.assertIsNone(extract._embedded_json_value(doc, "carousel_media"))
+        self.assertFalse(index.says_video)
+        self.assertTrue(media["is_carousel"])
+
+    def test_video_regexes_only_scan_scripts_the_index_could_not_parse(self):
+        json_only = """
+        <script type="application/json">{"items":[{"is_video":false}]}</script>
+        <p>Docs: set "is_video": true to autoplay.</p>
+        """
+        scans = mock.Mock(return_value=None)
+        with mock.patch.multiple(
+            extract,
+            VIDEO_FLAG_RE=mock.Mock(search=scans),
+            VIDEO_ASSET_RE=mock.Mock(search=scans),
+        ):
+            media = extract_media_metadata(json_only, "https://news.example/a")
+        scans.assert_not_called()
+        self.assertFalse(media["is_video"])  # PAGE TEXT IS NOT EMBEDDED JSON
+
+        js_blob = '<script>window._sharedData = {"media": {"isVideo": true}};</script>'
+        media = extract_media_metadata(js_blob, "https://news.example/a")
+        self.assertTrue(media["is_video"])
+        self.assertIn("json:is_video", media["signals"])
+
+    def test_native_block_picks_longest_div_within_bounds(self):
+        short = "Short sentence about nothing much. " * 9
+        good = "A longer post body that should win the native scrape. " * 10
+        html = f"""
+        <div><div>{short}</div><div>{good}<div>Block user</div></div></div>
+        <div>{good}</div>
+        <div>{"x " * 2000}</div>
+        """
+
+        self.assertEqual(extract_paragraph_like_block(html), good.strip())
+
     def test_x_and_twitter_urls_use_twitter_fallback(self):
         for url in (
             "https://x.com/jonathanschimpf/status/123",
@@ -277,5 +376,35 @@ class ExtractMetaTests(unittest.TestCase):
                 self.assertNotIn("/weirdlink/", image)
 
 
+
+class _ParserBackend:
+    """Re-runs the fixtures above with one tree builder / meta engine pair."""
+
+    TREE_BUILDER = "html.parser"
+    META_ENGINE = "soup"
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.multiple(
+            document, TREE_BUILDER=self.TREE_BUILDER, META_ENGINE=self.META_ENGINE
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class ExtractMetaHtmlParserTests(_ParserBackend, ExtractMetaTests):
+    pass
+
+
+@unittest.skipUnless(_installed("lxml"), "lxml not installed")
+class ExtractMetaLxmlTests(_ParserBackend, ExtractMetaTests):
+    TREE_BUILDER = "lxml"
+
+
+@unittest.skipUnless(_installed("selectolax"), "selectolax not installed")
+class ExtractMetaSelectolaxTests(_ParserBackend, ExtractMetaTests):
+    META_ENGINE = "selectolax"
+
+
 if __name__ == "__main__":
     unittest.main()
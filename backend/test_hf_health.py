@@ -0,0 +1,64 @@
+import unittest
+
+from backend.hf_health import CLOSED, HALF_OPEN, OPEN, HealthRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HealthRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.health = HealthRegistry(
+            window=10, min_calls=4, error_rate=0.5, cooldown=30.0, clock=self.clock
+        )
+
+    def _state(self, url):
+        return self.health.snapshot()[url]["state"]
+
+    def test_opens_after_error_rate_and_half_opens_after_cooldown(self):
+        for ok in (True, False, False, False):
+            self.health.record("a", ok, 0.1)
+        self.assertEqual(self._state("a"), OPEN)
+        self.assertFalse(self.health.try_acquire("a"))
+        self.assertEqual(self.health.rank(["a", "b"]), ["b"])
+
+        self.clock.now = 31.0
+        self.assertTrue(self.health.try_acquire("a"))
+        self.assertEqual(self._state("a"), HALF_OPEN)
+        self.assertFalse(self.health.try_acquire("a"))  # one probe at a time
+
+        self.health.record("a", True, 0.1)
+        self.assertEqual(self._state("a"), CLOSED)
+
+    def test_failed_probe_reopens_and_cancelled_probe_frees_the_slot(self):
+        for _ in range(4):
+            self.health.record("a", False, 1.0)
+        self.clock.now = 31.0
+        self.assertTrue(self.health.try_acquire("a"))
+        self.health.release("a")
+        self.assertTrue(self.health.try_acquire("a"))
+
+        self.health.record("a", False, 1.0)
+        self.assertEqual(self._state("a"), OPEN)
+        self.assertFalse(self.health.try_acquire("a"))
+
+    def test_rank_prefers_fewer_errors_then_lower_latency(self):
+        self.health.record("slow", True, 4.0)
+        self.health.record("fast", True, 0.5)
+        self.health.record("faster", True, 0.2)
+        self.health.record("flaky", True, 0.1)
+        self.health.record("flaky", False, 0.1)
+        self.assertEqual(
+            self.health.rank(["flaky", "slow", "fast", "faster"]),
+            ["fast", "faster", "slow", "flaky"],  # sub-second gaps keep order
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+from backend import http_client, main, summarizer
+from backend.http_client import close_session, get_session, open_session
+
+
+async def serve():
+    """Origin that answers with the client's (host, port): same port, same connection."""
+
+    async def page(request):
+        port = request.transport.get_extra_info("peername")[1]
+        return web.Response(
+            text=f"<html><head><title>{port}</title></head></html>",
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/page"
+
+
+class SessionTests(unittest.TestCase):
+    def test_session_is_shared(self):
+        async def go():
+            try:
+                first = await get_session()
+                second = await get_session()
+                return first, second
+            finally:
+                await close_session()
+
+        first, second = asyncio.run(go())
+        self.assertIs(first, second)
+
+    def test_fetches_reuse_one_pooled_connection(self):
+        async def fetch(url):
+            async with summarizer.stream_html(url) as page:
+                return await page.read_all()
+
+        async def go():
+            runner, url = await serve()
+            try:
+                return [await fetch(url) for _ in range(3)]
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        pages = asyncio.run(go())
+        self.assertEqual(len(set(pages)), 1)  # ONE CLIENT PORT: KEPT ALIVE
+
+    def test_session_is_recreated_after_close(self):
+        async def go():
+            first = await get_session()
+            await close_session()
+            second = await get_session()
+            await close_session()
+            return first, second
+
+        first, second = asyncio.run(go())
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+
+    def test_a_new_event_loop_gets_a_new_session(self):
+        async def go():
+            return await get_session()
+
+        first = asyncio.run(go())
+        second = asyncio.run(go())
+        asyncio.run(close_session())
+        self.assertIsNot(first, second)
+
+    def test_pool_limits_come_from_the_env(self):
+        env = {"HTTP_POOL_LIMIT": "7", "HTTP_POOL_LIMIT_PER_HOST": "3", "HTTP_DNS_TTL_SECONDS": "0"}
+
+        async def go():
+            try:
+                session = await open_session()
+                return session.connector
+            finally:
+                await close_session()
+
+        with mock.patch.dict(os.environ, env):
+            connector = asyncio.run(go())
+        self.assertEqual((connector.limit, connector.limit_per_host), (7, 3))
+        self.assertFalse(connector.use_dns_cache)
+
+    def test_lifespan_opens_and_closes_the_session(self):
+        async def go():
+            async with main.lifespan(main.app):
+                session = http_client._session
+                self.assertIs(await get_session(), session)
+            return session
+
+        session = asyncio.run(go())
+        self.assertIsNotNone(session)
+        self.assertTrue(session.closed)
+        self.assertIsNone(http_client._session)
+
+
+if __name__ == "__main__":
+    unittest.main()
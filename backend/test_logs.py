@@ -0,0 +1,99 @@
+import io
+import json
+import logging
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from backend import logs
+from backend.logs import SAMPLED, SampleFilter, capped, get_logger, subsystem_levels
+
+
+class SubsystemLevelTests(unittest.TestCase):
+    def test_defaults_and_overrides(self):
+        levels = subsystem_levels({"LOG_LEVEL": "warning", "LOG_LEVELS": "hf=debug, og=bogus"})
+        self.assertEqual(levels["app"], logging.WARNING)
+        self.assertEqual(levels["hf"], logging.DEBUG)
+        self.assertEqual(levels["og"], logging.WARNING)
+
+    def test_legacy_debug_flags_still_turn_subsystems_up(self):
+        levels = subsystem_levels({"DEBUG_OG": "1"})
+        self.assertEqual(levels["og"], logging.DEBUG)
+        self.assertEqual(levels["summary"], logging.DEBUG)  # ANY FLAG, AS BEFORE
+        self.assertEqual(levels["hf"], logging.INFO)
+
+
+class PipelineTests(unittest.TestCase):
+    def tearDown(self):
+        logs.setup_logging(env={})
+
+    def _capture(self, env: dict) -> io.StringIO:
+        out = io.StringIO()
+        logs.setup_logging(env=env, stream=out)
+        return out
+
+    def test_disabled_level_never_formats_its_arguments(self):
+        out = self._capture({"LOG_LEVELS": "og=INFO"})
+
+        class Loud:
+            def __str__(self):
+                raise AssertionError("formatted while DEBUG is off")
+
+        get_logger("og").debug("raw -> '%s'", Loud())
+        logs.flush_logging()
+        self.assertEqual(out.getvalue(), "")
+
+    def test_json_lines_carry_extra_fields_and_capped_text(self):
+        out = self._capture({"LOG_FORMAT": "json", "LOG_LEVELS": "hf=DEBUG"})
+        get_logger("hf").debug("out -> %s", capped("a\nb" + "c" * 50, 5), extra={"url": "u"})
+        logs.flush_logging()
+
+        line = json.loads(out.getvalue())
+        self.assertEqual(line["logger"], "takeaways.hf")
+        self.assertEqual(line["level"], "debug")
+        self.assertEqual(line["msg"], "out -> a bcc…")
+        self.assertEqual(line["url"], "u")
+
+    def test_json_lines_keep_the_traceback_through_the_queue(self):
+        out = self._capture({"LOG_FORMAT": "json"})
+        try:
+            raise ValueError("bad page")
+        except ValueError:
+            get_logger("app").exception("extract failed")
+        logs.flush_logging()
+
+        line = json.loads(out.getvalue())
+        self.assertEqual(line["msg"], "extract failed")
+        self.assertIn("ValueError: bad page", line["exc"])
+
+    def test_import_starts_no_listener_until_setup(self):
+        code = (
+            "import threading, backend.logs as logs; "
+            "print(logs._listener is None, threading.active_count()); "
+            "logs.setup_logging(); logs.setup_logging(); "
+            "print(logs._listener is not None, threading.active_count())"
+        )
+        done = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        self.assertEqual(done.stdout.split(), ["True", "1", "True", "2"])
+
+    def test_sampling_keeps_one_in_n_per_call_site_but_every_warning(self):
+        sampler = SampleFilter(every=3)
+        log = get_logger("app")
+
+        def record(level):
+            return log.makeRecord(log.name, level, __file__, 1, "m", (), None, extra=SAMPLED)
+
+        kept = [sampler.filter(record(logging.INFO)) for _ in range(6)]
+        self.assertEqual(kept, [True, False, False, True, False, False])
+        self.assertTrue(all(sampler.filter(record(logging.WARNING)) for _ in range(3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
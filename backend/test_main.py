@@ -0,0 +1,457 @@
+import asyncio
+import copy
+import json
+import unittest
+from collections import Counter
+from contextlib import nullcontext
+from unittest import mock
+
+from aiohttp import web
+from fastapi import HTTPException
+
+from backend import main, page_cache, summarizer
+from backend.http_client import close_session
+from backend.test_summarizer import flaky_session
+
+
+def fake_summarize(delays=None, fail=(), debug_error=()):
+    """Stand-in for main._summarize_cached that records per-host concurrency."""
+    state = {"running": Counter(), "peak": Counter(), "total": 0, "peak_total": 0}
+
+    async def summarize(url: str) -> dict:
+        host = url.split("/")[2]
+        state["running"][host] += 1
+        state["total"] += 1
+        state["peak"][host] = max(state["peak"][host], state["running"][host])
+        state["peak_total"] = max(state["peak_total"], state["total"])
+        try:
+            await asyncio.sleep((delays or {}).get(url, 0.01))
+            if url in fail:
+                raise RuntimeError(f"boom {url}")
+            debug = {"error": "fetch failed"} if url in debug_error else {}
+            return {"summary": url, "debug": debug}
+        finally:
+            state["running"][host] -= 1
+            state["total"] -= 1
+
+    return summarize, state
+
+
+class BatchRouteTests(unittest.TestCase):
+    def setUp(self):
+        main._batch_slots = None  # FRESH LIMITER FOR EACH TEST'S LIMITS
+
+    def _run(self, call, summarize, **limits):
+        async def go():
+            with mock.patch.multiple(main, _summarize_cached=summarize, **limits):
+                return await call()
+
+        return asyncio.run(go())
+
+    def test_results_keep_input_order(self):
+        urls = [f"https://site{i}.example/p" for i in range(5)]
+        summarize, _ = fake_summarize(
+            delays={url: 0.05 - i * 0.01 for i, url in enumerate(urls)}
+        )
+        out = self._run(
+            lambda: main.summarize_batch(main.URLBatchInput(urls=urls)), summarize
+        )
+
+        self.assertEqual([item["index"] for item in out["results"]], list(range(5)))
+        self.assertEqual([item["result"]["summary"] for item in out["results"]], urls)
+
+    def test_item_errors_do_not_fail_the_batch(self):
+        urls = ["https://a.example/ok", "https://b.example/raises", "https://c.example/err"]
+        summarize, _ = fake_summarize(fail={urls[1]}, debug_error={urls[2]})
+        out = self._run(
+            lambda: main.summarize_batch(main.URLBatchInput(urls=urls)), summarize
+        )["results"]
+
+        self.assertTrue(out[0]["ok"])
+        self.assertEqual((out[1]["ok"], out[1]["error"]), (False, f"boom {urls[1]}"))
+        self.assertEqual((out[2]["ok"], out[2]["error"]), (False, "fetch failed"))
+
+    def test_oversized_batch_is_rejected_with_413(self):
+        urls = main.URLBatchInput(urls=["https://a.example/1"] * 3)
+        summarize, _ = fake_summarize()
+        for route in (main.summarize_batch, main.summarize_batch_stream):
+            with self.subTest(route=route.__name__):
+                with self.assertRaises(HTTPException) as caught:
+                    self._run(lambda: route(urls), summarize, BATCH_MAX_URLS=2)
+                self.assertEqual(caught.exception.status_code, 413)
+
+    def test_per_host_cap(self):
+        urls = [f"https://busy.example/{i}" for i in range(6)]
+        urls.append("https://calm.example/1")
+        summarize, state = fake_summarize()
+        self._run(
+            lambda: main.summarize_batch(main.URLBatchInput(urls=urls)),
+            summarize,
+            BATCH_PER_HOST_CONCURRENCY=2,
+            BATCH_CONCURRENCY=10,
+        )
+        self.assertEqual(state["peak"]["busy.example"], 2)
+
+    def test_global_cap_is_shared_by_concurrent_batches(self):
+        def batch(tag):
+            urls = [f"https://{tag}{i}.example/p" for i in range(5)]
+            return main.summarize_batch(main.URLBatchInput(urls=urls))
+
+        summarize, state = fake_summarize()
+
+        async def both():
+            return await asyncio.gather(batch("a"), batch("b"))
+
+        self._run(both, summarize, BATCH_CONCURRENCY=3)
+        self.assertEqual(state["peak_total"], 3)
+
+    def test_stream_route_writes_one_json_object_per_line(self):
+        urls = [f"https://site{i}.example/p" for i in range(3)]
+        summarize, _ = fake_summarize(fail={urls[1]})
+
+        async def collect():
+            response = await main.summarize_batch_stream(main.URLBatchInput(urls=urls))
+            self.assertEqual(response.media_type, "application/x-ndjson")
+            return [chunk async for chunk in response.body_iterator]
+
+        chunks = self._run(collect, summarize)
+
+        self.assertEqual(len(chunks), 3)
+        for chunk in chunks:
+            self.assertTrue(chunk.endswith("\n") and chunk.count("\n") == 1)
+        items = sorted((json.loads(chunk) for chunk in chunks), key=lambda i: i["index"])
+        self.assertEqual([item["index"] for item in items], [0, 1, 2])
+        self.assertEqual([item["ok"] for item in items], [True, False, True])
+
+
+async def serve(html: str, hits: list | None = None):
+    async def page(request):
+        if hits is not None:
+            hits.append(request.path)
+        # CHUNKED SO read_head() CAN STOP PART-WAY
+        resp = web.StreamResponse(headers={"Content-Type": "text/html"})
+        resp.enable_chunked_encoding()
+        await resp.prepare(request)
+        body = html.encode()
+        for i in range(0, len(body), 8192):
+            await resp.write(body[i : i + 8192])
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/page"
+
+
+BODY_FILLER = "<p>" + "filler " * 20_000 + "</p>"
+BODY_VIDEO_JSON = '<script type="application/json">{"is_video": true}</script>'
+
+
+class HeadOnlyReadTests(unittest.TestCase):
+    def setUp(self):
+        page_cache.PAGE_CACHE.clear()
+
+    def _read(self, html: str, platform: str):
+        async def go():
+            runner, url = await serve(html)
+            try:
+                async with summarizer.stream_html(url) as page:
+                    return await main._read_html_for_summary(page, platform), page
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        return asyncio.run(go())
+
+    def _record(self, html: str, platform: str):
+        async def go():
+            runner, url = await serve(html)
+            try:
+                record, _ = await main._load_page_record(url, platform)
+                return record
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        return asyncio.run(go())
+
+    def test_web_page_stops_after_a_head_with_a_description(self):
+        html = (
+            '<html><head><meta property="og:description" content="Head.">'
+            f"</head><body>{BODY_FILLER}</body></html>"
+        )
+        out, page = self._read(html, "web")
+        self.assertFalse(page.complete)
+        self.assertNotIn("</html>", out)
+
+    def test_head_without_a_description_falls_back_to_a_full_read(self):
+        html = f"<html><head><title>T</title></head><body>{BODY_FILLER}</body></html>"
+        out, page = self._read(html, "web")
+        self.assertTrue(page.drained)
+        self.assertTrue(out.endswith("</html>"))
+
+    def test_web_media_flags_come_from_the_head_only(self):
+        # INTENDED: a web page with a head description is not read past
+        # </head>, so media JSON in its body is not seen; head tags still are.
+        head = '<meta property="og:description" content="Head.">'
+        body = f"<body>{BODY_FILLER}{BODY_VIDEO_JSON}</body></html>"
+
+        record = self._record(f"<html><head>{head}</head>{body}", "web")
+        self.assertFalse(record.is_video)
+
+        page_cache.PAGE_CACHE.clear()
+        video = '<meta property="og:video" content="https://cdn.example/v.mp4">'
+        record = self._record(f"<html><head>{head}{video}</head>{body}", "web")
+        self.assertTrue(record.is_video)
+
+    def test_social_platforms_read_the_body_for_media_json(self):
+        head = '<meta property="og:description" content="Head.">'
+        html = f"<html><head>{head}</head><body>{BODY_FILLER}{BODY_VIDEO_JSON}</body></html>"
+        record = self._record(html, "instagram")
+        self.assertTrue(record.is_video)
+
+
+def cached_result(image_source="og_tags", image="https://cdn.example/og.jpg"):
+    return {
+        "summary": "Cached.",
+        "used_huggingface": False,
+        "og_image": image,
+        "media": {"poster_image": image},
+        "debug": {
+            "summary_source": "og_description",
+            "image_source": image_source,
+            "final_image": image,
+        },
+    }
+
+
+class SummaryCacheTests(unittest.TestCase):
+    def setUp(self):
+        main.SUMMARY_CACHE.clear()
+        page_cache.PAGE_CACHE.clear()
+
+    def tearDown(self):
+        main.SUMMARY_CACHE.clear()
+
+    def test_hit_skips_the_fetch(self):
+        html = '<html><head><meta property="og:description" content="Hi."></head></html>'
+        hits = []
+
+        async def go():
+            runner, url = await serve(html, hits)
+            try:
+                first = await main._summarize_cached(url)
+                page_cache.PAGE_CACHE.clear()  # ONLY THE SUMMARY CACHE CAN ANSWER NOW
+                second = await main._summarize_cached(url + "?utm_source=x")
+                return first, second
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        first, second = asyncio.run(go())
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(second["summary"], first["summary"])
+        self.assertEqual(second["debug"]["cache"], "hit")
+        self.assertTrue(second["debug"]["url_received"].endswith("?utm_source=x"))
+
+    def test_ttl_depends_on_the_platform(self):
+        now = [1000.0]
+        urls = {
+            "instagram": "https://www.instagram.com/p/abc/",
+            "web": "https://news.example/story",
+            "twitter": "https://x.com/a/status/1",
+        }
+        with mock.patch("backend.cache.time.monotonic", lambda: now[0]):
+            for platform, url in urls.items():
+                main._store_summary(url, platform, cached_result())
+            cached = {p: main._cached_summary(u) is not None for p, u in urls.items()}
+            self.assertEqual(cached, {"instagram": True, "web": True, "twitter": False})
+
+            now[0] += main.SUMMARY_CACHE_TTLS["instagram"] + 1
+            self.assertIsNone(main._cached_summary(urls["instagram"]))
+            self.assertIsNotNone(main._cached_summary(urls["web"]))
+
+            now[0] += main.SUMMARY_CACHE_TTLS["web"]
+            self.assertIsNone(main._cached_summary(urls["web"]))
+
+    def test_stored_responses_are_bounded_by_size_too(self):
+        big = cached_result()
+        big["summary"] = "x" * 600
+        budget = main._summary_weight(big) * 2
+        with mock.patch.object(main.SUMMARY_CACHE, "max_weight", budget):
+            for n in range(3):
+                main._store_summary(f"https://news.example/{n}", "web", copy.deepcopy(big))
+            kept = [main._cached_summary(f"https://news.example/{n}") is not None for n in range(3)]
+            self.assertEqual(kept, [False, True, True])
+            self.assertLessEqual(main.SUMMARY_CACHE.weight, budget)
+
+            big["summary"] = "x" * budget  # NEVER FITS, SO IT IS NOT STORED AT ALL
+            main._store_summary("https://news.example/huge", "web", big)
+            self.assertIsNone(main._cached_summary("https://news.example/huge"))
+            self.assertEqual(len(main.SUMMARY_CACHE), 2)
+
+    def test_fallback_quips_are_not_cached(self):
+        result = cached_result()
+        result["debug"]["summary_source"] = "fallback_message"
+        main._store_summary("https://news.example/empty", "web", result)
+        self.assertIsNone(main._cached_summary("https://news.example/empty"))
+
+    def test_fallback_image_is_rerolled_on_a_hit(self):
+        url = "https://news.example/no-image"
+        stored = cached_result(image_source="fallback", image="/images/old.jpg")
+        main._store_summary(url, "web", copy.deepcopy(stored))
+
+        with mock.patch.object(main, "extract_og_image", return_value=("/images/new.jpg", "quip")):
+            hit = main._cached_summary(url)
+
+        self.assertEqual(hit["og_image"], "/images/new.jpg")
+        self.assertEqual(hit["media"]["poster_image"], "/images/new.jpg")
+        self.assertEqual(hit["debug"]["final_image"], "/images/new.jpg")
+        self.assertEqual(hit["debug"]["fallback_message"], "quip")
+        # THE STORED ENTRY KEEPS ITS OWN IMAGE FOR THE NEXT ROLL
+        entry = main.SUMMARY_CACHE.get(main.cache_key_for_url(url))
+        self.assertEqual(entry["og_image"], "/images/old.jpg")
+
+    def test_og_image_is_not_rerolled_on_a_hit(self):
+        url = "https://news.example/with-image"
+        main._store_summary(url, "web", cached_result())
+        with mock.patch.object(main, "extract_og_image") as reroll:
+            hit = main._cached_summary(url)
+        reroll.assert_not_called()
+        self.assertEqual(hit["og_image"], "https://cdn.example/og.jpg")
+
+
+class CoalescingRouteTests(unittest.TestCase):
+    CAPTION = "The harbor reopened after the storm and the fishing boats came back. " * 3
+    HTML = (
+        f'<html><head><meta property="og:description" content="{CAPTION}"></head>'
+        f"<body><article><p>{CAPTION}</p></article></body></html>"
+    )
+    CALLERS = 5
+
+    def setUp(self):
+        main.SUMMARY_CACHE.clear()
+        page_cache.PAGE_CACHE.clear()
+
+    def tearDown(self):
+        main.SUMMARY_CACHE.clear()
+        page_cache.PAGE_CACHE.clear()
+
+    def _fan_out(self, route, hits: list, **patches):
+        async def go():
+            runner, url = await serve(self.HTML, hits)
+            try:
+                patcher = mock.patch.multiple(main, **patches) if patches else nullcontext()
+                with patcher:
+                    calls = [route(main.URLInput(url=url)) for _ in range(self.CALLERS)]
+                    return await asyncio.gather(*calls, return_exceptions=True)
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        return asyncio.run(go())
+
+    def test_identical_summarize_requests_share_one_fetch(self):
+        hits = []
+        results = self._fan_out(main.summarize, hits)
+
+        self.assertEqual(len(hits), 1)
+        self.assertEqual({r["summary"] for r in results}, {main.trim_to_280(self.CAPTION)})
+        self.assertEqual(len({id(r) for r in results}), self.CALLERS)  # OWN COPIES
+
+    def test_identical_hf_requests_share_one_fetch_and_one_hf_call(self):
+        hits, hf_calls = [], []
+
+        async def fake_hf(endpoints, headers, payload, capped, budget):
+            hf_calls.append(payload["inputs"])
+            await asyncio.sleep(0.05)
+            return "The harbor reopened."
+
+        with mock.patch.multiple(
+            summarizer,
+            _hedged_hf_call=fake_hf,
+            _get_hf_token=mock.Mock(return_value="token"),
+            local_engine_enabled=mock.Mock(return_value=False),
+        ):
+            results = self._fan_out(main.summarize_with_hf, hits)
+
+        self.assertEqual((len(hits), len(hf_calls)), (1, 1))
+        self.assertTrue(all(r["used_huggingface"] for r in results))
+        self.assertEqual(len({r["summary"] for r in results}), 1)
+        self.assertTrue(results[0]["summary"].startswith("The harbor reopened"))
+
+    def test_an_error_reaches_every_waiter(self):
+        calls = []
+
+        async def broken(url, platform):
+            calls.append(url)
+            await asyncio.sleep(0.05)
+            raise RuntimeError("origin exploded")
+
+        results = self._fan_out(main.summarize, [], _summarize_url=broken)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), self.CALLERS)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+            self.assertEqual(str(result), "origin exploded")
+
+
+class PageReadFailureTests(unittest.TestCase):
+    def setUp(self):
+        page_cache.PAGE_CACHE.clear()
+
+    def test_body_cut_off_mid_read_is_not_cached(self):
+        first = b'<html><head><meta property="og:description" content="Part one.">'
+        get_session, resp = flaky_session([first])
+
+        async def go():
+            with mock.patch.object(summarizer, "get_session", get_session):
+                return await main._load_page_record("https://news.example/a", "instagram")
+
+        record, facts = asyncio.run(go())
+        self.assertEqual(record.og_description, "Part one.")
+        self.assertEqual(facts["fetch_failed"], "ClientPayloadError")
+        self.assertFalse(facts["html_complete"])
+        self.assertIsNone(page_cache.lookup(main.cache_key_for_url("https://news.example/a")))
+        resp.close.assert_called_once()
+
+
+    def _load(self, session_factory, **limits):
+        async def go():
+            with mock.patch.object(summarizer, "get_session", session_factory), \
+                    mock.patch.multiple(summarizer, **limits) if limits else nullcontext():
+                return await main._load_page_record("https://news.example/b", "instagram")
+
+        return asyncio.run(go())
+
+    def test_capped_body_is_neither_cached_nor_pooled(self):
+        chunk = b"<html><head><title>T</title></head><body>" + b"x" * 4000
+        get_session, resp = flaky_session([chunk] * 3)
+
+        _, facts = self._load(get_session, FETCH_MAX_BYTES=len(chunk))
+
+        self.assertTrue(facts["html_truncated"])
+        self.assertIsNone(page_cache.lookup(main.cache_key_for_url("https://news.example/b")))
+        resp.close.assert_called_once()
+        resp.release.assert_not_called()
+
+    def test_rejected_response_is_neither_cached_nor_pooled(self):
+        get_session, resp = flaky_session([b"%PDF-1.7"])
+        resp.headers = {"Content-Type": "application/pdf"}
+
+        _, facts = self._load(get_session)
+
+        self.assertEqual(facts["fetch_rejected"], "content-type application/pdf")
+        self.assertIsNone(page_cache.lookup(main.cache_key_for_url("https://news.example/b")))
+        resp.close.assert_called_once()
+        resp.release.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from backend.metrics import Counter, Gauge, Histogram, Registry
+from backend.pipeline import extract_page_record
+from backend.summarizer import MODELS_BASE, PIPELINE_BASE, _hf_endpoint_labels
+
+
+class MetricsFormatTests(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative_and_end_in_inf(self):
+        hist = Histogram("t_seconds", "help", ("stage",), buckets=(0.1, 1))
+        hist.observe(0.05, stage="a")
+        hist.observe(0.5, stage="a")
+        hist.observe(5, stage="a")
+
+        lines = hist.lines()
+        self.assertIn('t_seconds_bucket{stage="a",le="0.1"} 1', lines)
+        self.assertIn('t_seconds_bucket{stage="a",le="1"} 2', lines)
+        self.assertIn('t_seconds_bucket{stage="a",le="+Inf"} 3', lines)
+        self.assertIn('t_seconds_sum{stage="a"} 5.55', lines)
+        self.assertIn('t_seconds_count{stage="a"} 3', lines)
+        self.assertEqual(hist.count(stage="a"), 3)
+
+    def test_labels_must_match_declaration(self):
+        counter = Counter("t_total", "help", ("source",))
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            counter.inc(source="a", extra="b")
+        with self.assertRaises(ValueError):
+            counter.inc(-1, source="a")
+        with self.assertRaises(ValueError):
+            Histogram("t_seconds", "help", ("le",))
+
+    def test_render_escapes_label_values_and_runs_collectors(self):
+        registry = Registry()
+        registry.counter("t_total", "help", ("source",)).inc(2, source='say "hi"\n')
+
+        def collect():
+            gauge = Gauge("t_depth", "queue depth")
+            gauge.set(7)
+            return [gauge]
+
+        registry.add_collector(collect)
+        body = registry.render()
+
+        self.assertIn('t_total{source="say \\"hi\\"\\n"} 2\n', body)
+        self.assertIn("# TYPE t_depth gauge\nt_depth 7\n", body)
+        self.assertTrue(body.endswith("\n"))
+        with self.assertRaises(ValueError):
+            registry.counter("t_total", "again")
+
+
+class StageTimingTests(unittest.TestCase):
+    def test_page_record_carries_extractor_and_parse_timings(self):
+        html = (
+            "<html><head><meta property='og:description' content='Dawn.'></head>"
+            "<body><p>" + "Caption text. " * 40 + "</p></body></html>"
+        )
+        record = extract_page_record(html, "https://www.instagram.com/p/X/", with_source=True)
+        timings = dict(record.timings)
+
+        self.assertIn("parse", timings)
+        self.assertIn("extract_og_tags", timings)
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_hf_endpoint_labels(self):
+        self.assertEqual(
+            _hf_endpoint_labels(f"{PIPELINE_BASE}/google/flan-t5-base"),
+            ("google/flan-t5-base", "pipeline"),
+        )
+        self.assertEqual(
+            _hf_endpoint_labels(f"{MODELS_BASE}/google/flan-t5-base"),
+            ("google/flan-t5-base", "models"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
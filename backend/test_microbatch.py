@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+
+from backend.microbatch import MicroBatcher
+
+
+class MicroBatcherTests(unittest.TestCase):
+    def test_concurrent_items_share_batches_and_keep_their_results(self):
+        seen = []
+
+        async def run_batch(items):
+            seen.append(list(items))
+            await asyncio.sleep(0.01)
+            return [item.upper() for item in items]
+
+        batcher = MicroBatcher(run_batch, max_batch=4, max_wait_ms=20)
+
+        async def go():
+            return await asyncio.gather(*(batcher.submit(c) for c in "abcdefghij"))
+
+        self.assertEqual(asyncio.run(go()), list("ABCDEFGHIJ"))
+        self.assertEqual([len(b) for b in seen], [4, 4, 2])
+        stats = batcher.stats()
+        self.assertEqual((stats["batches"], stats["largest_batch"]), (3, 4))
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_lone_item_waits_at_most_max_wait_and_errors_reach_the_batch(self):
+        async def run_batch(items):
+            raise ValueError("model fell over")
+
+        batcher = MicroBatcher(run_batch, max_batch=8, max_wait_ms=5)
+
+        async def go():
+            results = await asyncio.gather(
+                batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+            )
+            return results
+
+        results = asyncio.run(go())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(batcher.stats()["failed_batches"], 1)
+
+    def test_batches_in_flight_are_held_until_done(self):
+        release = None
+
+        async def run_batch(items):
+            await release.wait()
+            return items
+
+        batcher = MicroBatcher(run_batch, max_batch=2, max_wait_ms=1)
+
+        async def go():
+            nonlocal release
+            release = asyncio.Event()
+            job = asyncio.ensure_future(batcher.submit("a"))
+            await asyncio.sleep(0.02)
+            in_flight = len(batcher._running)
+            release.set()
+            await job
+            await asyncio.sleep(0)
+            return in_flight, len(batcher._running)
+
+        self.assertEqual(asyncio.run(go()), (1, 0))
+
+    def test_close_stops_the_collector_and_fails_waiters(self):
+        async def run_batch(items):
+            await asyncio.sleep(10)
+            return items
+
+        batcher = MicroBatcher(run_batch, max_batch=1, max_wait_ms=1, concurrency=1)
+
+        async def go():
+            running = asyncio.ensure_future(batcher.submit("a"))
+            queued = asyncio.ensure_future(batcher.submit("b"))
+            await asyncio.sleep(0.02)
+            worker = batcher._worker
+            await batcher.close()
+            results = await asyncio.gather(running, queued, return_exceptions=True)
+            return worker, results
+
+        worker, results = asyncio.run(go())
+        self.assertTrue(worker.cancelled())
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(len(batcher._running), 0)
+
+    def test_batcher_works_again_after_close(self):
+        async def run_batch(items):
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(run_batch, max_wait_ms=1)
+
+        async def go():
+            first = await batcher.submit(1)
+            await batcher.close()
+            return first, await batcher.submit(2)
+
+        self.assertEqual(asyncio.run(go()), (2, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
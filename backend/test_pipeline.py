@@ -0,0 +1,69 @@
+import pickle
+import unittest
+
+from backend.extract import extract_media_metadata
+from backend.pipeline import (
+    NATIVE_TEXT_CAP,
+    PageRecord,
+    extract_page_record,
+    hf_source_prefix,
+    image_choice,
+)
+from backend.summarizer import INPUT_CHAR_CAP, SHORT_COPY_LEN, _cap_to
+
+
+class PageRecordTests(unittest.TestCase):
+    URL = "https://www.instagram.com/p/ABC123/"
+    HTML = (
+        "<html><head>"
+        "<meta property='og:image' content='https://cdn.example.com/a.jpg'>"
+        "<meta property='og:description' content='A harbor at dawn.'>"
+        "<meta property='og:type' content='video.other'>"
+        "</head><body><p>" + "Long caption text. " * 80 + "</p></body></html>"
+    )
+
+    def test_record_matches_extractors_and_survives_pickling(self):
+        record = pickle.loads(pickle.dumps(extract_page_record(self.HTML, self.URL)))
+
+        self.assertEqual(record.og_image, "https://cdn.example.com/a.jpg")
+        self.assertEqual(record.og_description, "A harbor at dawn.")
+        self.assertEqual(record.media(), extract_media_metadata(self.HTML, self.URL))
+        self.assertIsNone(record.source_text)
+        self.assertEqual(record.html_length, len(self.HTML))
+        self.assertLess(record.weight(), 1024)
+        self.assertEqual(image_choice(record, self.URL), (record.og_image, None))
+
+    def test_source_text_keeps_one_char_past_the_hf_cap(self):
+        record = extract_page_record(self.HTML, self.URL, with_source=True)
+        self.assertLessEqual(len(record.source_text), INPUT_CHAR_CAP + 1)
+
+    def test_source_prefix_gives_get_best_summary_the_same_input(self):
+        # get_best_summary: strip(), SHORT_COPY_LEN check, then _cap_to(..., cap)
+        def hf_input(text):
+            text = text.strip()
+            return len(text) <= SHORT_COPY_LEN, _cap_to(text, INPUT_CHAR_CAP)
+
+        sentence = "A thirty char first sentence. "
+        for shift in range(8):
+            # WHITESPACE LANDS ON (AND AROUND) THE CAP BOUNDARY
+            text = ("x" * shift + sentence + "word " * 200).strip()
+            text = text[:INPUT_CHAR_CAP] + "   " + text[INPUT_CHAR_CAP:]
+            with self.subTest(shift=shift):
+                self.assertEqual(hf_input(hf_source_prefix(text)), hf_input(text))
+
+        for text in ("short", "y" * INPUT_CHAR_CAP, "y" * (INPUT_CHAR_CAP + 50)):
+            self.assertEqual(hf_input(hf_source_prefix(text)), hf_input(text))
+
+    def test_native_length_is_reported_before_the_cap(self):
+        record = PageRecord("", "", {}, native="n" * (NATIVE_TEXT_CAP + 10))
+        self.assertEqual(len(record.native), NATIVE_TEXT_CAP)
+        self.assertEqual(record.native_length, NATIVE_TEXT_CAP + 10)
+
+    def test_twitter_always_gets_its_fallback_image(self):
+        record = PageRecord("https://pbs.example.com/x.jpg", "", {})
+        img, _ = image_choice(record, "https://x.com/someone/status/1")
+        self.assertNotEqual(img, record.og_image)
+
+
+if __name__ == "__main__":
+    unittest.main()
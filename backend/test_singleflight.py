@@ -0,0 +1,49 @@
+import asyncio
+import unittest
+
+from backend.singleflight import SingleFlight
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_callers_share_one_run_and_get_copies(self):
+        flights = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return {"summary": "shared"}
+
+        async def go():
+            results = await asyncio.gather(
+                *(flights.do("https://example.com/a", work) for _ in range(5))
+            )
+            results[0]["summary"] = "mutated"
+            return results, await flights.do("https://example.com/a", work)
+
+        results, later = asyncio.run(go())
+        self.assertEqual(len(runs), 2)  # one shared run, then a fresh one
+        self.assertEqual([r["summary"] for r in results[1:]], ["shared"] * 4)
+        self.assertEqual(later, {"summary": "shared"})
+        self.assertEqual(flights.stats(), {"in_flight": 0, "leaders": 2, "joined": 4})
+
+    def test_errors_reach_every_caller_and_cancelling_one_keeps_the_run(self):
+        flights = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def go():
+            first = asyncio.ensure_future(flights.do("k", failing))
+            second = asyncio.ensure_future(flights.do("k", failing))
+            await asyncio.sleep(0)
+            first.cancel()
+            with self.assertRaises(ValueError):
+                await second
+
+        asyncio.run(go())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,23 @@
+import asyncio
+import gzip
+import os
+import subprocess
+import sys
+import time
 import unittest
+from pathlib import Path
+from unittest import mock
 
-from backend.summarizer import _normalize_fetch_url
+import aiohttp
+from aiohttp import web
+
+from backend import cleaning, page_cache, summarizer
+from backend.benchmarks.bench_pipeline import load_corpus
+from backend.cache import TieredCache, TTLCache
+from backend.hf_health import HF_HEALTH
+from backend.http_client import close_session
+from backend.pipeline import PageRecord
+from backend.summarizer import _normalize_fetch_url, cache_key_for_url
 
 
 class FetchUrlNormalizationTests(unittest.TestCase):
@@ -17,5 +34,451 @@ class FetchUrlNormalizationTests(unittest.TestCase):
         )
 
 
+class ValidContentTests(unittest.TestCase):
+    def test_threads_footer_uses_the_shared_chrome_list(self):
+        footer = "Read the whole conversation below. © 2026 Threads Terms Privacy Policy Cookies"
+        self.assertIs(summarizer._looks_like_threads_chrome, cleaning.looks_like_threads_chrome)
+        self.assertFalse(summarizer._valid_content(footer))
+
+    def test_real_copy_is_still_valid(self):
+        self.assertTrue(
+            summarizer._valid_content(
+                "The harbor reopened after the storm and the fishing boats came back."
+            )
+        )
+
+
+class CacheKeyTests(unittest.TestCase):
+    def test_tracking_params_are_dropped(self):
+        self.assertEqual(
+            cache_key_for_url(
+                "instagram.com/p/DYSQAiXkQO0/?utm_source=ig_web_copy_link&igsh=MzRl"
+            ),
+            "https://instagram.com/p/DYSQAiXkQO0/",
+        )
+
+    def test_host_case_port_fragment_and_param_order_are_normalized(self):
+        self.assertEqual(
+            cache_key_for_url("https://News.Example.com:443/a?b=2&a=1#top"),
+            cache_key_for_url("https://news.example.com/a?a=1&b=2"),
+        )
+
+
+class HedgedHfCallTests(unittest.TestCase):
+    SOURCE = "The harbor reopened after the storm and fishing boats returned."
+
+    def setUp(self):
+        HF_HEALTH.reset()
+
+    def _run(self, behaviours, budget=5.0):
+        started, cancelled = [], []
+
+        async def fake_attempt(session, url, headers, payload, timeout):
+            started.append(url)
+            delay, text = behaviours[url]
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+            return text
+
+        async def go():
+            with mock.patch.object(summarizer, "_hf_attempt", fake_attempt), \
+                    mock.patch.object(summarizer, "get_session", mock.AsyncMock()), \
+                    mock.patch.object(summarizer, "HF_HEDGE_DELAY_SECONDS", 0.05):
+                out = await summarizer._hedged_hf_call(
+                    list(behaviours), {}, {}, self.SOURCE, budget
+                )
+                await asyncio.sleep(0)  # let cancellations land
+                return out
+
+        return asyncio.run(go()), started, cancelled
+
+    def test_slow_endpoint_is_hedged_and_cancelled(self):
+        out, started, cancelled = self._run(
+            {"slow": (1.0, "slow answer"), "fast": (0.0, "The harbor reopened.")}
+        )
+        self.assertEqual(out, "The harbor reopened.")
+        self.assertEqual(started, ["slow", "fast"])
+        self.assertEqual(cancelled, ["slow"])
+
+    def test_failure_moves_on_without_waiting_for_hedge_delay(self):
+        out, started, _ = self._run(
+            {"bad": (0.0, ""), "good": (0.0, "Fishing boats returned.")}
+        )
+        self.assertEqual(out, "Fishing boats returned.")
+        self.assertEqual(started, ["bad", "good"])
+
+    def test_budget_caps_the_whole_call(self):
+        out, _, cancelled = self._run(
+            {"a": (1.0, "late"), "b": (1.0, "late")}, budget=0.2
+        )
+        self.assertEqual(out, "")
+        self.assertEqual(sorted(cancelled), ["a", "b"])
+
+
+class HfSummaryCacheTests(unittest.TestCase):
+    SOURCE = "The harbor reopened after the storm and fishing boats returned."
+
+    def test_default_tier_is_a_sqlite_file_under_backend_cache_opened_lazily(self):
+        code = (
+            "import backend.summarizer as s; disk = s.HF_SUMMARY_CACHE.disk; "
+            "print(disk.path); print(disk._conn is None)"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "HF_CACHE_PATH"}
+        root = Path(__file__).resolve().parent.parent
+        done = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root, env=env
+        )
+        path, unopened = done.stdout.split()
+        self.assertEqual(Path(path), root / "backend" / ".cache" / "hf_summaries.sqlite3")
+        self.assertEqual(unopened, "True")
+
+        env["HF_CACHE_PATH"] = ""
+        done = subprocess.run(
+            [sys.executable, "-c", "import backend.summarizer as s; print(s.HF_SUMMARY_CACHE.disk)"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=root,
+            env=env,
+        )
+        self.assertEqual(done.stdout.split(), ["None"])
+
+    def test_key_ignores_whitespace_but_not_prompt_text(self):
+        key = summarizer.hf_cache_key("Summarize:  harbor\nreopens")
+        self.assertEqual(key, summarizer.hf_cache_key("Summarize: harbor reopens"))
+        self.assertNotEqual(key, summarizer.hf_cache_key("Summarize: harbor closes"))
+
+    def test_second_call_is_served_from_cache(self):
+        calls = []
+
+        async def fake_hedged(endpoints, headers, payload, capped, budget):
+            calls.append(payload["inputs"])
+            return "The harbor reopened."
+
+        async def go():
+            with mock.patch.object(summarizer, "_hedged_hf_call", fake_hedged), \
+                    mock.patch.object(summarizer, "HF_SUMMARY_CACHE", TieredCache(TTLCache())), \
+                    mock.patch.object(summarizer, "_get_hf_token", return_value="t"):
+                first = await summarizer.get_best_summary(self.SOURCE)
+                second = await summarizer.get_best_summary(self.SOURCE)
+            return first, second
+
+        self.assertEqual(asyncio.run(go()), ("The harbor reopened.",) * 2)
+        self.assertEqual(len(calls), 1)
+
+
+class LocalEngineTests(unittest.TestCase):
+    SOURCE = "The harbor reopened after the storm and fishing boats returned."
+
+    def test_local_output_gets_the_same_post_processing_without_a_token(self):
+        async def fake_local(prompt, parameters):
+            self.assertEqual(parameters, summarizer.HF_GENERATION_PARAMETERS)
+            return "  The harbor reopened after the storm.  "
+
+        async def go():
+            with mock.patch.object(summarizer, "local_engine_enabled", return_value=True), \
+                    mock.patch.object(summarizer, "summarize_batched", fake_local), \
+                    mock.patch.object(summarizer, "HF_SUMMARY_CACHE", TieredCache(TTLCache())), \
+                    mock.patch.object(summarizer, "_get_hf_token", return_value=""):
+                return await summarizer.get_best_summary(self.SOURCE)
+
+        self.assertEqual(
+            asyncio.run(go()),
+            summarizer._finalize_hf_text("The harbor reopened after the storm.", self.SOURCE),
+        )
+
+    def test_local_call_is_bounded_by_the_timeout(self):
+        async def stuck_local(prompt, parameters):
+            await asyncio.sleep(5)
+            return "Too late."
+
+        cache = TieredCache(TTLCache())
+
+        async def go():
+            with mock.patch.object(summarizer, "local_engine_enabled", return_value=True), \
+                    mock.patch.object(summarizer, "summarize_batched", stuck_local), \
+                    mock.patch.object(summarizer, "HF_SUMMARY_CACHE", cache):
+                started = time.monotonic()
+                out = await summarizer.get_best_summary(self.SOURCE, "fallback", timeout=0.05)
+                return out, time.monotonic() - started
+
+        out, elapsed = asyncio.run(go())
+        self.assertEqual(out, "fallback")
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(len(cache.memory), 0)
+
+
+async def serve(handler):
+    app = web.Application()
+    app.router.add_get("/page", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/page"
+
+
+class FetchLimitTests(unittest.TestCase):
+    HEAD = b"<html><head><meta property='og:description' content='Hi'></head><body>"
+
+    def setUp(self):
+        page_cache.PAGE_CACHE.clear()
+
+    @staticmethod
+    async def _chunked(request, body, status=200):
+        # NO Content-Length, so only the streaming cap can stop it
+        resp = web.StreamResponse(status=status, headers={"Content-Type": "text/html"})
+        resp.enable_chunked_encoding()
+        await resp.prepare(request)
+        for i in range(0, len(body), 8192):
+            await resp.write(body[i : i + 8192])
+        await resp.write_eof()
+        return resp
+
+    def _fetch(self, handler, **limits):
+        async def go():
+            runner, url = await serve(handler)
+            try:
+                with mock.patch.multiple(summarizer, **limits):
+                    async with summarizer.stream_html(url) as page:
+                        html = await page.read_all()
+                        return html, page
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        return asyncio.run(go())
+
+    def test_body_past_the_cap_is_truncated(self):
+        async def big(request):
+            return await self._chunked(request, self.HEAD + b"x" * 100_000)
+
+        html, page = self._fetch(big, FETCH_MAX_BYTES=4096)
+        self.assertEqual(page.bytes_read, 4096)
+        self.assertTrue(page.truncated)
+        self.assertFalse(page.drained)
+        self.assertTrue(html.startswith(self.HEAD.decode()))
+
+    def test_gzip_bomb_is_capped_on_decompressed_bytes(self):
+        async def bomb(request):
+            body = gzip.compress(self.HEAD + b"\0" * 5_000_000)
+            return web.Response(
+                body=body,
+                headers={"Content-Type": "text/html", "Content-Encoding": "gzip"},
+            )
+
+        _, page = self._fetch(bomb, FETCH_MAX_BYTES=64 * 1024)
+        self.assertEqual(page.bytes_read, 64 * 1024)
+        self.assertTrue(page.truncated)
+
+    def test_non_html_and_oversized_responses_are_rejected_unread(self):
+        async def pdf(request):
+            return web.Response(body=b"%PDF-1.7", content_type="application/pdf")
+
+        async def huge(request):
+            return web.Response(body=b"x" * 10_000, content_type="text/html")
+
+        html, page = self._fetch(pdf, FETCH_MAX_BYTES=1 << 20)
+        self.assertEqual((html, page.bytes_read), ("", 0))
+        self.assertEqual(page.rejected, "content-type application/pdf")
+
+        html, page = self._fetch(huge, FETCH_MAX_BYTES=1000)
+        self.assertEqual(html, "")
+        self.assertTrue(page.rejected.startswith("content-length 10000"))
+
+    def test_non_200_bodies_get_the_smaller_cap(self):
+        async def missing(request):
+            return await self._chunked(request, b"y" * 50_000, status=404)
+
+        html, page = self._fetch(missing, FETCH_ERROR_MAX_BYTES=1024)
+        self.assertEqual((page.status, len(html)), (404, 1024))
+        self.assertTrue(page.truncated)
+
+
+class FlakyBody:
+    """Response body that hands out `chunks`, then fails like a reset connection."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    async def read(self, n=-1):
+        if self.chunks:
+            return self.chunks.pop(0)
+        raise aiohttp.ClientPayloadError("connection reset mid-body")
+
+    def at_eof(self):
+        return False
+
+
+def flaky_session(chunks, status=200):
+    """A get_session() stand-in whose one response breaks after `chunks`."""
+    resp = mock.Mock(
+        status=status,
+        headers={"Content-Type": "text/html"},
+        charset="utf-8",
+        content_length=None,
+        content=FlakyBody(chunks),
+    )
+    session = mock.Mock()
+    session.get = mock.AsyncMock(return_value=resp)
+    return mock.AsyncMock(return_value=session), resp
+
+
+class ReadFailureTests(unittest.TestCase):
+    FIRST = b"<html><head><title>T</title></head><body><p>Start of the story"
+
+    def test_read_error_mid_body_is_not_a_clean_end(self):
+        get_session, resp = flaky_session([self.FIRST])
+
+        async def go():
+            with mock.patch.object(summarizer, "get_session", get_session):
+                async with summarizer.stream_html("https://news.example/a") as page:
+                    html = await page.read_all()
+            return html, page
+
+        html, page = asyncio.run(go())
+        self.assertEqual(html, self.FIRST.decode())
+        self.assertEqual(page.failed, "ClientPayloadError")
+        self.assertTrue(page.complete)
+        self.assertFalse(page.drained)
+        self.assertFalse(page.intact)
+        resp.close.assert_called_once()
+        resp.release.assert_not_called()
+
+
+class HeadOnlyFetchTests(unittest.TestCase):
+    HEAD = (
+        "<html><head><title>T</title>"
+        "<meta property=\"og:description\" content=\"In the head.\">"
+        "</head><body>"
+    )
+
+    def test_meta_split_across_chunks_is_still_seen(self):
+        for cut in range(1, len(self.HEAD)):
+            scanner = summarizer.HeadScanner()
+            scanner.feed(self.HEAD[:cut])
+            scanner.feed(self.HEAD[cut:])
+            with self.subTest(cut=cut):
+                self.assertTrue(scanner.has_description)
+                self.assertTrue(scanner.head_closed)
+                self.assertFalse(scanner.needs_body)
+
+    def test_meta_after_head_close_does_not_count(self):
+        scanner = summarizer.HeadScanner()
+        scanner.feed("<html><head></head><body><meta name='description' content='x'>")
+        self.assertFalse(scanner.has_description)
+        self.assertTrue(scanner.needs_body)
+
+    def test_read_head_stops_at_head_close(self):
+        body = (self.HEAD + "<p>" + "x" * 200_000 + "</p></body></html>").encode()
+
+        async def handler(request):
+            return await FetchLimitTests._chunked(request, body)
+
+        async def go():
+            runner, url = await serve(handler)
+            try:
+                async with summarizer.stream_html(url) as page:
+                    html = await page.read_head()
+                    return html, page
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        html, page = asyncio.run(go())
+        self.assertIn("</head>", html)
+        self.assertTrue(page.scanner.head_closed)
+        self.assertFalse(page.complete)
+        self.assertLess(page.bytes_read, len(body))
+
+
+class SanitizeHtmlTests(unittest.TestCase):
+    HTML = (
+        "<html><head><title>Title</title><style>p{}</style></head><body>"
+        "<header><nav><a>Home</a><div><span>Deep chrome</span></div></nav></header>"
+        "<main><p>First <b>bold</b> words.</p><!-- note -->"
+        "<aside>Related <i>links</i></aside><p>Second<script>x()</script> line.</p>"
+        "<noscript>Enable JS</noscript></main><footer>© Site</footer></body></html>"
+    )
+
+    @staticmethod
+    def _strings_by_parent_scan(soup):
+        # THE PREVIOUS FILTER: EVERY STRING CHECKED AGAINST ALL OF ITS PARENTS
+        return [
+            s.strip()
+            for s in soup.strings
+            if s.strip()
+            and not any(p.name in summarizer.SANITIZE_SKIP_TAGS for p in s.parents)
+        ]
+
+    def test_chrome_subtrees_are_pruned(self):
+        doc = summarizer.as_document(self.HTML)
+        words = [s.strip() for s in summarizer._visible_strings(doc.soup) if s.strip()]
+        self.assertEqual(words, ["Title", "First", "bold", "words.", "Second", "line."])
+        # THE SHARED SOUP IS LEFT AS IT WAS
+        self.assertIsNotNone(doc.soup.find("nav"))
+
+    def test_walk_matches_the_parent_scan_on_the_corpus(self):
+        pages = [{"name": "inline", "html": self.HTML}] + load_corpus()
+        for page in pages:
+            soup = summarizer.as_document(page["html"]).soup
+            with self.subTest(page=page["name"]):
+                self.assertEqual(
+                    [s.strip() for s in summarizer._visible_strings(soup) if s.strip()],
+                    self._strings_by_parent_scan(soup),
+                )
+
+
+class PageCacheTests(unittest.TestCase):
+    BODY = "<html><head><meta property='og:description' content='Static.'></head></html>"
+
+    def setUp(self):
+        page_cache.PAGE_CACHE.clear()
+
+    def test_validators_turn_an_unchanged_page_into_a_304(self):
+        seen = []
+
+        async def handler(request):
+            seen.append(request.headers.get("If-None-Match", ""))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304, headers={"ETag": '"v1"'})
+            return web.Response(
+                text=self.BODY, content_type="text/html", headers={"ETag": '"v1"'}
+            )
+
+        async def go():
+            runner, url = await serve(handler)
+            try:
+                async with summarizer.stream_html(url) as page:
+                    await page.read_all()
+                    page_cache.store("k", PageRecord("", "Static.", {}), page.headers)
+                entry = page_cache.lookup("k")
+                validators = page_cache.conditional_headers(entry)
+                async with summarizer.stream_html(url, validators) as page:
+                    return page.not_modified, await page.read_all()
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        self.assertEqual(asyncio.run(go()), (True, ""))
+        self.assertEqual(seen, ["", '"v1"'])
+
+    def test_freshness_and_no_store(self):
+        record = PageRecord("", "Static.", {})
+        page_cache.store("fresh", record, {"Cache-Control": "public, max-age=60"})
+        page_cache.store("etag", record, {"ETag": '"v1"', "Cache-Control": "no-cache"})
+        page_cache.store("gone", record, {"ETag": '"v1"', "Cache-Control": "no-store"})
+        page_cache.store("bare", record, {})
+
+        self.assertTrue(page_cache.lookup("fresh").fresh)
+        self.assertFalse(page_cache.lookup("etag").fresh)
+        self.assertIsNone(page_cache.lookup("gone"))
+        self.assertIsNone(page_cache.lookup("bare"))
+
+
 if __name__ == "__main__":
     unittest.main()
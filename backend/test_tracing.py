@@ -0,0 +1,144 @@
+import asyncio
+import unittest
+
+from aiohttp import web
+
+from backend import main, page_cache
+from backend.http_client import close_session
+from backend.tracing import NOOP_SPAN, OtlpExporter, record_span, span, start_trace
+
+
+class SpanTests(unittest.TestCase):
+    def test_spans_are_noops_outside_a_trace(self):
+        with span("fetch") as outer:
+            self.assertIs(outer, NOOP_SPAN)
+        with start_trace("summarize") as root:  # NO EXPORTER, NOT FORCED
+            self.assertIs(root, NOOP_SPAN)
+
+    def test_children_nest_across_tasks_and_carry_attributes(self):
+        async def attempt(n):
+            with span("hf_attempt", attempt=n):
+                await asyncio.sleep(0)
+
+        async def go():
+            with start_trace("summarize_hf", force=True) as root:
+                with span("pegasus_attempt"):
+                    await asyncio.gather(attempt(1), attempt(2))
+                    record_span("dns", 0, 1_000_000, host="example.com")
+            return root.trace
+
+        debug = asyncio.run(go()).as_debug()
+        parents = {row["name"]: row["parent"] for row in debug["spans"]}
+
+        self.assertEqual(parents["pegasus_attempt"], "summarize_hf")
+        self.assertEqual(parents["hf_attempt"], "pegasus_attempt")
+        self.assertEqual(parents["dns"], "pegasus_attempt")
+        attempts = [row["attempt"] for row in debug["spans"] if row["name"] == "hf_attempt"]
+        self.assertEqual(sorted(attempts), [1, 2])
+        self.assertEqual(debug["totals_ms"]["dns"], 1.0)
+
+
+async def serve(routes):
+    app = web.Application()
+    for method, path, handler in routes:
+        app.router.add_route(method, path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+class RequestTraceTests(unittest.TestCase):
+    def setUp(self):
+        main.SUMMARY_CACHE.clear()
+        page_cache.PAGE_CACHE.clear()
+
+    def test_summarize_debug_payload_times_fetch_and_extractors(self):
+        async def page(request):
+            return web.Response(
+                text="<html><head><meta property='og:description' content='Hi.'>"
+                "</head><body><p>Body</p></body></html>",
+                content_type="text/html",
+            )
+
+        async def go():
+            runner, base = await serve([("GET", "/page", page)])
+            try:
+                async with main.lifespan(main.app):
+                    url_input = main.URLInput(url=f"{base}/page")
+                    return await main.summarize(url_input, trace=True)
+            finally:
+                await runner.cleanup()
+
+        trace = asyncio.run(go())["debug"]["trace"]
+        names = {row["name"] for row in trace["spans"]}
+
+        self.assertTrue(
+            {"summarize", "fetch", "response_headers", "read_body", "extract", "parse"} <= names
+        )
+        self.assertIn("extract_og_tags", trace["totals_ms"])
+        fetch = next(row for row in trace["spans"] if row["name"] == "fetch")
+        self.assertEqual(fetch["status"], 200)
+
+
+class OtlpExporterTests(unittest.TestCase):
+    def test_flush_posts_otlp_json_to_the_collector(self):
+        received = []
+
+        async def collector(request):
+            received.append(await request.json())
+            return web.json_response({})
+
+        async def go():
+            runner, base = await serve([("POST", "/v1/traces", collector)])
+            exporter = OtlpExporter(f"{base}/v1/traces", service_name="test")
+            try:
+                with start_trace("summarize", force=True, url="u") as root:
+                    with span("fetch", status=200):
+                        pass
+                exporter.submit(root.trace)
+                await exporter.flush()
+                return root.trace, exporter
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        trace, exporter = asyncio.run(go())
+
+        self.assertEqual(exporter.exported, 1)
+        resource = received[0]["resourceSpans"][0]
+        self.assertEqual(
+            resource["resource"]["attributes"][0],
+            {"key": "service.name", "value": {"stringValue": "test"}},
+        )
+        spans = {s["name"]: s for s in resource["scopeSpans"][0]["spans"]}
+        self.assertEqual(spans["fetch"]["parentSpanId"], spans["summarize"]["spanId"])
+        self.assertEqual(spans["fetch"]["traceId"], trace.trace_id)
+        self.assertIn(
+            {"key": "status", "value": {"intValue": "200"}}, spans["fetch"]["attributes"]
+        )
+        self.assertLessEqual(
+            int(spans["summarize"]["startTimeUnixNano"]),
+            int(spans["fetch"]["startTimeUnixNano"]),
+        )
+
+    def test_unreachable_collector_drops_the_batch(self):
+        async def go():
+            exporter = OtlpExporter("http://127.0.0.1:9/v1/traces")
+            with start_trace("summarize", force=True) as root:
+                pass
+            exporter.submit(root.trace)
+            try:
+                await exporter.flush()
+            finally:
+                await close_session()
+            return exporter
+
+        exporter = asyncio.run(go())
+        self.assertEqual((exporter.exported, exporter.failed), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
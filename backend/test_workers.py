@@ -0,0 +1,122 @@
+import asyncio
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from backend import main, workers
+from backend.pipeline import PageRecord, extract_page_record
+from backend.workers import run_in_pool, start_pool, stop_pool
+
+HTML = (
+    "<html><head><meta property='og:description' content='Pooled.'></head>"
+    "<body><p>Body</p></body></html>"
+)
+URL = "https://news.example/story"
+
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+
+def explode(message: str):
+    raise ValueError(message)
+
+
+class RunInPoolTests(unittest.TestCase):
+    def tearDown(self):
+        stop_pool()
+
+    def _run(self, env: dict, fn, *args):
+        async def go():
+            return await run_in_pool(fn, *args)
+
+        with mock.patch.dict(os.environ, env):
+            return asyncio.run(go())
+
+    def test_thread_pool_runs_off_the_event_loop_thread(self):
+        name = self._run({"EXTRACT_POOL": "thread"}, thread_name)
+        self.assertTrue(name.startswith("extract"))
+        self.assertNotEqual(name, thread_name())
+
+    def test_inline_runs_on_the_caller(self):
+        self.assertEqual(self._run({"EXTRACT_POOL": "inline"}, thread_name), thread_name())
+
+    def test_page_extraction_is_offloaded_intact(self):
+        expected = extract_page_record(HTML, URL, True)
+        for kind in ("thread", "process"):
+            with self.subTest(pool=kind):
+                env = {"EXTRACT_POOL": kind, "EXTRACT_WORKERS": "1"}
+                record = self._run(env, extract_page_record, HTML, URL, True)
+                stop_pool()
+                self.assertIsInstance(record, PageRecord)
+                self.assertEqual(record.og_description, expected.og_description)
+                self.assertEqual(record.source_text, expected.source_text)
+
+    def test_worker_exceptions_reach_the_caller(self):
+        for kind in ("thread", "process", "inline"):
+            with self.subTest(pool=kind):
+                env = {"EXTRACT_POOL": kind, "EXTRACT_WORKERS": "1"}
+                with self.assertRaisesRegex(ValueError, "bad page"):
+                    self._run(env, explode, "bad page")
+                stop_pool()
+
+    def test_submissions_are_capped_at_workers_plus_queue(self):
+        gate = threading.Event()
+
+        class CountingPool(ThreadPoolExecutor):
+            submitted = 0
+
+            def submit(self, fn, /, *args, **kwargs):
+                CountingPool.submitted += 1
+                return super().submit(fn, *args, **kwargs)
+
+        async def go(pool):
+            jobs = [asyncio.create_task(run_in_pool(gate.wait, 5)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            submitted_while_blocked = CountingPool.submitted
+            gate.set()
+            await asyncio.gather(*jobs)
+            return submitted_while_blocked
+
+        pool = CountingPool(max_workers=1)
+        env = {"EXTRACT_POOL": "thread", "EXTRACT_WORKERS": "1", "EXTRACT_QUEUE_SIZE": "1"}
+        with mock.patch.dict(os.environ, env), mock.patch.object(workers, "_executor", pool):
+            submitted = asyncio.run(go(pool))
+        pool.shutdown()
+        self.assertEqual(submitted, 2)  # 1 RUNNING + 1 QUEUED; THE REST WAIT
+        self.assertEqual(CountingPool.submitted, 5)
+
+
+class LifespanPoolTests(unittest.TestCase):
+    def test_lifespan_starts_and_shuts_down_the_pool(self):
+        async def go():
+            async with main.lifespan(main.app):
+                pool = workers._executor
+                name = await run_in_pool(thread_name)
+            return pool, name
+
+        with mock.patch.dict(os.environ, {"EXTRACT_POOL": "thread"}):
+            pool, name = asyncio.run(go())
+
+        self.assertIsNotNone(pool)
+        self.assertTrue(name.startswith("extract"))
+        self.assertIsNone(workers._executor)
+        with self.assertRaises(RuntimeError):  # SHUT DOWN: TAKES NO NEW WORK
+            pool.submit(thread_name)
+
+    def test_start_pool_replaces_a_running_pool(self):
+        with mock.patch.dict(os.environ, {"EXTRACT_POOL": "thread"}):
+            start_pool()
+            first = workers._executor
+            start_pool()
+            second = workers._executor
+        stop_pool()
+        self.assertIsNot(first, second)
+        with self.assertRaises(RuntimeError):
+            first.submit(thread_name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,345 @@
+# backend/tracing.py
+# ------------------------------------------------------------
+# Per-request tracing spans, carried in a contextvar.
+# - start_trace(name, force=...) opens a request's root span; it is a
+#   no-op (and so is every span() under it) unless the request asked for
+#   timings (?trace=1) or an OTLP exporter is configured
+# - span(name, **attrs) times a block under the current span; tasks
+#   created inside it (hedged HF attempts, single-flight leaders) inherit it
+# - record_span(name, start, end) adds a span measured elsewhere (aiohttp
+#   DNS/connect hooks, extractor timings carried back on the PageRecord)
+# - trace.as_debug() -> the "trace" block of the /summarize debug payload
+#
+# EXPORT (backend/.env), OTLP/HTTP with a JSON body:
+#   OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318   (POSTS TO /v1/traces)
+#   OTEL_EXPORTER_OTLP_TRACES_ENDPOINT=...              (FULL URL, WINS)
+#   OTEL_SERVICE_NAME=tweet-sized-takeaways
+#   TRACE_EXPORT_INTERVAL_SECONDS=2     (HOW OFTEN QUEUED SPANS ARE POSTED)
+#   TRACE_EXPORT_MAX_QUEUE=2048         (OLDEST SPANS DROPPED PAST THIS)
+# ------------------------------------------------------------
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import aiohttp
+
+from .logs import get_logger
+
+log = get_logger("app")
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: list[Span] = []
+
+    def as_debug(self) -> dict:
+        """Finished spans as offsets (ms) from the root's start, plus per-name totals."""
+        spans = sorted(self.spans, key=lambda s: s.start_ns)
+        origin = spans[0].start_ns if spans else 0
+        names = {s.span_id: s.name for s in spans}
+        totals: dict[str, float] = {}
+        rows = []
+        for s in spans:
+            duration = (s.end_ns - s.start_ns) / 1e6
+            totals[s.name] = round(totals.get(s.name, 0.0) + duration, 3)
+            rows.append(
+                {
+                    "name": s.name,
+                    "parent": names.get(s.parent_id, ""),
+                    "start_ms": round((s.start_ns - origin) / 1e6, 3),
+                    "duration_ms": round(duration, 3),
+                    **s.attributes,
+                }
+            )
+        return {"trace_id": self.trace_id, "totals_ms": totals, "spans": rows}
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "name",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, trace: Trace, name: str, parent_id: str = "", **attributes):
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict[str, Any] = attributes
+        self.error = False
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, end_ns: int | None = None):
+        if not self.end_ns:
+            self.end_ns = end_ns or time.time_ns()
+            self.trace.spans.append(self)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    trace = None
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current: ContextVar[Span | None] = ContextVar("takeaways_span", default=None)
+
+
+def current_span() -> Span | _NoopSpan:
+    return _current.get() or NOOP_SPAN
+
+
+def annotate(**attributes):
+    """Attach attributes to whatever span is current (no-op outside a trace)."""
+    current_span().set(**attributes)
+
+
+@contextmanager
+def _activate(span: Span):
+    token = _current.set(span)
+    try:
+        yield span
+    except asyncio.CancelledError:
+        span.set(cancelled=True)
+        raise
+    except BaseException as e:
+        span.error = True
+        span.set(error=type(e).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        span.end()
+
+
+@contextmanager
+def start_trace(name: str, force: bool = False, **attributes):
+    """Root span for one request; yields NOOP_SPAN when nobody would read it."""
+    if not (force or EXPORTER.enabled) or _current.get() is not None:
+        with span(name, **attributes) as inner:  # NESTED CALL: JUST A CHILD
+            yield inner
+        return
+    root = Span(Trace(), name, **attributes)
+    try:
+        with _activate(root):
+            yield root
+    finally:
+        EXPORTER.submit(root.trace)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    with _activate(Span(parent.trace, name, parent.span_id, **attributes)) as child:
+        yield child
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes):
+    """A span timed by someone else, under the current span."""
+    parent = _current.get()
+    if parent is None:
+        return
+    child = Span(parent.trace, name, parent.span_id, **attributes)
+    child.start_ns = start_ns
+    child.end(end_ns)
+
+
+def record_durations(durations, start_ns: int | None = None, **attributes):
+    """
+    (name, seconds) pairs measured in a worker, laid end to end from start_ns
+    (default: so the last one ends now). Only the durations are real.
+    """
+    if _current.get() is None:
+        return
+    cursor = start_ns
+    if cursor is None:
+        cursor = time.time_ns() - int(sum(seconds for _, seconds in durations) * 1e9)
+    for name, seconds in durations:
+        end = cursor + int(seconds * 1e9)
+        record_span(name, cursor, end, **attributes)
+        cursor = end
+
+
+# ---------- aiohttp hooks: DNS / connect / time to headers ----------
+def _timed_hook(name: str, start_attr: str):
+    async def on_start(session, ctx, params):
+        setattr(ctx, start_attr, time.time_ns())
+
+    async def on_end(session, ctx, params):
+        started = getattr(ctx, start_attr, None)
+        if started is not None:
+            host = getattr(params, "host", None) or getattr(params, "url", None)
+            host = getattr(host, "host", host)  # A URL FOR REQUEST HOOKS
+            attributes = {"host": str(host)} if host else {}
+            record_span(name, started, time.time_ns(), **attributes)
+
+    return on_start, on_end
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    config = aiohttp.TraceConfig()
+    dns_start, dns_end = _timed_hook("dns", "dns_started")
+    connect_start, connect_end = _timed_hook("connect", "connect_started")
+    headers_start, headers_end = _timed_hook("response_headers", "request_started")
+    config.on_dns_resolvehost_start.append(dns_start)
+    config.on_dns_resolvehost_end.append(dns_end)
+    config.on_connection_create_start.append(connect_start)
+    config.on_connection_create_end.append(connect_end)
+    config.on_request_start.append(headers_start)
+    config.on_request_end.append(headers_end)
+    return config
+
+
+# ---------- OTLP/HTTP JSON export ----------
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(traces: list[Trace], service_name: str) -> dict:
+    spans = []
+    for trace in traces:
+        for s in trace.spans:
+            spans.append(
+                {
+                    "traceId": trace.trace_id,
+                    "spanId": s.span_id,
+                    "parentSpanId": s.parent_id,
+                    "name": s.name,
+                    "kind": 2 if not s.parent_id else 1,  # SERVER / INTERNAL
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns),
+                    "attributes": [
+                        {"key": key, "value": _otlp_value(value)}
+                        for key, value in s.attributes.items()
+                    ],
+                    "status": {"code": 2 if s.error else 1},
+                }
+            )
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "backend.tracing"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class OtlpExporter:
+    """
+    Finished traces queue up (bounded, oldest dropped) and a background task
+    posts them every `interval` seconds; nothing on the request path waits
+    on the collector. start()/stop() run from the FastAPI lifespan.
+    """
+
+    def __init__(
+        self,
+        url: str = "",
+        service_name: str = "tweet-sized-takeaways",
+        interval: float = 2.0,
+        max_queue: int = 2048,
+    ):
+        self.url = url
+        self.service_name = service_name
+        self.interval = interval
+        self._queue: deque[Trace] = deque(maxlen=max(1, max_queue))
+        self._task: asyncio.Task | None = None
+        self.exported = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def submit(self, trace: Trace):
+        if self.enabled:
+            self._queue.append(trace)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        from .http_client import get_session  # LAZY: http_client HOOKS INTO THIS MODULE
+
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), 256))]
+            try:
+                session = await get_session()
+                async with session.post(
+                    self.url,
+                    json=otlp_payload(batch, self.service_name),
+                    timeout=aiohttp.ClientTimeout(total=5),
+                ) as resp:
+                    if resp.status >= 300:
+                        raise RuntimeError(f"collector answered {resp.status}")
+                self.exported += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                log.warning("🛰️  trace export to %s failed: %s", self.url, e)
+                return
+
+
+def _exporter_from_env() -> OtlpExporter:
+    url = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", "")
+    if not url and os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        url = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT").rstrip("/") + "/v1/traces"
+    try:
+        interval = float(os.getenv("TRACE_EXPORT_INTERVAL_SECONDS", "2"))
+        max_queue = int(os.getenv("TRACE_EXPORT_MAX_QUEUE", "2048"))
+    except ValueError:
+        interval, max_queue = 2.0, 2048
+    return OtlpExporter(
+        url,
+        os.getenv("OTEL_SERVICE_NAME", "tweet-sized-takeaways"),
+        interval,
+        max_queue,
+    )
+
+
+EXPORTER = _exporter_from_env()
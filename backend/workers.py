@@ -0,0 +1,90 @@
+# backend/workers.py
+# ------------------------------------------------------------
+# CPU-bound parsing runs here, never on the event loop.
+# - start_pool() / stop_pool() run from the FastAPI lifespan
+# - run_in_pool(fn, *args) awaits fn(*args) on a worker
+#
+# TUNING (backend/.env):
+#   EXTRACT_POOL=thread      (thread | process | inline)
+#   EXTRACT_WORKERS=4        (WORKER COUNT)
+#   EXTRACT_QUEUE_SIZE=64    (JOBS ALLOWED TO WAIT FOR A WORKER)
+# Callers past workers + queue wait before submitting, so a burst of huge
+# pages queues up here instead of piling into the executor.
+# `process` needs picklable, module-level fns (see backend/pipeline.py).
+# ------------------------------------------------------------
+
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+_executor: Executor | None = None
+_slots: asyncio.Semaphore | None = None
+_slots_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _pool_kind() -> str:
+    kind = os.getenv("EXTRACT_POOL", "thread").strip().lower()
+    return kind if kind in {"thread", "process", "inline"} else "thread"
+
+
+def _worker_count() -> int:
+    try:
+        return max(1, int(os.getenv("EXTRACT_WORKERS", "4")))
+    except ValueError:
+        return 4
+
+
+def _queue_size() -> int:
+    try:
+        return max(0, int(os.getenv("EXTRACT_QUEUE_SIZE", "64")))
+    except ValueError:
+        return 64
+
+
+def start_pool():
+    global _executor
+    stop_pool()
+    kind = _pool_kind()
+    if kind == "process":
+        # spawn, not fork: forking a process with a live event loop is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=_worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    elif kind == "thread":
+        _executor = ThreadPoolExecutor(
+            max_workers=_worker_count(), thread_name_prefix="extract"
+        )
+
+
+def stop_pool():
+    global _executor, _slots, _slots_loop
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _slots = None
+    _slots_loop = None
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots = asyncio.Semaphore(_worker_count() + _queue_size())
+        _slots_loop = loop
+    return _slots
+
+
+async def run_in_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    if _pool_kind() == "inline":
+        return fn(*args)
+
+    if _executor is None:
+        start_pool()
+
+    async with _get_slots():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, functools.partial(fn, *args))